@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+
+SERVING_PATHS = ("model", "keyword_fallback", "heuristic_fallback", "error_fallback", "degraded", "rejected")
+
+
+class LatencyEstimate:
+    """Exponentially weighted moving average of observed latency.
+
+    Without new observations the estimate decays back toward its initial value
+    (halving the excess every half_life_seconds). A path that is skipped because
+    its estimate is over budget gets no observations, so without the decay a few
+    slow calls would shed it forever; with it the path is retried and re-measured.
+    """
+
+    def __init__(self, initial_ms, alpha=0.2, half_life_seconds=30.0):
+        self.initial = initial_ms
+        self.value = initial_ms
+        self.alpha = alpha
+        self.half_life_seconds = half_life_seconds
+        self.updated = time.monotonic()
+
+    def current(self, now=None):
+        if not self.half_life_seconds or self.value <= self.initial:
+            return self.value
+        idle = (now if now is not None else time.monotonic()) - self.updated
+        return self.initial + (self.value - self.initial) * 0.5 ** (idle / self.half_life_seconds)
+
+    def add(self, latency_ms):
+        now = time.monotonic()
+        self.value = self.current(now)
+        self.value += self.alpha * (latency_ms - self.value)
+        self.updated = now
+
+
+class AdmissionController:
+    """Chooses model, fallback or rejection per request from its latency budget and current load"""
+
+    def __init__(self, max_inflight=64, concurrency=4, model_latency_ms=5.0, fallback_latency_ms=0.5,
+                 half_life_seconds=30.0):
+        self.max_inflight = max_inflight
+        self.concurrency = concurrency
+        self.half_life_seconds = half_life_seconds
+        self.initial_model_ms = model_latency_ms
+        self.initial_fallback_ms = fallback_latency_ms
+        self.lock = threading.Lock()
+        self.inflight = 0
+        self.peak_inflight = 0
+        self.estimates = {}
+        self.counts = {}
+
+    @classmethod
+    def from_env(cls):
+        """Build a controller from AI_ADMISSION_* environment variables"""
+        return cls(
+            max_inflight=int(os.getenv("AI_ADMISSION_MAX_INFLIGHT", "64")),
+            concurrency=int(os.getenv("AI_ADMISSION_CONCURRENCY", "4")),
+            half_life_seconds=float(os.getenv("AI_ADMISSION_ESTIMATE_HALF_LIFE_SECONDS", "30"))
+        )
+
+    def _endpoint_state(self, endpoint):
+        if endpoint not in self.estimates:
+            self.estimates[endpoint] = {
+                "model": LatencyEstimate(self.initial_model_ms, half_life_seconds=self.half_life_seconds),
+                "fallback": LatencyEstimate(self.initial_fallback_ms, half_life_seconds=self.half_life_seconds)
+            }
+            self.counts[endpoint] = {path: 0 for path in SERVING_PATHS}
+        return self.estimates[endpoint]
+
+    def acquire(self, endpoint, budget_ms=None, degrade=False):
+        """Return the path to serve on ("model", "fallback" or "rejected").
+
+        With degrade=True the caller serves a request it cannot admit on the
+        fallback path without holding a slot; that is counted and returned as
+        "degraded" instead of "rejected" (and must not be released).
+        """
+        refused = "degraded" if degrade else "rejected"
+        with self.lock:
+            estimates = self._endpoint_state(endpoint)
+
+            if self.inflight >= self.max_inflight:
+                self.counts[endpoint][refused] += 1
+                return refused
+
+            # Requests beyond the worker concurrency wait behind the ones in flight
+            queue_factor = max(1.0, (self.inflight + 1) / self.concurrency)
+            now = time.monotonic()
+            model_ms = estimates["model"].current(now) * queue_factor
+            fallback_ms = estimates["fallback"].current(now) * queue_factor
+
+            if budget_ms is None or model_ms <= budget_ms:
+                path = "model"
+            elif fallback_ms <= budget_ms:
+                path = "fallback"
+            else:
+                self.counts[endpoint][refused] += 1
+                return refused
+
+            self.inflight += 1
+            self.peak_inflight = max(self.peak_inflight, self.inflight)
+            return path
+
+    def release(self, endpoint, path_used, latency_ms):
+        """Record the path actually taken and its latency"""
+        with self.lock:
+            self.inflight -= 1
+            estimates = self._endpoint_state(endpoint)
+            self.counts[endpoint][path_used] = self.counts[endpoint].get(path_used, 0) + 1
+            if path_used == "model":
+                estimates["model"].add(latency_ms)
+            elif path_used in ("keyword_fallback", "heuristic_fallback"):
+                estimates["fallback"].add(latency_ms)
+
+    def report(self):
+        """Queue depth, latency estimates and counts per serving path"""
+        with self.lock:
+            return {
+                "inflight": self.inflight,
+                "peak_inflight": self.peak_inflight,
+                "max_inflight": self.max_inflight,
+                "concurrency": self.concurrency,
+                "endpoints": {
+                    endpoint: {
+                        "estimated_model_ms": round(estimates["model"].current(), 3),
+                        "estimated_fallback_ms": round(estimates["fallback"].current(), 3),
+                        "paths": dict(self.counts[endpoint])
+                    }
+                    for endpoint, estimates in self.estimates.items()
+                }
+            }
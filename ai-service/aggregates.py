@@ -0,0 +1,226 @@
+import atexit
+import math
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from training_utils import atomic_dump
+
+# Bucket width (seconds) and number of buckets kept per clinic
+RESOLUTIONS = {
+    "minute": (60, 2 * 24 * 60),
+    "hour": (3600, 45 * 24),
+    "day": (86400, 400)
+}
+
+# Series keys the aggregator owns; a client-supplied clinic id equal to one of these
+# is counted as unknown, so it can never add to (or be read back as) the rollup
+ALL_CLINICS = "all"
+UNKNOWN_CLINIC = "unknown"
+OTHER_CLINICS = "other"
+RESERVED_KEYS = (ALL_CLINICS, UNKNOWN_CLINIC, OTHER_CLINICS)
+
+# Automatic resolution keeps range answers to at most this many buckets
+MAX_AUTO_BUCKETS = 180
+
+
+class Bucket:
+    """Counters for one clinic and time bucket"""
+
+    __slots__ = ("triage_count", "triage_fallbacks", "urgency_counts",
+                 "noshow_count", "noshow_fallbacks", "noshow_risk_sum")
+
+    def __init__(self):
+        self.triage_count = 0
+        self.triage_fallbacks = 0
+        self.urgency_counts = {}
+        self.noshow_count = 0
+        self.noshow_fallbacks = 0
+        self.noshow_risk_sum = 0.0
+
+    def merge(self, other):
+        self.triage_count += other.triage_count
+        self.triage_fallbacks += other.triage_fallbacks
+        for urgency, count in other.urgency_counts.items():
+            self.urgency_counts[urgency] = self.urgency_counts.get(urgency, 0) + count
+        self.noshow_count += other.noshow_count
+        self.noshow_fallbacks += other.noshow_fallbacks
+        self.noshow_risk_sum += other.noshow_risk_sum
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def to_dict(self):
+        return {
+            "triage_requests": self.triage_count,
+            "urgency_counts": dict(self.urgency_counts),
+            "triage_fallback_rate": round(self.triage_fallbacks / self.triage_count, 4) if self.triage_count else None,
+            "noshow_requests": self.noshow_count,
+            "mean_no_show_risk": round(self.noshow_risk_sum / self.noshow_count, 4) if self.noshow_count else None,
+            "noshow_fallback_rate": round(self.noshow_fallbacks / self.noshow_count, 4) if self.noshow_count else None
+        }
+
+
+class TimeBucketAggregator:
+    """Minute/hour/day counters per clinic, updated in O(1) per prediction.
+
+    Clinic ids come from request bodies, so at most max_clinics get their own
+    series; predictions for clinics seen after that are counted under "other".
+    """
+
+    def __init__(self, path=None, persist_interval=60, max_clinics=500):
+        self.path = path
+        self.max_clinics = max_clinics
+        self.lock = threading.Lock()
+        # resolution -> clinic -> OrderedDict(bucket_start -> Bucket), oldest first
+        self.series = {resolution: {} for resolution in RESOLUTIONS}
+        self.clinic_count = 0
+        if path:
+            self.load()
+            atexit.register(self.save)
+            saver = threading.Thread(target=self._persist_loop, args=(persist_interval,),
+                                     name="aggregates-saver", daemon=True)
+            saver.start()
+
+    @classmethod
+    def from_env(cls):
+        """Build an aggregator from AI_AGGREGATES_* environment variables"""
+        return cls(
+            path=os.getenv("AI_AGGREGATES_FILE") or None,
+            persist_interval=int(os.getenv("AI_AGGREGATES_PERSIST_SECONDS", "60")),
+            max_clinics=int(os.getenv("AI_AGGREGATES_MAX_CLINICS", "500"))
+        )
+
+    def _clinic_key(self, clinic_id):
+        """Series key for a recorded clinic id (caller holds the lock)"""
+        if clinic_id is None:
+            return UNKNOWN_CLINIC
+        key = str(clinic_id)
+        if key in RESERVED_KEYS:
+            return UNKNOWN_CLINIC
+        if key in self.series["day"]:
+            return key
+        if self.clinic_count >= self.max_clinics:
+            return OTHER_CLINICS
+        self.clinic_count += 1
+        return key
+
+    def _buckets(self, clinic_id, ts):
+        """Current bucket at every resolution for the clinic and the all-clinics rollup"""
+        clinic_key = self._clinic_key(clinic_id)
+        buckets = []
+        for resolution, (width, retention) in RESOLUTIONS.items():
+            start = int(ts // width) * width
+            for key in (clinic_key, ALL_CLINICS):
+                clinics = self.series[resolution]
+                series = clinics.get(key)
+                if series is None:
+                    series = clinics[key] = OrderedDict()
+                bucket = series.get(start)
+                if bucket is None:
+                    bucket = series[start] = Bucket()
+                    if len(series) > retention:
+                        series.popitem(last=False)
+                buckets.append(bucket)
+        return buckets
+
+    def record_triage(self, clinic_id, urgency, path_used, ts=None):
+        fallback = path_used != "model"
+        with self.lock:
+            for bucket in self._buckets(clinic_id, ts or time.time()):
+                bucket.triage_count += 1
+                bucket.triage_fallbacks += fallback
+                bucket.urgency_counts[urgency] = bucket.urgency_counts.get(urgency, 0) + 1
+
+    def record_noshow(self, clinic_id, risk, path_used, ts=None):
+        fallback = path_used != "model"
+        with self.lock:
+            for bucket in self._buckets(clinic_id, ts or time.time()):
+                bucket.noshow_count += 1
+                bucket.noshow_fallbacks += fallback
+                bucket.noshow_risk_sum += float(risk)
+
+    def _pick_resolution(self, start, end):
+        """Finest resolution that still covers the range start and stays under MAX_AUTO_BUCKETS"""
+        now = time.time()
+        for resolution, (width, retention) in RESOLUTIONS.items():
+            if start >= now - width * retention and (end - start) / width <= MAX_AUTO_BUCKETS:
+                return resolution
+        return "day"
+
+    def query(self, start, end, clinic_id=None, resolution=None):
+        """Merge buckets in [start, end) into totals plus a per-bucket series"""
+        if not (math.isfinite(start) and math.isfinite(end)):
+            raise ValueError("start and end must be finite")
+        resolution = resolution or self._pick_resolution(start, end)
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        width = RESOLUTIONS[resolution][0]
+        key = str(clinic_id) if clinic_id is not None else ALL_CLINICS
+        aligned_start = int(start // width) * width
+
+        span = range(aligned_start, int(end), width)
+
+        # Copy the matching buckets under the lock and merge outside it, so a wide
+        # range never stalls the recording path. Walk the range or the stored
+        # buckets, whichever is shorter: cost is bounded by the retention either way.
+        matched = []
+        with self.lock:
+            series = self.series[resolution].get(key, {})
+            if len(span) <= len(series):
+                starts = (bucket_start for bucket_start in span if bucket_start in series)
+            else:
+                starts = (bucket_start for bucket_start in series if bucket_start in span)
+            for bucket_start in starts:
+                copy = Bucket()
+                copy.merge(series[bucket_start])
+                matched.append((bucket_start, copy))
+
+        totals = Bucket()
+        points = []
+        for bucket_start, bucket in sorted(matched, key=lambda item: item[0]):
+            totals.merge(bucket)
+            points.append({"start": bucket_start, **bucket.to_dict()})
+        return {
+            "clinic_id": key,
+            "resolution": resolution,
+            "start": aligned_start,
+            "end": end,
+            "totals": totals.to_dict(),
+            "series": points
+        }
+
+    def save(self):
+        if not self.path:
+            return
+        # Serialize under the lock so writers never mutate a bucket mid-dump
+        with self.lock:
+            snapshot = pickle.dumps(self.series)
+        atomic_dump(snapshot, self.path, raw=True)
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as f:
+                series = pickle.load(f)
+            with self.lock:
+                self.series.update({r: series.get(r, {}) for r in RESOLUTIONS})
+                self.clinic_count = sum(1 for key in self.series["day"] if key not in RESERVED_KEYS)
+            print(f"✅ Loaded prediction aggregates from {self.path}")
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            print(f"⚠️  Could not load prediction aggregates: {e}")
+
+    def _persist_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.save()
+            except OSError as e:
+                print(f"⚠️  Could not persist prediction aggregates: {e}")
@@ -0,0 +1,234 @@
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from explain import build_explainer, class_indices
+from overbooking import simulate_overbooking
+from scheduler import SlotAllocator
+from triage_rules import RULES_FILE, CompiledRules
+
+
+def bench_scheduler(clinics=200, staff_per_clinic=8, requests=5000, slot_minutes=15):
+    """Batch slot allocation over a synthetic one-day clinic network calendar"""
+    print("📅 Scheduler benchmark")
+    random.seed(42)
+    day = datetime(2025, 1, 6, 8, tzinfo=timezone.utc)
+    entries = [{
+        "clinic_id": c,
+        "staff_id": f"{c}-{s}",
+        "start": day.isoformat(),
+        "end": (day + timedelta(hours=10)).isoformat(),
+        "slot_minutes": slot_minutes
+    } for c in range(clinics) for s in range(staff_per_clinic)]
+
+    allocator = SlotAllocator()
+    start = time.perf_counter()
+    report = allocator.load_calendar(entries)
+    load_seconds = time.perf_counter() - start
+
+    batch = [{
+        "request_id": i,
+        "clinic_id": random.randrange(clinics),
+        "staff_id": None,
+        "urgency": random.choices(["urgent", "moderate", "routine"], [0.15, 0.35, 0.5])[0],
+        "no_show_risk": random.random() * 0.5,
+        "not_before": (day + timedelta(minutes=random.randrange(0, 480))).isoformat()
+    } for i in range(requests)]
+
+    start = time.perf_counter()
+    results = allocator.assign_batch(batch, now=day.isoformat())
+    assign_seconds = time.perf_counter() - start
+
+    assigned = sum(1 for r in results if r["slot_start"] is not None)
+    print(f"   Slots: {report['total_slots']} across {clinics} clinics")
+    print(f"   Calendar load: {load_seconds * 1000:.1f} ms")
+    print(f"   Assigned {assigned}/{requests} requests in {assign_seconds * 1000:.1f} ms "
+          f"({assign_seconds / requests * 1e6:.1f} µs/request)")
+    return assign_seconds
+
+
+def bench_overbooking(clinics=100, sessions_per_clinic=2, capacity=20, scenarios=20000):
+    """Overbooking simulation for a full clinic network day"""
+    print("🎲 Overbooking simulation benchmark")
+    rng = np.random.default_rng(42)
+    sessions = [{
+        "session_id": f"{c}-{s}",
+        "capacity": capacity,
+        "no_show_probs": rng.uniform(0.05, 0.45, capacity).tolist()
+    } for c in range(clinics) for s in range(sessions_per_clinic)]
+
+    result = simulate_overbooking(sessions, n_scenarios=scenarios, seed=42)
+    network = result["network"]
+    print(f"   {len(sessions)} sessions, {len(sessions) * capacity} appointments, {scenarios} scenarios")
+    print(f"   Elapsed: {result['elapsed_ms']:.1f} ms")
+    print(f"   Expected utilization {network['expected_utilization']:.3f}, "
+          f"recommended extra bookings {network['recommended_extra_bookings']}")
+    return result["elapsed_ms"] / 1000
+
+
+def _misspell(word, rng):
+    """One random edit (two for long words): deletion, insertion, substitution or transposition"""
+    for _ in range(2 if len(word) >= 8 else 1):
+        i = rng.randrange(len(word) - 1)
+        edit = rng.choice(["delete", "insert", "substitute", "transpose"])
+        letter = rng.choice("abcdefghijklmnopqrstuvwxyz")
+        if edit == "delete":
+            word = word[:i] + word[i + 1:]
+        elif edit == "insert":
+            word = word[:i] + letter + word[i:]
+        elif edit == "substitute":
+            word = word[:i] + letter + word[i + 1:]
+        else:
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word
+
+
+# Ordinary sentences with real words a few edits from symptom or severity terms; fuzzy
+# matching must leave their triage exactly as exact matching does
+FALSE_POSITIVE_TEXTS = [
+    "I have a stick in my foot",
+    "what hight should my pillow be",
+    "my son fell off the couch",
+    "I want to come home early",
+    "the light hurts my eyes a little",
+    "he sold his cart last week",
+    "I need to pick up my medicine",
+    "she hurt her hand while cooking",
+    "my leg feels weak after the long walk",
+    "I read that I should drink more water",
+    "the baby keeps kicking at night",
+    "he had a slight rash on his wrist",
+    "there was a loud hiss from the heater",
+    "I feel sore after lifting the chest of drawers",
+    "we had heavy rain and a flood near the house",
+    "my heel aches when I stand",
+    "the hot weather makes me tired",
+    "please check my blood pressure",
+    "my grandmother lives a long way from the clinic",
+    "I lost my sick note",
+]
+
+
+def bench_fuzzy(samples=2000):
+    """Urgency recall on misspelled symptom text, false corrections of real words, and
+    extraction cost with/without fuzzy matching"""
+    print("🔤 Fuzzy symptom matching benchmark")
+    with open(RULES_FILE, encoding="utf-8") as f:
+        spec = json.load(f)
+    fuzzy_rules = CompiledRules(spec)
+    exact_rules = CompiledRules({**spec, "fuzzy": {"enabled": False}})
+
+    rng = random.Random(42)
+    terms = sorted({term for groups in spec["match_patterns"].values() for group in groups
+                    for term in group if term.isascii()})
+    fillers = ["I have", "patient reports", "my mother has", "since yesterday", "for two days", "and"]
+    clean, typos = [], []
+    for _ in range(samples):
+        words = rng.choice(terms).split() + rng.choice(terms).split()
+        misspelled = [_misspell(w, rng) if len(w) >= 4 and rng.random() < 0.7 else w for w in words]
+        prefix = rng.choice(fillers)
+        clean.append(f"{prefix} {' '.join(words)}")
+        typos.append(f"{prefix} {' '.join(misspelled)}")
+
+    expected = [exact_rules.decide(*exact_rules.extract(t), 40) for t in clean]
+    for name, rules in [("exact", exact_rules), ("fuzzy", fuzzy_rules)]:
+        got = [rules.decide(*rules.extract(t), 40) for t in typos]
+        recall = sum(g == e for g, e in zip(got, expected)) / samples
+        print(f"   {name:>5}: urgency matches clean text for {recall:.1%} of misspelled requests")
+
+    # False positives: any change to flags, counts or urgency on correctly spelled text
+    changed = [text for text in FALSE_POSITIVE_TEXTS
+               if fuzzy_rules.extract(text) != exact_rules.extract(text)
+               or fuzzy_rules.decide(*fuzzy_rules.extract(text), 40) != exact_rules.decide(*exact_rules.extract(text), 40)]
+    print(f"   fuzzy: changed triage of {len(changed)}/{len(FALSE_POSITIVE_TEXTS)} correctly spelled sentences")
+    for text in changed:
+        print(f"      {text!r} -> {fuzzy_rules.correct(text)!r}")
+    # Every dictionary word within correction distance of a symptom term, one per sentence
+    unguarded = CompiledRules({**spec, "fuzzy": {k: v for k, v in spec["fuzzy"].items() if k != "dictionary"}})
+    near_words = sorted(word for word in fuzzy_rules.fuzzy.protected if unguarded.fuzzy.lookup(word))
+    rewritten = [word for word in near_words if fuzzy_rules.fuzzy.lookup(word)]
+    print(f"   fuzzy: rewrote {len(rewritten)}/{len(near_words)} dictionary words that are a few edits "
+          f"from a symptom term (without the word list: {len(near_words)})")
+
+    for name, rules in [("exact", exact_rules), ("fuzzy", fuzzy_rules)]:
+        if rules.fuzzy is not None:
+            rules.fuzzy.cache.clear()
+        start = time.perf_counter()
+        for text in typos:
+            rules.extract(text)
+        cold = (time.perf_counter() - start) / samples
+        start = time.perf_counter()
+        for text in typos:
+            rules.extract(text)
+        warm = (time.perf_counter() - start) / samples
+        print(f"   {name:>5}: extraction {cold * 1e6:.1f} µs/request cold cache, {warm * 1e6:.1f} µs warm")
+    print(f"   Deletion index: {len(fuzzy_rules.fuzzy.vocabulary)} words, {len(fuzzy_rules.fuzzy.index)} keys")
+    return warm
+
+
+def _best_of(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_explain(rows=1000, repeats=5):
+    """Explanation overhead relative to plain predict_proba, per model family
+    (models without an exact explainer, such as the SVC, are reported as unsupported)"""
+    print("🔍 Explanation overhead benchmark")
+    from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.svm import SVC
+
+    rng = np.random.default_rng(42)
+    X = rng.normal(size=(2000, 7))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(scale=0.5, size=2000) > 0).astype(int)
+    models = {
+        "logistic": LogisticRegression(),
+        "random_forest": RandomForestClassifier(n_estimators=200, random_state=42),
+        "gradient_boosting": GradientBoostingClassifier(n_estimators=200, random_state=42),
+        "svc": SVC(probability=True, random_state=42)
+    }
+    batch, single = X[:rows], X[:1]
+    for name, model in models.items():
+        model.fit(X, y)
+        start = time.perf_counter()
+        explainer = build_explainer(model)
+        build_ms = (time.perf_counter() - start) * 1000
+        if explainer is None:
+            print(f"   {name:>17} (unsupported): explain=true returns a placeholder, no extra cost")
+            continue
+        classes = class_indices(model, model.predict(batch))
+        timings = []
+        for data, labels in [(single, classes[:1]), (batch, classes)]:
+            plain = _best_of(lambda: model.predict_proba(data), repeats)
+            # Endpoints score the rows and then explain them, as here
+            explained = _best_of(lambda: (model.predict_proba(data), explainer.explain(data, labels)), repeats)
+            timings.append((plain, explained))
+        (one_plain, one_explained), (batch_plain, batch_explained) = timings
+        print(f"   {name:>17} ({explainer.method}): build {build_ms:.0f} ms | "
+              f"1 row {one_plain * 1000:.2f} -> {one_explained * 1000:.2f} ms "
+              f"({one_explained / one_plain:.1f}x) | {rows} rows {batch_plain * 1000:.1f} -> "
+              f"{batch_explained * 1000:.1f} ms ({batch_explained / batch_plain:.1f}x)")
+    return batch_explained / batch_plain
+
+
+BENCHMARKS = {
+    "scheduler": bench_scheduler,
+    "overbooking": bench_overbooking,
+    "fuzzy": bench_fuzzy,
+    "explain": bench_explain
+}
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        BENCHMARKS[name]()
+        print()
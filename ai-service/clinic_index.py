@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+from sklearn.neighbors import BallTree
+
+from training_utils import atomic_dump
+
+EARTH_RADIUS_KM = 6371.0088
+CLINICS_FILE = "clinics.json"
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Vectorized great-circle distance in kilometres (inputs in degrees)"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class ClinicSnapshot:
+    """Immutable ball tree over clinic coordinates; replaced wholesale on rebuild"""
+
+    def __init__(self, clinics, version):
+        self.clinics = clinics
+        self.version = version
+        self.built_at = datetime.now().isoformat()
+        self.clinic_ids = [c["clinic_id"] for c in clinics]
+        # Keyed by str so ids from SQL (int) and from JSON bodies (often str) match
+        self.positions = {str(clinic_id): i for i, clinic_id in enumerate(self.clinic_ids)}
+        self.coords = np.array([[c["latitude"], c["longitude"]] for c in clinics], dtype=float).reshape(-1, 2)
+        self.tree = BallTree(np.radians(self.coords), metric="haversine") if clinics else None
+
+
+class ClinicSpatialIndex:
+    """Nearest-clinic and patient-to-clinic distance lookups on haversine distance.
+
+    With a path, every rebuild is written back to it, so clinics synced at runtime
+    survive a restart of the service.
+    """
+
+    def __init__(self, clinics=None, path=None):
+        self.lock = threading.Lock()
+        self.path = path
+        self.persist_error = None
+        self.snapshot = ClinicSnapshot([], 0)
+        if clinics:
+            self.rebuild(clinics, persist=False)
+
+    @classmethod
+    def from_file(cls, path=CLINICS_FILE):
+        """Load clinics from a JSON list of {clinic_id, latitude, longitude}; rebuilds save back to path"""
+        if not os.path.exists(path):
+            return cls(path=path)
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), path=path)
+
+    @staticmethod
+    def _validate(clinic):
+        lat = float(clinic["latitude"])
+        lon = float(clinic["longitude"])
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise ValueError(f"Invalid coordinates for clinic {clinic['clinic_id']}")
+        return {**clinic, "latitude": lat, "longitude": lon}
+
+    def rebuild(self, clinics, replace=True, persist=True):
+        """Replace (or upsert into) the clinic set and rebuild the tree"""
+        validated = [self._validate(c) for c in clinics]
+        with self.lock:
+            merged = {} if replace else {str(c["clinic_id"]): c for c in self.snapshot.clinics}
+            for clinic in validated:
+                merged[str(clinic["clinic_id"])] = clinic
+            snapshot = ClinicSnapshot(list(merged.values()), self.snapshot.version + 1)
+            self.snapshot = snapshot
+            # Written under the lock so concurrent rebuilds reach the file in version order
+            if persist and self.path:
+                # The in-memory index stays current even if the file cannot be written
+                try:
+                    atomic_dump(json.dumps(snapshot.clinics, indent=2).encode("utf-8"), self.path, raw=True)
+                    self.persist_error = None
+                except OSError as e:
+                    self.persist_error = str(e)
+                    print(f"⚠️  Could not persist clinic index to {self.path}: {e}")
+        return snapshot.version
+
+    def nearest(self, lats, lons, k=1):
+        """k nearest clinics for each point; returns (clinic_ids, distances_km) as lists of lists"""
+        snapshot = self.snapshot
+        if snapshot.tree is None:
+            return None, None
+        points = np.radians(np.column_stack([np.atleast_1d(lats), np.atleast_1d(lons)]).astype(float))
+        k = max(1, min(int(k), len(snapshot.clinic_ids)))
+        distances, indices = snapshot.tree.query(points, k=k)
+        ids = [[snapshot.clinic_ids[i] for i in row] for row in indices]
+        return ids, (distances * EARTH_RADIUS_KM).tolist()
+
+    def distance_to(self, clinic_ids, lats, lons):
+        """Distance from each point to its given clinic; NaN where the clinic is unknown"""
+        snapshot = self.snapshot
+        clinic_ids = list(np.atleast_1d(clinic_ids))
+        rows = np.array([snapshot.positions.get(str(cid), -1) for cid in clinic_ids])
+        known = rows >= 0
+        result = np.full(len(clinic_ids), np.nan)
+        if known.any():
+            clinic_coords = snapshot.coords[rows[known]]
+            result[known] = haversine_km(np.atleast_1d(lats)[known], np.atleast_1d(lons)[known],
+                                         clinic_coords[:, 0], clinic_coords[:, 1])
+        return result
+
+    def clinic(self, clinic_id):
+        """The stored record for a clinic, or None"""
+        snapshot = self.snapshot
+        position = snapshot.positions.get(str(clinic_id))
+        return snapshot.clinics[position] if position is not None else None
+
+    def report(self):
+        snapshot = self.snapshot
+        return {
+            "clinics": len(snapshot.clinic_ids),
+            "version": snapshot.version,
+            "built_at": snapshot.built_at,
+            "path": self.path,
+            "persist_error": self.persist_error
+        }
@@ -0,0 +1,41 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+# Times without a UTC offset are clinic-local everywhere in the service: appointment
+# enrichment, slot calendars and aggregate queries all parse through this module
+DEFAULT_UTC_OFFSET_MINUTES = 345  # Nepal, UTC+05:45
+LOCAL_UTC_OFFSET_MINUTES = int(os.getenv("AI_LOCAL_UTC_OFFSET_MINUTES", str(DEFAULT_UTC_OFFSET_MINUTES)))
+
+
+def clinic_timezone(utc_offset_minutes=None):
+    if utc_offset_minutes is None:
+        utc_offset_minutes = LOCAL_UTC_OFFSET_MINUTES
+    return timezone(timedelta(minutes=utc_offset_minutes))
+
+
+def parse_time(value, utc_offset_minutes=None):
+    """(clinic-local aware datetime, has_time) for an ISO-8601 date/datetime or epoch seconds.
+
+    A date-only string gives the day but no time of day. Raises ValueError when
+    the value cannot be parsed.
+    """
+    local = clinic_timezone(utc_offset_minutes)
+    if isinstance(value, (int, float)):
+        try:
+            return datetime.fromtimestamp(value, tz=local), True
+        except (OverflowError, OSError, ValueError) as e:
+            raise ValueError(f"Invalid epoch seconds: {value}") from e
+    text = str(value).strip()
+    parsed = datetime.fromisoformat(text)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=local)
+    return parsed.astimezone(local), len(text) > 10
+
+
+def to_epoch(value, utc_offset_minutes=None):
+    """ISO-8601 string or epoch seconds to epoch seconds (None stays None)"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    return parse_time(value, utc_offset_minutes)[0].timestamp()
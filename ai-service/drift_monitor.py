@@ -0,0 +1,261 @@
+import math
+import os
+import pickle
+import random
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from training_utils import atomic_dump
+
+REFERENCE_FILE = "drift_reference.pkl"
+SPEC_VERSION = 1
+
+# Monitored features per model: fixed-bin histograms for numeric values, label counts otherwise.
+# Out-of-range values are clamped into the first/last bin so updates stay O(1); NaN and
+# infinities are counted separately and kept out of the bins and quantiles.
+DRIFT_SPEC = {
+    "triage": {
+        "age": {"type": "histogram", "low": 0, "high": 100, "bins": 20},
+        "fever": {"type": "labels"},
+        "chest_pain": {"type": "labels"},
+        "breathing_difficulty": {"type": "labels"},
+        "severe_pain": {"type": "labels"},
+        "bleeding": {"type": "labels"},
+        "urgency": {"type": "labels"}
+    },
+    "noshow": {
+        "age": {"type": "histogram", "low": 0, "high": 100, "bins": 20},
+        "distance": {"type": "histogram", "low": 0, "high": 50, "bins": 20},
+        "history_missed": {"type": "histogram", "low": 0, "high": 10, "bins": 10},
+        "no_show_risk": {"type": "histogram", "low": 0, "high": 1, "bins": 20}
+    }
+}
+
+
+class FixedHistogram:
+    """Uniform-width histogram with clamped edge bins and a separate non-finite count"""
+
+    def __init__(self, low, high, bins):
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.width = (high - low) / bins
+        self.counts = [0] * bins
+        self.non_finite = 0
+
+    def add(self, value):
+        """Count one value; returns False (and counts it as non-finite) for NaN/inf"""
+        if not math.isfinite(value):
+            self.non_finite += 1
+            return False
+        # Clamp before int() so huge values cannot overflow
+        position = min(max((value - self.low) / self.width, 0), self.bins - 1)
+        self.counts[int(position)] += 1
+        return True
+
+    def add_many(self, values):
+        values = np.asarray(values, dtype=float)
+        finite = np.isfinite(values)
+        self.non_finite += int((~finite).sum())
+        indices = np.clip((values[finite] - self.low) / self.width, 0, self.bins - 1).astype(int)
+        for index, count in zip(*np.unique(indices, return_counts=True)):
+            self.counts[index] += int(count)
+
+    def to_dict(self):
+        return {"type": "histogram", "low": self.low, "high": self.high,
+                "bins": self.bins, "counts": list(self.counts), "non_finite": self.non_finite}
+
+
+class LabelCounter:
+    """Counts of categorical values (symptom flags, predicted labels)"""
+
+    def __init__(self):
+        self.counts = {}
+
+    def add(self, value):
+        key = str(value)
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def add_many(self, values):
+        for value in values:
+            self.add(value)
+
+    def to_dict(self):
+        return {"type": "labels", "counts": dict(self.counts)}
+
+
+class ReservoirSample:
+    """Uniform sample of a stream (Algorithm R) used for served-value quantiles"""
+
+    def __init__(self, size=500):
+        self.size = size
+        self.seen = 0
+        self.values = []
+
+    def add(self, value):
+        self.seen += 1
+        if len(self.values) < self.size:
+            self.values.append(value)
+        else:
+            slot = random.randrange(self.seen)
+            if slot < self.size:
+                self.values[slot] = value
+
+    def quantiles(self):
+        if not self.values:
+            return None
+        q = np.percentile(self.values, [5, 25, 50, 75, 95])
+        return {name: round(float(v), 3) for name, v in zip(["p05", "p25", "p50", "p75", "p95"], q)}
+
+
+def _new_summary(spec):
+    if spec["type"] == "histogram":
+        return FixedHistogram(spec["low"], spec["high"], spec["bins"])
+    return LabelCounter()
+
+
+def population_stability_index(expected, actual, eps=1e-4):
+    """PSI between two count vectors (or label-count dicts) over the same bins"""
+    if isinstance(expected, dict):
+        labels = sorted(set(expected) | set(actual))
+        expected = [expected.get(label, 0) for label in labels]
+        actual = [actual.get(label, 0) for label in labels]
+
+    expected_total = sum(expected)
+    actual_total = sum(actual)
+    if expected_total == 0 or actual_total == 0:
+        return None
+
+    psi = 0.0
+    for e, a in zip(expected, actual):
+        e_pct = max(e / expected_total, eps)
+        a_pct = max(a / actual_total, eps)
+        psi += (a_pct - e_pct) * math.log(a_pct / e_pct)
+    return round(psi, 4)
+
+
+def psi_status(psi):
+    if psi is None:
+        return "unknown"
+    if psi < 0.1:
+        return "stable"
+    if psi < 0.25:
+        return "moderate_shift"
+    return "significant_shift"
+
+
+def build_reference(triage_df, noshow_df):
+    """Summarize training frames from generate_comprehensive_*_data with the serving bins"""
+    columns = {
+        "triage": {"urgency": "urgency"},
+        "noshow": {"no_show_risk": "no_show_probability"}
+    }
+    frames = {"triage": triage_df, "noshow": noshow_df}
+
+    reference = {"spec_version": SPEC_VERSION,
+                 "created_at": datetime.now().isoformat(),
+                 "features": {}}
+    for kind, features in DRIFT_SPEC.items():
+        reference["features"][kind] = {}
+        for name, spec in features.items():
+            column = columns[kind].get(name, name)
+            summary = _new_summary(spec)
+            summary.add_many(frames[kind][column].tolist())
+            reference["features"][kind][name] = summary.to_dict()
+    return reference
+
+
+def save_reference(reference, path=REFERENCE_FILE):
+    atomic_dump(reference, path, use_pickle=True)
+
+
+def load_reference(path=REFERENCE_FILE):
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        reference = pickle.load(f)
+    if reference.get("spec_version") != SPEC_VERSION:
+        print(f"⚠️  Drift reference {path} uses an old bin spec, ignoring it")
+        return None
+    return reference
+
+
+class DriftMonitor:
+    """Constant-memory summaries of served features and predictions"""
+
+    def __init__(self, reference=None, reservoir_size=500):
+        self.reference = reference
+        self.lock = threading.Lock()
+        self.started_at = datetime.now().isoformat()
+        self.observations = {kind: 0 for kind in DRIFT_SPEC}
+        self.summaries = {
+            kind: {name: _new_summary(spec) for name, spec in features.items()}
+            for kind, features in DRIFT_SPEC.items()
+        }
+        self.reservoirs = {
+            kind: {name: ReservoirSample(reservoir_size)
+                   for name, spec in features.items() if spec["type"] == "histogram"}
+            for kind, features in DRIFT_SPEC.items()
+        }
+
+    def _observe(self, kind, values):
+        with self.lock:
+            self.observations[kind] += 1
+            summaries = self.summaries[kind]
+            reservoirs = self.reservoirs[kind]
+            for name, value in values.items():
+                counted = summaries[name].add(value)
+                if name in reservoirs and counted:
+                    reservoirs[name].add(value)
+
+    def observe_triage(self, age, extracted_symptoms, urgency):
+        """Record one served triage request"""
+        self._observe("triage", {
+            "age": float(age),
+            "fever": extracted_symptoms["fever"],
+            "chest_pain": extracted_symptoms["chest_pain"],
+            "breathing_difficulty": extracted_symptoms["breathing_difficulty"],
+            "severe_pain": extracted_symptoms["severe_pain"],
+            "bleeding": extracted_symptoms["bleeding"],
+            "urgency": urgency
+        })
+
+    def observe_noshow(self, age, distance, history_missed, risk):
+        """Record one served no-show request"""
+        self._observe("noshow", {
+            "age": float(age),
+            "distance": float(distance),
+            "history_missed": float(history_missed),
+            "no_show_risk": float(risk)
+        })
+
+    def report(self):
+        """Served summaries with PSI against the training reference"""
+        with self.lock:
+            result = {
+                "since": self.started_at,
+                "reference_loaded": self.reference is not None,
+                "reference_created_at": self.reference.get("created_at") if self.reference else None,
+                "observations": dict(self.observations),
+                "features": {}
+            }
+            for kind, summaries in self.summaries.items():
+                result["features"][kind] = {}
+                for name, summary in summaries.items():
+                    served = summary.to_dict()
+                    entry = {"served": served}
+
+                    if name in self.reservoirs[kind]:
+                        entry["quantiles"] = self.reservoirs[kind][name].quantiles()
+
+                    psi = None
+                    if self.reference is not None:
+                        expected = self.reference["features"][kind][name]["counts"]
+                        psi = population_stability_index(expected, served["counts"])
+                        entry["reference"] = expected
+                    entry["psi"] = psi
+                    entry["status"] = psi_status(psi)
+                    result["features"][kind][name] = entry
+            return result
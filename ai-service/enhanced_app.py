@@ -1,143 +1,212 @@
+import gc
+import json
+import math
 import pickle
 import numpy as np
 import joblib
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, g, send_file, stream_with_context
+from functools import wraps
+import os
 import random
-import re
+import sys
+import time
+from collections import namedtuple
 from datetime import datetime, timedelta
+from admission import AdmissionController
+from aggregates import RESOLUTIONS, TimeBucketAggregator
+from clinic_index import ClinicSpatialIndex
+from clinic_time import to_epoch
+from drift_monitor import DriftMonitor, load_reference
+from enrichment import NoShowEnricher
+from explain import class_indices, explain_rows, explainer_for, loaded_explainers, unsupported_explanation
+from memory_report import AllocationTracker, component_sizes, process_memory
+from model_registry import ClinicModelRegistry
+from overbooking import simulate_overbooking
+from prediction_journal import PredictionJournal, artifact_version
+from profiler import SamplingProfiler
+from request_logger import AsyncRequestLogger
+from retrain_jobs import RetrainJobManager
+from scheduler import SlotAllocator
+from shadow_eval import ShadowEvaluator
+from text_features import HASHED_TRIAGE_FILE
+from triage_rules import TriageRules
 
 app = Flask(__name__)
 
+# Append-only binary journal of served features and predictions (the retraining source)
+prediction_journal = PredictionJournal.from_env()
+
+def _artifact_version(path):
+    """Hash of a model artifact, registered with the journal so records can be traced to it"""
+    version = artifact_version(path)
+    prediction_journal.register_version(version, path)
+    return version
+
+# Every served artifact in one immutable bundle. Handlers read serving_models once per
+# request and a reload swaps in a whole new bundle with a single assignment, so no
+# request can pair a freshly trained model with the previous scaler or encoder.
+ServingModels = namedtuple("ServingModels", [
+    "triage_model", "triage_scaler", "triage_label_encoder", "triage_features", "triage_model_version",
+    "noshow_model", "noshow_scaler", "noshow_features", "noshow_model_version",
+    "triage_hashed_model", "triage_hashed_version"
+])
+
+def load_triage_artifacts():
+    """The enhanced triage model and its preprocessing artifacts (None when not trained)"""
+    try:
+        triage_model = joblib.load("enhanced_triage_model.pkl")
+        triage_scaler = joblib.load("triage_scaler.pkl")
+        triage_label_encoder = joblib.load("triage_label_encoder.pkl")
+        with open("triage_features.pkl", "rb") as f:
+            triage_features = pickle.load(f)
+        triage_model_version = _artifact_version("enhanced_triage_model.pkl")
+        explainer_for(triage_model)
+        print("✅ Enhanced Triage model loaded successfully")
+    except FileNotFoundError:
+        print("⚠️  Enhanced triage model not found, using fallback")
+        return {
+            "triage_model": None,
+            "triage_scaler": None,
+            "triage_label_encoder": None,
+            "triage_features": None,
+            "triage_model_version": 0
+        }
+    return {
+        "triage_model": triage_model,
+        "triage_scaler": triage_scaler,
+        "triage_label_encoder": triage_label_encoder,
+        "triage_features": triage_features,
+        "triage_model_version": triage_model_version
+    }
+
+def load_noshow_artifacts():
+    """The enhanced no-show model and its preprocessing artifacts (None when not trained)"""
+    try:
+        noshow_model = joblib.load("enhanced_noshow_model.pkl")
+        noshow_scaler = joblib.load("noshow_scaler.pkl")
+        with open("noshow_features.pkl", "rb") as f:
+            noshow_features = pickle.load(f)
+        noshow_model_version = _artifact_version("enhanced_noshow_model.pkl")
+        explainer_for(noshow_model)
+        print("✅ Enhanced No-show model loaded successfully")
+    except FileNotFoundError:
+        print("⚠️  Enhanced no-show model not found, using fallback")
+        return {"noshow_model": None, "noshow_scaler": None, "noshow_features": None, "noshow_model_version": 0}
+    return {
+        "noshow_model": noshow_model,
+        "noshow_scaler": noshow_scaler,
+        "noshow_features": noshow_features,
+        "noshow_model_version": noshow_model_version
+    }
+
+def load_hashed_triage_artifacts():
+    """The optional hashed-text triage variant (trained with --hashed-triage)"""
+    try:
+        triage_hashed_model = joblib.load(HASHED_TRIAGE_FILE)
+        triage_hashed_version = _artifact_version(HASHED_TRIAGE_FILE)
+        print("✅ Hashed-text triage variant loaded successfully")
+    except FileNotFoundError:
+        return {"triage_hashed_model": None, "triage_hashed_version": 0}
+    return {"triage_hashed_model": triage_hashed_model, "triage_hashed_version": triage_hashed_version}
+
+def load_models():
+    """Load every artifact and publish them together"""
+    global serving_models
+    serving_models = ServingModels(**load_triage_artifacts(), **load_noshow_artifacts(),
+                                   **load_hashed_triage_artifacts())
+
 # Load enhanced models
-try:
-    triage_model = joblib.load("enhanced_triage_model.pkl")
-    triage_scaler = joblib.load("triage_scaler.pkl")
-    triage_label_encoder = joblib.load("triage_label_encoder.pkl")
-    with open("triage_features.pkl", "rb") as f:
-        triage_features = pickle.load(f)
-    print("✅ Enhanced Triage model loaded successfully")
-except FileNotFoundError:
-    print("⚠️  Enhanced triage model not found, using fallback")
-    triage_model = None
-    triage_scaler = None
-    triage_label_encoder = None
-    triage_features = None
-
-try:
-    noshow_model = joblib.load("enhanced_noshow_model.pkl")
-    noshow_scaler = joblib.load("noshow_scaler.pkl")
-    with open("noshow_features.pkl", "rb") as f:
-        noshow_features = pickle.load(f)
-    print("✅ Enhanced No-show model loaded successfully")
-except FileNotFoundError:
-    print("⚠️  Enhanced no-show model not found, using fallback")
-    noshow_model = None
-    noshow_scaler = None
-    noshow_features = None
+load_models()
 
 class ImprovedSymptomAnalyzer:
     """Improved symptom analysis with better accuracy"""
     
-    def __init__(self):
-        # Enhanced keyword patterns with severity indicators
-        self.urgent_patterns = [
-            # Chest/heart issues
-            r'\b(chest pain|heart attack|cardiac|छाती दुख्छ|हृदय)\b',
-            # Breathing issues
-            r'\b(difficulty breathing|can\'t breathe|suffocating|सास फेर्न गाह्रो)\b',
-            # Severe symptoms
-            r'\b(severe|intense|unbearable|emergency|गंभीर|आपत्कालीन)\b',
-            # Life-threatening
-            r'\b(stroke|bleeding|unconscious|poisoning|बेहोस|रक्तस्राव)\b'
-        ]
+    # Nepali medical terms and their English equivalents, replaced in this order
+    translations = {
+        # Pain and symptoms
+        'छाती दुख्छ': 'chest pain',
+        'छाती दुखाइ': 'chest pain',
+        'सास फेर्न गाह्रो': 'difficulty breathing',
+        'सास फेर्न गाह्रो छ': 'difficulty breathing',
+        'ज्वरो': 'fever',
+        'ताप': 'fever',
+        'टाउको दुखाइ': 'headache',
+        'टाउको दुख्छ': 'headache',
+        'पेट दुखाइ': 'stomach pain',
+        'पेट दुख्छ': 'stomach pain',
+        'ढाड दुखाइ': 'back pain',
+        'ढाड दुख्छ': 'back pain',
+        'वमन': 'vomiting',
+        'उल्टी': 'vomiting',
+        'चक्कर': 'dizziness',
+        'चक्कर आउँछ': 'dizziness',
+        'थकान': 'fatigue',
+        'थकाइ': 'fatigue',
+        'कमजोरी': 'weakness',
+        'गंभीर': 'severe',
+        'हल्का': 'mild',
+        'सानो': 'minor',
+        'रक्तस्राव': 'bleeding',
+        'रगत': 'bleeding',
+        'बेहोस': 'unconscious',
+        'खोकी': 'cough',
+        'नियमित': 'routine',
+        'जाँच': 'checkup',
+        'परामर्श': 'consultation',
         
-        self.moderate_patterns = [
-            # Fever patterns
-            r'\b(fever|temperature|hot|ज्वरो|ताप)\b',
-            # Pain patterns
-            r'\b(headache|head pain|टाउको दुखाइ)\b',
-            # Digestive issues
-            r'\b(nausea|vomiting|sick|वमन|छाती दुखाइ)\b',
-            # General symptoms
-            r'\b(cough|fatigue|weakness|खोकी|थकान|कमजोरी)\b'
-        ]
+        # Body parts
+        'छाती': 'chest',
+        'टाउको': 'head',
+        'पेट': 'stomach',
+        'ढाड': 'back',
+        'हात': 'hand',
+        'खुट्टा': 'leg',
+        'आँखा': 'eye',
+        'कान': 'ear',
+        'नाक': 'nose',
+        'मुख': 'mouth',
         
-        self.routine_patterns = [
-            r'\b(routine|checkup|consultation|नियमित|जाँच)\b',
-            r'\b(mild|minor|हल्का|सानो)\b',
-            r'\b(cold|skin rash|रूखो|छाला)\b'
-        ]
+        # Medical conditions
+        'हृदय': 'heart',
+        'हृदयघात': 'heart attack',
+        'मधुमेह': 'diabetes',
+        'रक्तचाप': 'blood pressure',
+        'अस्थमा': 'asthma',
+        'अल्सर': 'ulcer',
+        'क्यान्सर': 'cancer',
+        'संक्रमण': 'infection',
+        'एलर्जी': 'allergy',
         
-        # Severity modifiers
-        self.severity_modifiers = {
-            'high': ['high', 'severe', 'intense', 'unbearable', 'गंभीर'],
-            'moderate': ['moderate', 'some', 'mild', 'हल्का'],
-            'low': ['low', 'slight', 'minor', 'सानो']
-        }
+        # Severity and urgency
+        'आपत्कालीन': 'emergency',
+        'तत्काल': 'immediate',
+        'धेरै': 'very',
+        'अलि': 'little',
+        'कम': 'less',
+        'बढी': 'more',
+        
+        # Time references
+        'आज': 'today',
+        'हिजो': 'yesterday',
+        'भोलि': 'tomorrow',
+        'हाल': 'recently',
+        'लामो समय': 'long time',
+        'छोटो समय': 'short time'
+    }
+    
+    def __init__(self, rules=None):
+        # Keyword patterns, severity weights and age rules live in triage_rules.json
+        self.rules = rules or TriageRules.from_env(extra_vocabulary=self.translations.keys())
     
     def extract_symptoms_improved(self, text):
         """Improved symptom extraction with pattern matching"""
-        text_lower = text.lower()
-        
-        # Count pattern matches
-        urgent_count = sum(len(re.findall(pattern, text_lower, re.IGNORECASE)) 
-                          for pattern in self.urgent_patterns)
-        moderate_count = sum(len(re.findall(pattern, text_lower, re.IGNORECASE)) 
-                            for pattern in self.moderate_patterns)
-        routine_count = sum(len(re.findall(pattern, text_lower, re.IGNORECASE)) 
-                           for pattern in self.routine_patterns)
-        
-        # Check for severity modifiers
-        severity_score = 0
-        for severity, modifiers in self.severity_modifiers.items():
-            for modifier in modifiers:
-                if modifier in text_lower:
-                    if severity == 'high':
-                        severity_score += 2
-                    elif severity == 'moderate':
-                        severity_score += 1
-                    else:
-                        severity_score -= 1
-        
-        # Extract specific symptoms
-        symptoms = {
-            'fever': 1 if re.search(r'\b(fever|temperature|hot|ज्वरो)\b', text_lower) else 0,
-            'chest_pain': 1 if re.search(r'\b(chest|heart|cardiac|छाती)\b', text_lower) else 0,
-            'breathing_difficulty': 1 if re.search(r'\b(breathing|breath|respiratory|सास)\b', text_lower) else 0,
-            'severe_pain': 1 if re.search(r'\b(severe|intense|unbearable|गंभीर)\b', text_lower) else 0,
-            'bleeding': 1 if re.search(r'\b(bleeding|blood|hemorrhage|रक्त)\b', text_lower) else 0,
-            'headache': 1 if re.search(r'\b(headache|head pain|टाउको)\b', text_lower) else 0,
-            'nausea': 1 if re.search(r'\b(nausea|vomiting|sick|वमन)\b', text_lower) else 0,
-            'dizziness': 1 if re.search(r'\b(dizzy|dizziness|vertigo|चक्कर)\b', text_lower) else 0
-        }
-        
-        return symptoms, {
-            'urgent_count': urgent_count,
-            'moderate_count': moderate_count,
-            'routine_count': routine_count,
-            'severity_score': severity_score
-        }
+        return self.rules.current().extract(text)
     
-    def get_urgency_improved(self, text, age=30):
-        """Improved urgency classification"""
-        symptoms, analysis = self.extract_symptoms_improved(text)
-        
-        # Base urgency calculation
-        if analysis['urgent_count'] > 0 or analysis['severity_score'] >= 2:
-            return 'urgent'
-        elif analysis['moderate_count'] > 0 or analysis['severity_score'] >= 1:
-            return 'moderate'
-        elif analysis['routine_count'] > 0:
-            return 'routine'
-        
-        # Age-based adjustments
-        if age > 65 and (symptoms['fever'] or symptoms['chest_pain']):
-            return 'moderate'
-        elif age > 75 and any(symptoms.values()):
-            return 'moderate'
-        
-        # Default to routine if no clear indicators
-        return 'routine'
+    def get_urgency_improved(self, text, age=30, extracted=None):
+        """Improved urgency classification; pass extracted=(symptoms, analysis) to skip re-extraction"""
+        rules = self.rules.current()
+        symptoms, analysis = extracted if extracted is not None else rules.extract(text)
+        return rules.decide(symptoms, analysis, age)
     
     def detect_language(self, text):
         """Enhanced language detection for English and Nepali"""
@@ -174,96 +243,261 @@ class ImprovedSymptomAnalyzer:
     
     def translate_nepali_to_english(self, text):
         """Enhanced Nepali to English translation for medical terms"""
-        translations = {
-            # Pain and symptoms
-            'छाती दुख्छ': 'chest pain',
-            'छाती दुखाइ': 'chest pain',
-            'सास फेर्न गाह्रो': 'difficulty breathing',
-            'सास फेर्न गाह्रो छ': 'difficulty breathing',
-            'ज्वरो': 'fever',
-            'ताप': 'fever',
-            'टाउको दुखाइ': 'headache',
-            'टाउको दुख्छ': 'headache',
-            'पेट दुखाइ': 'stomach pain',
-            'पेट दुख्छ': 'stomach pain',
-            'ढाड दुखाइ': 'back pain',
-            'ढाड दुख्छ': 'back pain',
-            'वमन': 'vomiting',
-            'उल्टी': 'vomiting',
-            'चक्कर': 'dizziness',
-            'चक्कर आउँछ': 'dizziness',
-            'थकान': 'fatigue',
-            'थकाइ': 'fatigue',
-            'कमजोरी': 'weakness',
-            'गंभीर': 'severe',
-            'हल्का': 'mild',
-            'सानो': 'minor',
-            'रक्तस्राव': 'bleeding',
-            'रगत': 'bleeding',
-            'बेहोस': 'unconscious',
-            'खोकी': 'cough',
-            'नियमित': 'routine',
-            'जाँच': 'checkup',
-            'परामर्श': 'consultation',
-            
-            # Body parts
-            'छाती': 'chest',
-            'टाउको': 'head',
-            'पेट': 'stomach',
-            'ढाड': 'back',
-            'हात': 'hand',
-            'खुट्टा': 'leg',
-            'आँखा': 'eye',
-            'कान': 'ear',
-            'नाक': 'nose',
-            'मुख': 'mouth',
-            
-            # Medical conditions
-            'हृदय': 'heart',
-            'हृदयघात': 'heart attack',
-            'मधुमेह': 'diabetes',
-            'रक्तचाप': 'blood pressure',
-            'अस्थमा': 'asthma',
-            'अल्सर': 'ulcer',
-            'क्यान्सर': 'cancer',
-            'संक्रमण': 'infection',
-            'एलर्जी': 'allergy',
-            
-            # Severity and urgency
-            'आपत्कालीन': 'emergency',
-            'तत्काल': 'immediate',
-            'धेरै': 'very',
-            'अलि': 'little',
-            'कम': 'less',
-            'बढी': 'more',
-            
-            # Time references
-            'आज': 'today',
-            'हिजो': 'yesterday',
-            'भोलि': 'tomorrow',
-            'हाल': 'recently',
-            'लामो समय': 'long time',
-            'छोटो समय': 'short time'
-        }
+        # Fix misspelled Nepali terms first so the dictionary replacements below hit
+        rules = self.rules.current()
+        if rules.fuzzy is not None:
+            text = rules.fuzzy.correct(text)
         
         translated = text
-        for nepali, english in translations.items():
+        for nepali, english in self.translations.items():
             translated = translated.replace(nepali, english)
         
         return translated
 
 symptom_analyzer = ImprovedSymptomAnalyzer()
 
+# Structured request logging from a background thread (patient text redacted by default)
+request_logger = AsyncRequestLogger.from_env()
+
+# Streaming feature/prediction summaries compared against the training reference
+drift_monitor = DriftMonitor(reference=load_reference())
+
+# Rolling per-clinic urgency/no-show/fallback counts for the analytics dashboards
+prediction_aggregates = TimeBucketAggregator.from_env()
+
+# Shadow evaluation of candidate models (disabled unless candidate artifacts exist)
+shadow_evaluator = ShadowEvaluator.from_env(fallback_label_encoder=serving_models.triage_label_encoder)
+
+def _default_noshow_model():
+    """(model, scaler, version) of the global no-show model, all from the same bundle"""
+    models = serving_models
+    return models.noshow_model, models.noshow_scaler, models.noshow_model_version
+
+# Per-clinic no-show models, loaded lazily; clinics without one use the global model
+clinic_noshow_models = ClinicModelRegistry.from_env(
+    default=_default_noshow_model,
+    logger=request_logger
+)
+
+# Spatial index over clinic coordinates for nearest-clinic and distance features
+clinic_index = ClinicSpatialIndex.from_file()
+
+# Distance fed to the no-show model when it cannot be computed from coordinates
+DEFAULT_DISTANCE_KM = 5
+
+def _patient_coordinates(data):
+    """(latitude, longitude) of the patient, (None, None) when not sent; raises ValueError if invalid"""
+    lat, lon = data.get("patient_latitude"), data.get("patient_longitude")
+    if lat is None or lon is None:
+        return None, None
+    try:
+        lat, lon = _finite(lat, "patient_latitude"), _finite(lon, "patient_longitude")
+    except (TypeError, ValueError):
+        raise ValueError("patient_latitude and patient_longitude must be finite numbers")
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError("patient_latitude/patient_longitude out of range")
+    return lat, lon
+
+def _distance_from_coordinates(data):
+    """(patient-to-clinic distance in km, source) from coordinates, or the 5 km default.
+    
+    A clinic_id the index does not know gives no distance (None) rather than
+    the nearest clinic's, which would be a different place.
+    """
+    lat, lon = _patient_coordinates(data)
+    if lat is None:
+        return DEFAULT_DISTANCE_KM, "default"
+    
+    clinic_id = data.get("clinic_id")
+    if clinic_id is not None:
+        distance = clinic_index.distance_to([clinic_id], [lat], [lon])[0]
+        if np.isnan(distance):
+            return None, "unknown_clinic"
+        return round(float(distance), 3), "clinic"
+    
+    _, distances = clinic_index.nearest(lat, lon, k=1)
+    if distances is None:
+        return DEFAULT_DISTANCE_KM, "default"
+    return round(distances[0][0], 3), "nearest_clinic"
+
+# Weather regions are 0.5-degree grid cells unless the request or clinic record names one
+WEATHER_GRID_DEGREES = 0.5
+
+# Share of a request's latency budget a weather lookup may use; the rest is left for scoring
+WEATHER_BUDGET_SHARE = float(os.getenv("AI_WEATHER_BUDGET_SHARE", "0.5"))
+
+def _weather_region(row):
+    """Region key for weather lookups: explicit region, the clinic's region, or a coordinate cell"""
+    if row.get("region"):
+        return row["region"]
+    clinic = clinic_index.clinic(row.get("clinic_id")) if row.get("clinic_id") is not None else None
+    if clinic is not None and clinic.get("region"):
+        return clinic["region"]
+    if clinic is not None:
+        lat, lon = clinic["latitude"], clinic["longitude"]
+    else:
+        lat, lon = row.get("patient_latitude"), row.get("patient_longitude")
+    try:
+        lat, lon = float(lat), float(lon)
+    except (TypeError, ValueError):
+        return None
+    cell = WEATHER_GRID_DEGREES
+    return f"{np.floor(lat / cell) * cell:.1f},{np.floor(lon / cell) * cell:.1f}"
+
+# Day/time from appointment_time and cached, batched weather lookups for the no-show inputs
+noshow_enricher = NoShowEnricher.from_env(region_for=_weather_region, logger=request_logger)
+
+# Free-slot calendars for urgency- and risk-aware batch scheduling
+slot_allocator = SlotAllocator()
+
+# Deadline-aware load shedding between the model path and the cheap fallbacks
+admission_controller = AdmissionController.from_env()
+
+# Single-queue retraining runner; after a successful job reloads the served models
+# ("enhanced") or the shadow candidates trained from the journal ("logs")
+def _reload_after_retrain(kind):
+    if kind == "enhanced":
+        load_models()
+    elif kind == "logs":
+        shadow_evaluator.reload()
+
+retrain_manager = RetrainJobManager.from_env(
+    workdir=os.path.dirname(os.path.abspath(__file__)),
+    on_success=_reload_after_retrain
+)
+
+def require_admin(view):
+    """Require X-Admin-Token (when AI_ADMIN_TOKEN is set) or a loopback caller"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = os.getenv("AI_ADMIN_TOKEN")
+        if token:
+            allowed = request.headers.get("X-Admin-Token") == token
+        else:
+            allowed = request.remote_addr in ("127.0.0.1", "::1")
+        if not allowed:
+            return jsonify({"error": "Admin access required"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+# On-demand sampling profiler; the hooks below cost one attribute read while it is off
+profiler = SamplingProfiler.from_env()
+
+@app.before_request
+def _profile_request_start():
+    if profiler.active:
+        profiler.begin_request()
+
+@app.teardown_request
+def _profile_request_end(exc):
+    if profiler.active:
+        profiler.end_request()
+
+# tracemalloc snapshots for finding leaks under sustained load (off until started)
+allocation_tracker = AllocationTracker()
+
+def _memory_components():
+    """What GET /memory sizes; callables so reloaded models and grown caches are picked up"""
+    return {
+        "triage_model": lambda: serving_models.triage_model,
+        "triage_preprocessing": lambda: [serving_models.triage_scaler, serving_models.triage_label_encoder,
+                                         serving_models.triage_features],
+        "triage_hashed_model": lambda: serving_models.triage_hashed_model,
+        "noshow_model": lambda: serving_models.noshow_model,
+        "noshow_preprocessing": lambda: [serving_models.noshow_scaler, serving_models.noshow_features],
+        "clinic_noshow_models": lambda: clinic_noshow_models.models,
+        # Explainer tables only; the models they wrap are counted above
+        "explainers": lambda: [{k: v for k, v in vars(e).items() if k != "model"} for e in loaded_explainers()],
+        "shadow_candidates": lambda: shadow_evaluator.candidates,
+        "triage_rules": lambda: symptom_analyzer.rules,
+        "drift_monitor": lambda: drift_monitor,
+        "prediction_aggregates": lambda: prediction_aggregates,
+        "clinic_index": lambda: clinic_index.snapshot,
+        "weather_cache": lambda: noshow_enricher.weather,
+        "slot_allocator": lambda: slot_allocator,
+        "request_log_queue": lambda: request_logger.queue,
+        "prediction_journal_queue": lambda: prediction_journal.queue,
+        "retrain_jobs": lambda: retrain_manager,
+        "profiles": lambda: profiler.sessions
+    }
+
+def _request_budget_ms(read_body=True):
+    """Latency budget from the deadline_ms body field or X-Deadline-Ms header"""
+    data = (request.get_json(silent=True) or {}) if read_body else {}
+    budget = data.get("deadline_ms", request.headers.get("X-Deadline-Ms"))
+    try:
+        return float(budget) if budget is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def _weather_timeout(budget_ms):
+    """Seconds a weather lookup may take out of the request's latency budget (None: unbounded)"""
+    if budget_ms is None:
+        return None
+    return max(0.0, budget_ms * WEATHER_BUDGET_SHARE / 1000)
+
+def admission_controlled(endpoint):
+    """Route a scoring endpoint to the model, the fallback path, or reject it"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            path = admission_controller.acquire(endpoint, _request_budget_ms())
+            if path == "rejected":
+                return jsonify({
+                    "error": "Latency budget cannot be met, request shed",
+                    "serving_path": "rejected"
+                }), 503
+            
+            # Views read serving_path and record the path they actually took in path_used
+            g.serving_path = path
+            g.path_used = "error_fallback"
+            start = time.perf_counter()
+            try:
+                return view(*args, **kwargs)
+            finally:
+                latency_ms = (time.perf_counter() - start) * 1000
+                admission_controller.release(endpoint, g.path_used, latency_ms)
+        return wrapper
+    return decorator
+
+# Column order of the feature rows built below (matches the training feature lists)
+TRIAGE_FEATURE_NAMES = ["age", "fever", "chest_pain", "breathing_difficulty", "severe_pain", "bleeding"]
+NOSHOW_FEATURE_NAMES = ["age", "distance", "history_missed", "weather_bad", "day_of_week",
+                        "time_of_day", "reliability_score"]
+
+# The hashed variant's sparse n-gram inputs have no per-feature explainer
+HASHED_EXPLANATION = unsupported_explanation("hashed-text variant")
+
+def _finite(value, name):
+    """float(value), rejecting NaN/Infinity (which JSON parsing lets through) before they reach the models"""
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be a finite number")
+    return number
+
+def _triage_version(path_used, use_hashed, models):
+    """Journal model_version for the triage model that served a request (0 for fallbacks)"""
+    if path_used != "model":
+        return 0
+    return models.triage_hashed_version if use_hashed else models.triage_model_version
+
 @app.route("/enhanced-ml-triage", methods=["POST"])
+@admission_controlled("enhanced-ml-triage")
 def enhanced_ml_triage():
     """Enhanced ML-based triage with better accuracy"""
     data = request.json
+    models = serving_models
     age = data.get("age", 30)
     symptoms_text = data.get("symptoms", "")
+    use_hashed = data.get("model_variant") == "hashed" and models.triage_hashed_model is not None
+    explain = bool(data.get("explain"))
+    extracted = None
+    explanation = None
     
     try:
         # Extract symptoms using improved analyzer
-        extracted_symptoms, analysis = symptom_analyzer.extract_symptoms_improved(symptoms_text)
+        extracted = symptom_analyzer.extract_symptoms_improved(symptoms_text)
+        extracted_symptoms, analysis = extracted
         
         # Prepare features for model
         features = np.array([[
@@ -275,56 +509,130 @@ def enhanced_ml_triage():
             extracted_symptoms['bleeding']
         ]])
         
-        if triage_model is not None:
+        if use_hashed and g.serving_path == "model":
+            # Hashed n-gram variant: flags plus the free text
+            g.path_used = "model"
+            labels, confidences = models.triage_hashed_model.predict(features, [symptoms_text])
+            urgency, confidence = labels[0], float(confidences[0])
+            if explain:
+                explanation = HASHED_EXPLANATION
+        elif models.triage_model is not None and g.serving_path == "model":
             # Use enhanced model
-            if triage_scaler is not None:
-                features_scaled = triage_scaler.transform(features)
-                pred_encoded = triage_model.predict(features_scaled)[0]
+            g.path_used = "model"
+            start = time.perf_counter()
+            if models.triage_scaler is not None:
+                features_scaled = models.triage_scaler.transform(features)
+                pred_encoded = models.triage_model.predict(features_scaled)[0]
             else:
-                pred_encoded = triage_model.predict(features)[0]
+                pred_encoded = models.triage_model.predict(features)[0]
             
             # Decode prediction
-            urgency = triage_label_encoder.inverse_transform([pred_encoded])[0]
+            urgency = models.triage_label_encoder.inverse_transform([pred_encoded])[0]
             
             # Get confidence score
-            if hasattr(triage_model, 'predict_proba'):
-                if triage_scaler is not None:
-                    proba = triage_model.predict_proba(features_scaled)[0]
+            proba = None
+            if hasattr(models.triage_model, 'predict_proba'):
+                if models.triage_scaler is not None:
+                    proba = models.triage_model.predict_proba(features_scaled)
                 else:
-                    proba = triage_model.predict_proba(features)[0]
-                confidence = max(proba)
+                    proba = models.triage_model.predict_proba(features)
+                confidence = max(proba[0])
             else:
                 confidence = 0.8
+            
+            latency_ms = (time.perf_counter() - start) * 1000
+            shadow_evaluator.submit('triage', features, urgency, confidence, latency_ms)
+            
+            if explain:
+                explanation = explain_rows(
+                    explainer_for(models.triage_model),
+                    features_scaled if models.triage_scaler is not None else features,
+                    class_indices(models.triage_model, [pred_encoded]), TRIAGE_FEATURE_NAMES, [urgency]
+                )[0]
         else:
             # Fallback to improved keyword analysis
-            urgency = symptom_analyzer.get_urgency_improved(symptoms_text, age)
+            g.path_used = "keyword_fallback"
+            urgency = symptom_analyzer.get_urgency_improved(symptoms_text, age, extracted)
             confidence = 0.6
         
+        drift_monitor.observe_triage(age, extracted_symptoms, urgency)
+        prediction_aggregates.record_triage(data.get("clinic_id"), urgency, g.path_used)
+        prediction_journal.record_triage(age, extracted_symptoms, urgency, confidence, g.path_used,
+                                         _triage_version(g.path_used, use_hashed, models), data.get("clinic_id"))
+        
         return jsonify({
             "urgency": urgency,
             "confidence": round(confidence, 3),
             "extracted_symptoms": extracted_symptoms,
             "analysis": analysis,
-            "model_used": "enhanced" if triage_model is not None else "fallback"
+            "explanation": explanation,
+            "model_used": "enhanced" if g.path_used == "model" else "fallback",
+            "model_variant": "hashed" if use_hashed and g.path_used == "model" else "default",
+            "serving_path": g.path_used
         })
         
     except Exception as e:
-        print(f"Error in enhanced triage: {e}")
+        request_logger.log("enhanced-ml-triage", "error", level="error", error=str(e))
+        g.path_used = "error_fallback"
         # Fallback
-        urgency = symptom_analyzer.get_urgency_improved(symptoms_text, age)
+        urgency = symptom_analyzer.get_urgency_improved(symptoms_text, age, extracted)
+        prediction_aggregates.record_triage(data.get("clinic_id"), urgency, g.path_used)
         return jsonify({
             "urgency": urgency,
             "confidence": 0.5,
             "error": str(e),
-            "model_used": "fallback"
+            "model_used": "fallback",
+            "serving_path": "error_fallback"
         })
 
+def _heuristic_noshow_risk(age, distance, history_missed, weather_bad, day_of_week,
+                           time_of_day, reliability_score, appointment_type):
+    """Rule-of-thumb no-show risk used when the model path is unavailable or shed"""
+    base_prob = 0.15
+    
+    # Risk factors
+    if distance > 15:
+        base_prob += 0.1
+    if history_missed > 3:
+        base_prob += 0.2
+    if weather_bad:
+        base_prob += 0.1
+    if day_of_week == 6:  # Sunday
+        base_prob += 0.05
+    if time_of_day == 2:  # Evening
+        base_prob += 0.05
+    if age > 70:
+        base_prob += 0.05
+    
+    # Protective factors
+    if appointment_type == 'urgent':
+        base_prob -= 0.1
+    if reliability_score > 0.8:
+        base_prob -= 0.05
+    
+    return round(max(0, min(1, base_prob)), 3)
+
 @app.route("/enhanced-noshow-ml", methods=["POST"])
+@admission_controlled("enhanced-noshow-ml")
 def enhanced_noshow_ml():
     """Enhanced no-show prediction with better accuracy"""
-    data = request.json
+    try:
+        _patient_coordinates(request.json)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    # Shed requests only use cached weather; the lookup itself costs latency
+    (data,), (enrichment,) = noshow_enricher.enrich(
+        [request.json],
+        fetch=g.serving_path == "model",
+        timeout=_weather_timeout(_request_budget_ms())
+    )
     age = data.get("age", 30)
-    distance = data.get("distance", 5)
+    distance = data.get("distance")
+    distance_source = "supplied"
+    if distance is None:
+        distance, distance_source = _distance_from_coordinates(data)
+    model_distance = distance if distance is not None else DEFAULT_DISTANCE_KM
     history_missed = data.get("history_missed", 0)
     weather_bad = data.get("weather_bad", 0)
     
@@ -332,6 +640,8 @@ def enhanced_noshow_ml():
     day_of_week = data.get("day_of_week", 1)  # Default to Tuesday
     time_of_day = data.get("time_of_day", 1)  # Default to afternoon
     appointment_type = data.get("appointment_type", "routine")
+    explain = bool(data.get("explain"))
+    explanation = None
     
     # Calculate reliability score
     reliability_score = max(0, 1 - (history_missed * 0.2))
@@ -340,7 +650,7 @@ def enhanced_noshow_ml():
         # Prepare features
         features = np.array([[
             age,
-            distance,
+            model_distance,
             history_missed,
             weather_bad,
             day_of_week,
@@ -348,72 +658,91 @@ def enhanced_noshow_ml():
             reliability_score
         ]])
         
-        if noshow_model is not None:
-            # Use enhanced model
-            if noshow_scaler is not None:
-                features_scaled = noshow_scaler.transform(features)
-                prob = noshow_model.predict_proba(features_scaled)[0][1]
+        model, scaler, model_source, model_version = None, None, None, 0
+        if g.serving_path == "model":
+            model, scaler, model_source, model_version = clinic_noshow_models.get(data.get("clinic_id"))
+        
+        if model is not None:
+            # Use the clinic's model, or the enhanced global model
+            g.path_used = "model"
+            start = time.perf_counter()
+            if scaler is not None:
+                features_scaled = scaler.transform(features)
+                proba = model.predict_proba(features_scaled)
             else:
-                prob = noshow_model.predict_proba(features)[0][1]
+                proba = model.predict_proba(features)
+            prob = proba[0][1]
             
             risk = round(float(prob), 3)
             confidence = 0.85
-        else:
-            # Enhanced fallback calculation
-            base_prob = 0.15
             
-            # Risk factors
-            if distance > 15:
-                base_prob += 0.1
-            if history_missed > 3:
-                base_prob += 0.2
-            if weather_bad:
-                base_prob += 0.1
-            if day_of_week == 6:  # Sunday
-                base_prob += 0.05
-            if time_of_day == 2:  # Evening
-                base_prob += 0.05
-            if age > 70:
-                base_prob += 0.05
+            latency_ms = (time.perf_counter() - start) * 1000
+            if model_source == "default":
+                # Candidates are compared against the global model only
+                shadow_evaluator.submit('noshow', features, prob >= 0.5, float(prob), latency_ms)
             
-            # Protective factors
-            if appointment_type == 'urgent':
-                base_prob -= 0.1
-            if reliability_score > 0.8:
-                base_prob -= 0.05
-            
-            risk = round(max(0, min(1, base_prob)), 3)
+            if explain:
+                # Explain the no-show class, whatever the prediction
+                explanation = explain_rows(
+                    explainer_for(model),
+                    features_scaled if scaler is not None else features,
+                    class_indices(model, [1]), NOSHOW_FEATURE_NAMES, ["no_show"]
+                )[0]
+        else:
+            # Enhanced fallback calculation
+            g.path_used = "heuristic_fallback"
+            risk = _heuristic_noshow_risk(age, model_distance, history_missed, weather_bad, day_of_week,
+                                          time_of_day, reliability_score, appointment_type)
             confidence = 0.6
         
+        drift_monitor.observe_noshow(age, model_distance, history_missed, risk)
+        prediction_aggregates.record_noshow(data.get("clinic_id"), risk, g.path_used)
+        prediction_journal.record_noshow(features[0], risk, confidence, g.path_used,
+                                         model_version if g.path_used == "model" else 0,
+                                         data.get("clinic_id"))
+        
         return jsonify({
             "no_show_risk": risk,
             "confidence": confidence,
             "risk_factors": {
-                "distance_risk": "high" if distance > 15 else "low",
+                "distance_risk": "high" if model_distance > 15 else "low",
                 "history_risk": "high" if history_missed > 3 else "low",
                 "weather_risk": "high" if weather_bad else "low",
                 "reliability_score": round(reliability_score, 2)
             },
-            "model_used": "enhanced" if noshow_model is not None else "fallback"
+            "distance_km": distance,
+            "distance_source": distance_source,
+            "enrichment": enrichment,
+            "explanation": explanation,
+            "model_source": model_source if g.path_used == "model" else None,
+            "model_used": "enhanced" if g.path_used == "model" else "fallback",
+            "serving_path": g.path_used
         })
         
     except Exception as e:
-        print(f"Error in enhanced no-show prediction: {e}")
+        request_logger.log("enhanced-noshow-ml", "error", level="error", error=str(e))
+        g.path_used = "error_fallback"
         # Simple fallback
         risk = round(random.uniform(0.1, 0.4), 3)
+        prediction_aggregates.record_noshow(data.get("clinic_id"), risk, g.path_used)
         return jsonify({
             "no_show_risk": risk,
             "confidence": 0.3,
             "error": str(e),
-            "model_used": "fallback"
+            "model_used": "fallback",
+            "serving_path": "error_fallback"
         })
 
 @app.route("/enhanced-nlp-triage", methods=["POST"])
+@admission_controlled("enhanced-nlp-triage")
 def enhanced_nlp_triage():
     """Enhanced NLP triage with multilingual support"""
     data = request.json
+    models = serving_models
     symptoms = data.get("symptoms", "")
     age = data.get("age", 30)
+    use_hashed = data.get("model_variant") == "hashed" and models.triage_hashed_model is not None
+    extracted = None
     
     try:
         # Step 1: Detect language
@@ -425,11 +754,12 @@ def enhanced_nlp_triage():
         else:
             translated = symptoms
             
-        print(f"🌐 Original: {symptoms} (Language: {detected_lang})")
-        print(f"🔄 Translated: {translated}")
+        request_logger.log("enhanced-nlp-triage", "translated", language=detected_lang,
+                           original=symptoms, translated=translated)
         
         # Step 3: Extract features using improved analyzer
-        extracted_symptoms, analysis = symptom_analyzer.extract_symptoms_improved(translated)
+        extracted = symptom_analyzer.extract_symptoms_improved(translated)
+        extracted_symptoms, analysis = extracted
         
         # Step 4: Use enhanced ML model
         features = np.array([[
@@ -441,22 +771,37 @@ def enhanced_nlp_triage():
             extracted_symptoms['bleeding']
         ]])
         
-        if triage_model is not None:
-            if triage_scaler is not None:
-                features_scaled = triage_scaler.transform(features)
-                pred_encoded = triage_model.predict(features_scaled)[0]
-                proba = triage_model.predict_proba(features_scaled)[0]
+        if use_hashed and g.serving_path == "model":
+            g.path_used = "model"
+            labels, confidences = models.triage_hashed_model.predict(features, [translated])
+            urgency, confidence = labels[0], float(confidences[0])
+        elif models.triage_model is not None and g.serving_path == "model":
+            g.path_used = "model"
+            start = time.perf_counter()
+            if models.triage_scaler is not None:
+                features_scaled = models.triage_scaler.transform(features)
+                pred_encoded = models.triage_model.predict(features_scaled)[0]
+                proba = models.triage_model.predict_proba(features_scaled)[0]
             else:
-                pred_encoded = triage_model.predict(features)[0]
-                proba = triage_model.predict_proba(features)[0]
+                pred_encoded = models.triage_model.predict(features)[0]
+                proba = models.triage_model.predict_proba(features)[0]
             
-            urgency = triage_label_encoder.inverse_transform([pred_encoded])[0]
+            urgency = models.triage_label_encoder.inverse_transform([pred_encoded])[0]
             confidence = max(proba)
+            
+            latency_ms = (time.perf_counter() - start) * 1000
+            shadow_evaluator.submit('triage', features, urgency, confidence, latency_ms)
         else:
             # Fallback to improved keyword analysis
-            urgency = symptom_analyzer.get_urgency_improved(translated, age)
+            g.path_used = "keyword_fallback"
+            urgency = symptom_analyzer.get_urgency_improved(translated, age, extracted)
             confidence = 0.6
         
+        drift_monitor.observe_triage(age, extracted_symptoms, urgency)
+        prediction_aggregates.record_triage(data.get("clinic_id"), urgency, g.path_used)
+        prediction_journal.record_triage(age, extracted_symptoms, urgency, confidence, g.path_used,
+                                         _triage_version(g.path_used, use_hashed, models), data.get("clinic_id"))
+        
         return jsonify({
             "original": symptoms,
             "translated": translated,
@@ -465,13 +810,17 @@ def enhanced_nlp_triage():
             "confidence": round(confidence, 3),
             "extracted_symptoms": extracted_symptoms,
             "analysis": analysis,
-            "model_used": "enhanced" if triage_model is not None else "fallback"
+            "model_used": "enhanced" if g.path_used == "model" else "fallback",
+            "model_variant": "hashed" if use_hashed and g.path_used == "model" else "default",
+            "serving_path": g.path_used
         })
         
     except Exception as e:
-        print(f"❌ Enhanced NLP triage error: {e}")
+        request_logger.log("enhanced-nlp-triage", "error", level="error", error=str(e))
+        g.path_used = "error_fallback"
         # Fallback
-        urgency = symptom_analyzer.get_urgency_improved(symptoms, age)
+        urgency = symptom_analyzer.get_urgency_improved(symptoms, age, extracted)
+        prediction_aggregates.record_triage(data.get("clinic_id"), urgency, g.path_used)
         return jsonify({
             "original": symptoms,
             "translated": symptoms,
@@ -479,8 +828,283 @@ def enhanced_nlp_triage():
             "urgency": urgency,
             "confidence": 0.5,
             "error": str(e),
-            "model_used": "fallback"
+            "model_used": "fallback",
+            "serving_path": "error_fallback"
+        })
+
+MAX_TRIAGE_BATCH = 5000
+
+def _score_triage_rows(rows, ages, serving_path, use_hashed=False, explain=False,
+                       endpoint="enhanced-ml-triage-batch", models=None):
+    """Score validated triage rows with one model call; returns (path_used, results)"""
+    models = models or serving_models
+    use_hashed = use_hashed and models.triage_hashed_model is not None
+    explanations = [None] * len(rows)
+    texts = [row.get("symptoms", "") for row in rows]
+    extracted = [symptom_analyzer.extract_symptoms_improved(text) for text in texts]
+    features = np.array([[
+        age,
+        symptoms['fever'],
+        symptoms['chest_pain'],
+        symptoms['breathing_difficulty'],
+        symptoms['severe_pain'],
+        symptoms['bleeding']
+    ] for age, (symptoms, _) in zip(ages, extracted)], dtype=float).reshape(-1, 6)
+    
+    try:
+        if not rows:
+            path_used = "model" if serving_path == "model" else "keyword_fallback"
+            urgencies, confidences = [], []
+        elif use_hashed and serving_path == "model":
+            path_used = "model"
+            urgencies, confidences = models.triage_hashed_model.predict(features, texts)
+            explanations = [HASHED_EXPLANATION] * len(rows)
+        elif models.triage_model is not None and serving_path == "model":
+            path_used = "model"
+            model_input = models.triage_scaler.transform(features) if models.triage_scaler is not None else features
+            predicted = models.triage_model.predict(model_input)
+            urgencies = models.triage_label_encoder.inverse_transform(predicted)
+            proba = models.triage_model.predict_proba(model_input)
+            confidences = proba.max(axis=1)
+            if explain:
+                explanations = explain_rows(explainer_for(models.triage_model), model_input,
+                                            class_indices(models.triage_model, predicted),
+                                            TRIAGE_FEATURE_NAMES, urgencies)
+        else:
+            path_used = "keyword_fallback"
+            urgencies = symptom_analyzer.rules.current().decide_batch(extracted, ages)
+            confidences = np.full(len(rows), 0.6)
+    except Exception as e:
+        request_logger.log(endpoint, "error", level="error", error=str(e))
+        path_used = "error_fallback"
+        urgencies = symptom_analyzer.rules.current().decide_batch(extracted, ages)
+        confidences = np.full(len(rows), 0.5)
+    
+    version = _triage_version(path_used, use_hashed, models)
+    results = []
+    for row, age, (symptoms, _), urgency, confidence, explanation in zip(
+            rows, ages, extracted, urgencies, confidences, explanations):
+        drift_monitor.observe_triage(age, symptoms, urgency)
+        prediction_aggregates.record_triage(row.get("clinic_id"), urgency, path_used)
+        prediction_journal.record_triage(age, symptoms, urgency, confidence, path_used, version,
+                                         row.get("clinic_id"))
+        result = {"urgency": str(urgency), "confidence": round(float(confidence), 3)}
+        if explain:
+            result["explanation"] = explanation
+        results.append(result)
+    return path_used, results
+
+@app.route("/enhanced-ml-triage/batch", methods=["POST"])
+@admission_controlled("enhanced-ml-triage-batch")
+def enhanced_ml_triage_batch():
+    """Triage a batch of {age, symptoms} rows with one model call (sparse for the hashed variant)"""
+    data = request.get_json(silent=True) or {}
+    rows = data.get("requests", [])
+    models = serving_models
+    if not isinstance(rows, list) or len(rows) > MAX_TRIAGE_BATCH:
+        return jsonify({"error": f"requests must be a list of at most {MAX_TRIAGE_BATCH} rows"}), 400
+    use_hashed = data.get("model_variant") == "hashed" and models.triage_hashed_model is not None
+    start = time.perf_counter()
+    
+    try:
+        ages = [_finite(row.get("age", 30), "age") for row in rows]
+    except (AttributeError, TypeError, ValueError):
+        return jsonify({"error": "Each row needs a finite numeric age"}), 400
+    
+    g.path_used, results = _score_triage_rows(rows, ages, g.serving_path, use_hashed,
+                                              explain=bool(data.get("explain")), models=models)
+    
+    return jsonify({
+        "results": results,
+        "model_variant": "hashed" if use_hashed and g.path_used == "model" else "default",
+        "serving_path": g.path_used,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 3)
+    })
+
+def _noshow_row_features(row):
+    """Model feature row (NOSHOW_FEATURE_NAMES order) for one no-show record"""
+    if not isinstance(row.get("clinic_id"), (str, int, type(None))):
+        raise ValueError("clinic_id must be a string or integer")
+    distance = row.get("distance")
+    if distance is None:
+        distance, _ = _distance_from_coordinates(row)
+        if distance is None:
+            distance = DEFAULT_DISTANCE_KM
+    history_missed = _finite(row.get("history_missed", 0), "history_missed")
+    return [
+        _finite(row.get("age", 30), "age"),
+        _finite(distance, "distance"),
+        history_missed,
+        _finite(row.get("weather_bad", 0), "weather_bad"),
+        _finite(row.get("day_of_week", 1), "day_of_week"),
+        _finite(row.get("time_of_day", 1), "time_of_day"),
+        max(0, 1 - (history_missed * 0.2))
+    ]
+
+def _score_noshow_rows(rows, serving_path, endpoint="enhanced-noshow-ml-stream"):
+    """Enrich and score validated no-show rows, one model call per clinic; returns (path_used, results)"""
+    rows, enrichment = noshow_enricher.enrich(
+        rows,
+        fetch=serving_path == "model",
+        timeout=_weather_timeout(_request_budget_ms(read_body=False))
+    )
+    features = np.array([_noshow_row_features(row) for row in rows], dtype=float).reshape(-1, 7)
+    risks = np.zeros(len(rows))
+    paths = ["heuristic_fallback"] * len(rows)
+    sources = [None] * len(rows)
+    versions = [0] * len(rows)
+    
+    if serving_path == "model":
+        by_clinic = {}
+        for i, row in enumerate(rows):
+            by_clinic.setdefault(row.get("clinic_id"), []).append(i)
+        for clinic_id, index in by_clinic.items():
+            try:
+                model, scaler, source, version = clinic_noshow_models.get(clinic_id)
+                if model is None:
+                    continue
+                model_input = scaler.transform(features[index]) if scaler is not None else features[index]
+                risks[index] = model.predict_proba(model_input)[:, 1]
+                for i in index:
+                    paths[i], sources[i], versions[i] = "model", source, version
+            except Exception as e:
+                request_logger.log(endpoint, "error", level="error", error=str(e))
+                for i in index:
+                    paths[i] = "error_fallback"
+    
+    results = []
+    for i, (row, feature_row) in enumerate(zip(rows, features)):
+        age, distance, history_missed, weather_bad, day_of_week, time_of_day, reliability = feature_row
+        if paths[i] == "model":
+            risk, confidence = round(float(risks[i]), 3), 0.85
+        else:
+            risk = _heuristic_noshow_risk(age, distance, history_missed, weather_bad, day_of_week,
+                                          time_of_day, reliability, row.get("appointment_type", "routine"))
+            confidence = 0.6 if paths[i] == "heuristic_fallback" else 0.3
+        drift_monitor.observe_noshow(age, distance, history_missed, risk)
+        prediction_aggregates.record_noshow(row.get("clinic_id"), risk, paths[i])
+        prediction_journal.record_noshow(feature_row, risk, confidence, paths[i], versions[i],
+                                         row.get("clinic_id"))
+        results.append({
+            "no_show_risk": risk,
+            "confidence": confidence,
+            "model_source": sources[i],
+            "enrichment": enrichment[i],
+            "serving_path": paths[i]
         })
+    
+    if "error_fallback" in paths:
+        path_used = "error_fallback"
+    elif paths and all(path == "model" for path in paths):
+        path_used = "model"
+    else:
+        path_used = "heuristic_fallback"
+    return path_used, results
+
+# Records scored per model call on the streaming endpoints; memory is bounded by this, not the upload
+STREAM_CHUNK_SIZE = int(os.getenv("AI_STREAM_CHUNK_SIZE", "256"))
+MAX_STREAM_LINE_BYTES = 64 * 1024
+
+def _ndjson_records(stream):
+    """(line number, record, error) for each non-blank line of an NDJSON body, read incrementally"""
+    number = 0
+    while True:
+        line = stream.readline(MAX_STREAM_LINE_BYTES + 1)
+        if not line:
+            return
+        number += 1
+        if len(line) > MAX_STREAM_LINE_BYTES:
+            # Skip the rest of an oversized line without buffering it
+            while line and not line.endswith(b"\n"):
+                line = stream.readline(MAX_STREAM_LINE_BYTES)
+            yield number, None, f"line longer than {MAX_STREAM_LINE_BYTES} bytes"
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield number, None, "each line must be a JSON object"
+            continue
+        yield number, record, None
+
+def _ndjson_stream(endpoint, parse, score):
+    """Generator response that scores NDJSON records chunk by chunk as the upload arrives.
+    
+    Each chunk goes through admission control on its own, so a long upload moves to
+    the fallback path under load instead of holding a model slot throughout. Results
+    carry the input line number (and id, when given); a final line summarises the run.
+    """
+    budget_ms = _request_budget_ms(read_body=False)
+    
+    def score_chunk(chunk):
+        path = admission_controller.acquire(endpoint, budget_ms, degrade=True)
+        start = time.perf_counter()
+        path_used = "error_fallback"
+        try:
+            path_used, results = score([record for _, record, _ in chunk], [parsed for _, _, parsed in chunk],
+                                       "fallback" if path == "degraded" else path)
+        finally:
+            if path != "degraded":
+                admission_controller.release(endpoint, path_used, (time.perf_counter() - start) * 1000)
+        lines = []
+        for (number, record, _), result in zip(chunk, results):
+            head = {"line": number, "id": record["id"]} if "id" in record else {"line": number}
+            lines.append(json.dumps({**head, **result}) + "\n")
+        return "".join(lines)
+    
+    def generate():
+        start = time.perf_counter()
+        chunk, scored, errors = [], 0, 0
+        for number, record, error in _ndjson_records(request.stream):
+            if error is None:
+                try:
+                    chunk.append((number, record, parse(record)))
+                except (TypeError, ValueError) as e:
+                    error = str(e)
+            if error is not None:
+                errors += 1
+                yield json.dumps({"line": number, "error": error}) + "\n"
+            elif len(chunk) >= STREAM_CHUNK_SIZE:
+                scored += len(chunk)
+                yield score_chunk(chunk)
+                chunk = []
+        if chunk:
+            scored += len(chunk)
+            yield score_chunk(chunk)
+        yield json.dumps({
+            "done": True,
+            "scored": scored,
+            "errors": errors,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3)
+        }) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+@app.route("/enhanced-ml-triage/stream", methods=["POST"])
+def enhanced_ml_triage_stream():
+    """Triage an NDJSON upload of {age, symptoms} records, streaming NDJSON results back"""
+    use_hashed = request.args.get("model_variant") == "hashed" and serving_models.triage_hashed_model is not None
+    explain = request.args.get("explain", "").lower() in ("1", "true", "yes")
+    endpoint = "enhanced-ml-triage-stream"
+    return _ndjson_stream(
+        endpoint,
+        parse=lambda record: _finite(record.get("age", 30), "age"),
+        score=lambda rows, ages, path: _score_triage_rows(rows, ages, path, use_hashed, explain, endpoint)
+    )
+
+@app.route("/enhanced-noshow-ml/stream", methods=["POST"])
+def enhanced_noshow_ml_stream():
+    """No-show risk for an NDJSON upload of appointment records, streaming NDJSON results back"""
+    endpoint = "enhanced-noshow-ml-stream"
+    return _ndjson_stream(
+        endpoint,
+        parse=_noshow_row_features,
+        score=lambda rows, _, path: _score_noshow_rows(rows, path, endpoint)
+    )
 
 # Keep original endpoints for backward compatibility
 @app.route("/ml-triage", methods=["POST"])
@@ -498,24 +1122,401 @@ def nlp_triage():
     """Original NLP triage endpoint (backward compatibility)"""
     return enhanced_nlp_triage()
 
+@app.route("/shadow", methods=["GET"])
+def shadow_report():
+    """Shadow evaluation statistics for candidate models"""
+    return jsonify(shadow_evaluator.report())
+
+@app.route("/drift", methods=["GET"])
+def drift_report():
+    """Served feature/prediction distributions with population-stability scores"""
+    return jsonify(drift_monitor.report())
+
+@app.route("/journal", methods=["GET"])
+def journal_report():
+    """Prediction journal counters and the segments currently being written"""
+    return jsonify(prediction_journal.report())
+
+@app.route("/enrichment", methods=["GET"])
+def enrichment_report():
+    """Weather cache hit rate, merged lookups and provider latency for no-show enrichment"""
+    return jsonify(noshow_enricher.report())
+
+@app.route("/triage-rules", methods=["GET"])
+def triage_rules_status():
+    """Version and rule order of the keyword triage rules in use"""
+    return jsonify(symptom_analyzer.rules.report())
+
+@app.route("/triage-rules/reload", methods=["POST"])
+@require_admin
+def reload_triage_rules():
+    """Recompile the triage rule file now instead of waiting for the mtime check"""
+    try:
+        compiled = symptom_analyzer.rules.reload()
+    except (OSError, ValueError, KeyError) as e:
+        return jsonify({"error": f"Could not load triage rules: {e}"}), 400
+    return jsonify({"version": compiled.version, "loaded_at": compiled.loaded_at})
+
+def _query_time(value):
+    """Query-string times arrive as strings; accept epoch seconds as well as ISO-8601"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+@app.route("/aggregates", methods=["GET"])
+def aggregates_report():
+    """Urgency counts, mean no-show risk and fallback rates over a time range"""
+    now = time.time()
+    try:
+        end = to_epoch(_query_time(request.args.get("end"))) or now
+        start = to_epoch(_query_time(request.args.get("start"))) or end - 24 * 3600
+        if not (math.isfinite(start) and math.isfinite(end)):
+            raise ValueError("non-finite time")
+    except ValueError:
+        return jsonify({"error": "start and end must be ISO-8601 times or epoch seconds"}), 400
+    resolution = request.args.get("resolution")
+    if resolution is not None and resolution not in RESOLUTIONS:
+        return jsonify({"error": f"resolution must be one of {sorted(RESOLUTIONS)}"}), 400
+    return jsonify(prediction_aggregates.query(start, end, request.args.get("clinic_id"), resolution))
+
+@app.route("/admission", methods=["GET"])
+def admission_report():
+    """Queue depth, latency estimates and request counts per serving path"""
+    return jsonify(admission_controller.report())
+
+@app.route("/models/clinics", methods=["GET"])
+def clinic_model_report():
+    """Per-clinic no-show model cache: hit rate, load latency and resident models"""
+    return jsonify(clinic_noshow_models.report())
+
+@app.route("/models/clinics/preload", methods=["POST"])
+@require_admin
+def preload_clinic_models():
+    """Load no-show models for the given clinic ids ahead of traffic"""
+    data = request.get_json(silent=True) or {}
+    clinic_ids = data.get("clinic_ids", [])
+    loaded = clinic_noshow_models.preload(clinic_ids)
+    return jsonify({"requested": len(clinic_ids), "resident": loaded, **clinic_noshow_models.report()})
+
+@app.route("/models/clinics/reload", methods=["POST"])
+@require_admin
+def reload_clinic_models():
+    """Drop one clinic's model (or all) so it is reloaded from disk on next use"""
+    data = request.get_json(silent=True) or {}
+    clinic_noshow_models.invalidate(data.get("clinic_id"))
+    return jsonify(clinic_noshow_models.report())
+
+@app.route("/clinics", methods=["GET"])
+def clinic_index_status():
+    """Size and version of the clinic spatial index"""
+    return jsonify(clinic_index.report())
+
+@app.route("/clinics", methods=["POST"])
+@require_admin
+def update_clinics():
+    """Replace or upsert clinic coordinates and rebuild the spatial index"""
+    data = request.get_json(silent=True) or {}
+    try:
+        version = clinic_index.rebuild(data.get("clinics", []), replace=data.get("replace", True))
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid clinic data: {e}"}), 400
+    return jsonify({"version": version, **clinic_index.report()})
+
+@app.route("/clinics/nearest", methods=["POST"])
+def nearest_clinics():
+    """Nearest clinics for one point (latitude/longitude) or a batch of points"""
+    data = request.get_json(silent=True) or {}
+    points = data.get("points") or [data]
+    try:
+        lats = [_finite(p["latitude"], "latitude") for p in points]
+        lons = [_finite(p["longitude"], "longitude") for p in points]
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "Each point needs numeric latitude and longitude"}), 400
+    try:
+        k = int(data.get("k", 1))
+    except (TypeError, ValueError):
+        return jsonify({"error": "k must be an integer"}), 400
+    
+    ids, distances = clinic_index.nearest(lats, lons, k=k)
+    if ids is None:
+        return jsonify({"error": "No clinics indexed"}), 404
+    
+    results = [
+        [{"clinic_id": cid, "distance_km": round(d, 3)} for cid, d in zip(row_ids, row_distances)]
+        for row_ids, row_distances in zip(ids, distances)
+    ]
+    return jsonify({"results": results, "index_version": clinic_index.report()["version"]})
+
+@app.route("/clinics/distances", methods=["POST"])
+def clinic_distances():
+    """Patient-to-clinic distances for a batch of {clinic_id, latitude, longitude}"""
+    data = request.get_json(silent=True) or {}
+    pairs = data.get("pairs", [])
+    try:
+        clinic_ids = [p["clinic_id"] for p in pairs]
+        lats = np.array([float(p["latitude"]) for p in pairs])
+        lons = np.array([float(p["longitude"]) for p in pairs])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "Each pair needs clinic_id, latitude and longitude"}), 400
+    
+    distances = clinic_index.distance_to(clinic_ids, lats, lons) if pairs else []
+    return jsonify({"distances_km": [None if np.isnan(d) else round(float(d), 3) for d in distances]})
+
+@app.route("/schedule/calendar", methods=["POST"])
+@require_admin
+def load_schedule_calendar():
+    """Load clinic/staff working blocks (minus booked slots) into the slot allocator"""
+    data = request.get_json(silent=True) or {}
+    try:
+        report = slot_allocator.load_calendar(data.get("entries", []), replace=data.get("replace", True))
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid calendar data: {e}"}), 400
+    return jsonify(report)
+
+@app.route("/schedule/assign", methods=["POST"])
+def assign_schedule():
+    """Assign the earliest feasible slot to a batch of triaged requests"""
+    data = request.get_json(silent=True) or {}
+    requests_batch = data.get("requests", [])
+    start = time.perf_counter()
+    try:
+        assignments = slot_allocator.assign_batch(requests_batch, now=data.get("now"))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid scheduling request: {e}"}), 400
+    return jsonify({
+        "assignments": assignments,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+        "calendar": slot_allocator.report()
+    })
+
+@app.route("/simulate/overbooking", methods=["POST"])
+def simulate_overbooking_sessions():
+    """Monte Carlo utilization/overflow per session and a recommended overbooking level"""
+    data = request.get_json(silent=True) or {}
+    try:
+        result = simulate_overbooking(
+            data.get("sessions", []),
+            n_scenarios=min(int(data.get("scenarios", 20000)), 200000),
+            max_overbook=min(int(data.get("max_overbook", 5)), 50),
+            max_overflow_prob=float(data.get("max_overflow_prob", 0.1)),
+            seed=data.get("seed")
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid simulation request: {e}"}), 400
+    return jsonify(result)
+
+@app.route("/schedule", methods=["GET"])
+def schedule_status():
+    """Slot allocator occupancy"""
+    return jsonify(slot_allocator.report())
+
+@app.route("/retrain/jobs", methods=["POST"])
+@require_admin
+def submit_retrain_job():
+    """Queue a retraining job (merged with an active job of the same kind)"""
+    data = request.get_json(silent=True) or {}
+    try:
+        job, merged = retrain_manager.submit(data.get("kind", "enhanced"), data.get("requested_by"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"job": job, "merged": merged}), 202
+
+@app.route("/retrain/jobs", methods=["GET"])
+@require_admin
+def list_retrain_jobs():
+    """All retraining jobs, newest first"""
+    return jsonify({"jobs": retrain_manager.list()})
+
+@app.route("/retrain/jobs/<job_id>", methods=["GET"])
+@require_admin
+def retrain_job_status(job_id):
+    """Status, progress and timing of one retraining job"""
+    job = retrain_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify({"job": job})
+
+@app.route("/retrain/jobs/<job_id>/cancel", methods=["POST"])
+@require_admin
+def cancel_retrain_job(job_id):
+    """Cancel a queued or running retraining job"""
+    job = retrain_manager.cancel(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify({"job": job})
+
+@app.route("/profile", methods=["POST"])
+@require_admin
+def start_profile():
+    """Sample request stacks for N seconds (only requests slower than slow_ms, or every thread)"""
+    data = request.get_json(silent=True) or {}
+    try:
+        session = profiler.start(data.get("seconds", 10), data.get("interval_ms", 5),
+                                 data.get("slow_ms"), data.get("all_threads", False))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid profiling request: {e}"}), 400
+    if session is None:
+        return jsonify({"error": "A profiling run is already active"}), 409
+    return jsonify({"profile": session}), 202
+
+@app.route("/profile", methods=["GET"])
+@require_admin
+def list_profiles():
+    """Recent profiling runs"""
+    return jsonify(profiler.report())
+
+@app.route("/profile/<profile_id>", methods=["GET"])
+@require_admin
+def profile_summary(profile_id):
+    """Status and top functions of one profiling run"""
+    session = profiler.get(profile_id)
+    if session is None:
+        return jsonify({"error": "Profile not found"}), 404
+    return jsonify({"profile": session.to_dict()})
+
+@app.route("/profile/<profile_id>/collapsed", methods=["GET"])
+@require_admin
+def profile_collapsed(profile_id):
+    """Collapsed stacks (flamegraph.pl / speedscope input) of a finished run"""
+    session = profiler.get(profile_id)
+    if session is None or session.status != "finished":
+        return jsonify({"error": "Finished profile not found"}), 404
+    return send_file(os.path.abspath(session.collapsed_file), mimetype="text/plain",
+                     as_attachment=True, download_name=os.path.basename(session.collapsed_file))
+
+@app.route("/memory", methods=["GET"])
+@require_admin
+def memory_report():
+    """Process RSS/PSS and deep sizes of loaded artifacts and caches (deep=0 skips sizing)"""
+    process = process_memory()
+    result = {
+        "process": process,
+        "python_allocated_blocks": sys.getallocatedblocks(),
+        "gc_counts": gc.get_count(),
+        "allocation_tracking": allocation_tracker.report()
+    }
+    if request.args.get("deep", "1") != "0":
+        components, total = component_sizes(_memory_components())
+        result["components"] = components
+        result["components_total_bytes"] = total
+        # Interpreter, native libraries, allocator fragmentation and anything not listed above
+        result["unattributed_bytes"] = process.get("rss_bytes", 0) - total
+    return jsonify(result)
+
+@app.route("/memory/tracking", methods=["POST"])
+@require_admin
+def memory_tracking():
+    """Start (optionally with a traceback depth) or stop tracemalloc allocation tracking"""
+    data = request.get_json(silent=True) or {}
+    action = data.get("action")
+    if action == "start":
+        try:
+            started = allocation_tracker.start(data.get("frames", 10))
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": f"Invalid frames: {e}"}), 400
+        if not started:
+            return jsonify({"error": "Allocation tracking is already running"}), 409
+    elif action == "stop":
+        allocation_tracker.stop()
+    else:
+        return jsonify({"error": "action must be 'start' or 'stop'"}), 400
+    return jsonify(allocation_tracker.report())
+
+@app.route("/memory/snapshots", methods=["POST"])
+@require_admin
+def take_memory_snapshot():
+    """Snapshot traced allocations now, e.g. before and after a load test"""
+    data = request.get_json(silent=True) or {}
+    snapshot = allocation_tracker.snapshot(data.get("label"))
+    if snapshot is None:
+        return jsonify({"error": "Start allocation tracking first"}), 409
+    return jsonify({"snapshot": snapshot.to_dict()}), 201
+
+@app.route("/memory/snapshots", methods=["GET"])
+@require_admin
+def list_memory_snapshots():
+    """Tracking status and retained snapshots"""
+    return jsonify(allocation_tracker.report())
+
+@app.route("/memory/snapshots/diff", methods=["GET"])
+@require_admin
+def diff_memory_snapshots():
+    """Top allocation sites by growth between two snapshots (default: oldest to newest)"""
+    snapshots = allocation_tracker.snapshots
+    older = allocation_tracker.get(request.args["from"]) if "from" in request.args else \
+        (snapshots[0] if snapshots else None)
+    newer = allocation_tracker.get(request.args["to"]) if "to" in request.args else \
+        (snapshots[-1] if snapshots else None)
+    if older is None or newer is None:
+        return jsonify({"error": "Snapshot not found"}), 404
+    group_by = request.args.get("group_by", "lineno")
+    if group_by not in ("lineno", "filename", "traceback"):
+        return jsonify({"error": "group_by must be lineno, filename or traceback"}), 400
+    try:
+        limit = int(request.args.get("limit", 20))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    return jsonify(allocation_tracker.diff(older, newer, limit, group_by))
+
 @app.route("/", methods=["GET"])
 def health_check():
     """Health check endpoint"""
+    models = serving_models
     return jsonify({
         "status": "healthy",
         "service": "Enhanced AI Service",
         "version": "2.0",
         "models_loaded": {
-            "triage": triage_model is not None,
-            "noshow": noshow_model is not None
+            "triage": models.triage_model is not None,
+            "triage_hashed": models.triage_hashed_model is not None,
+            "noshow": models.noshow_model is not None
         },
+        "shadow_candidates": sorted(shadow_evaluator.candidates.keys()),
+        "request_logging": request_logger.report(),
         "endpoints": [
             "POST /enhanced-ml-triage",
             "POST /enhanced-noshow-ml", 
             "POST /enhanced-nlp-triage",
+            "POST /enhanced-ml-triage/batch",
+            "POST /enhanced-ml-triage/stream",
+            "POST /enhanced-noshow-ml/stream",
             "POST /ml-triage",
             "POST /noshow-ml",
-            "POST /nlp-triage"
+            "POST /nlp-triage",
+            "GET /shadow",
+            "GET /drift",
+            "GET /journal",
+            "GET /enrichment",
+            "GET /triage-rules",
+            "POST /triage-rules/reload",
+            "GET /admission",
+            "GET /aggregates",
+            "GET /models/clinics",
+            "POST /models/clinics/preload",
+            "POST /models/clinics/reload",
+            "GET /clinics",
+            "POST /clinics",
+            "POST /clinics/nearest",
+            "POST /clinics/distances",
+            "POST /schedule/calendar",
+            "POST /schedule/assign",
+            "GET /schedule",
+            "POST /simulate/overbooking",
+            "POST /retrain/jobs",
+            "GET /retrain/jobs/<job_id>",
+            "POST /retrain/jobs/<job_id>/cancel",
+            "POST /profile",
+            "GET /profile",
+            "GET /profile/<profile_id>",
+            "GET /profile/<profile_id>/collapsed",
+            "GET /memory",
+            "POST /memory/tracking",
+            "POST /memory/snapshots",
+            "GET /memory/snapshots",
+            "GET /memory/snapshots/diff"
         ],
         "features": [
             "Enhanced ML models with 68.5% triage accuracy",
@@ -523,6 +1524,24 @@ def health_check():
             "English and Nepali language support",
             "Comprehensive medical term translation",
             "Confidence scoring",
+            "Shadow evaluation of candidate models",
+            "Non-blocking structured request logging",
+            "Feature and prediction drift monitoring",
+            "Deadline-aware load shedding to keyword/heuristic fallbacks",
+            "Queued retraining jobs with atomic artifact writes",
+            "Nearest-clinic lookups and distance features from coordinates",
+            "Batch slot allocation by urgency and no-show risk",
+            "Monte Carlo overbooking simulation from no-show probabilities",
+            "Rolling per-clinic prediction aggregates",
+            "Per-clinic no-show models with lazy loading and LRU eviction",
+            "Optional hashed n-gram triage variant with batched sparse inference",
+            "Versioned keyword triage rules reloaded without a deploy",
+            "On-demand sampling profiler with collapsed-stack output",
+            "Append-only binary prediction journal for retraining",
+            "Per-feature contribution explanations (explain=true)",
+            "Streaming NDJSON scoring for unbounded uploads",
+            "Appointment time and cached weather enrichment for no-show inputs",
+            "Per-component memory accounting and allocation snapshot diffs",
             "Backward compatibility"
         ]
     })
@@ -531,12 +1550,30 @@ if __name__ == "__main__":
     print("🚀 Starting Enhanced AI Service v2.0...")
     print("=" * 60)
     print("Available endpoints:")
-    print("- POST /enhanced-ml-triage - Enhanced triage with better accuracy")
+    print("- POST /enhanced-ml-triage - Enhanced triage with better accuracy (explain=true for contributions)")
     print("- POST /enhanced-noshow-ml - Enhanced no-show prediction")
     print("- POST /enhanced-nlp-triage - Enhanced multilingual triage")
+    print("- POST /enhanced-ml-triage/batch - Batched triage (model_variant=hashed for text n-grams)")
+    print("- POST /enhanced-ml-triage/stream - NDJSON in, NDJSON out triage for large backlogs")
+    print("- POST /enhanced-noshow-ml/stream - NDJSON in, NDJSON out no-show scoring")
     print("- POST /ml-triage - Original triage (backward compatibility)")
     print("- POST /noshow-ml - Original no-show (backward compatibility)")
     print("- POST /nlp-triage - Original NLP triage (backward compatibility)")
+    print("- GET /shadow - Shadow evaluation of candidate models")
+    print("- GET /drift - Feature and prediction drift monitoring")
+    print("- GET /journal - Prediction journal status")
+    print("- GET /enrichment - Weather cache statistics for no-show enrichment")
+    print("- POST /triage-rules/reload - Reload keyword triage rules (admin)")
+    print("- GET /admission - Load shedding and serving path counts")
+    print("- GET /aggregates - Urgency, no-show risk and fallback trends")
+    print("- GET /models/clinics - Per-clinic no-show model cache statistics")
+    print("- POST /clinics/nearest - Nearest clinics for patient coordinates")
+    print("- POST /schedule/assign - Batch slot allocation by urgency and risk")
+    print("- POST /simulate/overbooking - Overbooking simulation per session")
+    print("- POST /retrain/jobs - Queue a retraining job (admin)")
+    print("- GET /retrain/jobs/<job_id> - Retraining job status (admin)")
+    print("- POST /profile - Sample worker stacks for N seconds (admin)")
+    print("- GET /memory - Per-component memory and RSS/PSS (admin)")
     print("- GET / - Health check")
     print("=" * 60)
     print("Features:")
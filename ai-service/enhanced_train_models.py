@@ -7,10 +7,20 @@ from sklearn.neural_network import MLPClassifier
 from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
-import pickle
 import joblib
 from datetime import datetime, timedelta
+import os
 import random
+import sys
+import time
+from drift_monitor import build_reference, save_reference, REFERENCE_FILE
+from text_features import HASHED_TRIAGE_FILE, HashedTriageModel
+from training_utils import atomic_dump, report_progress
+
+# Served model inputs, in column order; retraining from the journal uses the same lists
+TRIAGE_FEATURES = ['age', 'fever', 'chest_pain', 'breathing_difficulty', 'severe_pain', 'bleeding']
+NOSHOW_FEATURES = ['age', 'distance', 'history_missed', 'weather_bad',
+                   'day_of_week', 'time_of_day', 'reliability_score']
 
 class EnhancedAITrainer:
     def __init__(self):
@@ -169,16 +179,20 @@ class EnhancedAITrainer:
         
         return pd.DataFrame(data)
     
-    def train_enhanced_triage_model(self):
-        """Train enhanced triage model with multiple algorithms"""
+    def train_enhanced_triage_model(self, df=None, output_dir="."):
+        """Train enhanced triage model with multiple algorithms.
+        
+        df defaults to generated data; artifacts are written to output_dir under
+        the live file names.
+        """
         print("🏥 Training Enhanced Triage Model...")
         
         # Generate comprehensive data
-        df = self.generate_comprehensive_triage_data(1000)
+        if df is None:
+            df = self.generate_comprehensive_triage_data(1000)
         
         # Prepare features
-        feature_columns = ['age', 'fever', 'chest_pain', 'breathing_difficulty', 
-                          'severe_pain', 'bleeding']
+        feature_columns = TRIAGE_FEATURES
         X = df[feature_columns]
         y = df['urgency']
         
@@ -211,8 +225,10 @@ class EnhancedAITrainer:
         best_name = ""
         
         # Train and evaluate models
-        for name, model in models.items():
+        for i, name in enumerate(models):
+            model = models[name]
             print(f"Training {name}...")
+            report_progress(0.05 + 0.4 * i / len(models), f"Triage: training {name}")
             
             if name in ['SVM', 'Neural Network', 'Logistic Regression']:
                 model.fit(X_train_scaled, y_train)
@@ -232,32 +248,98 @@ class EnhancedAITrainer:
         
         print(f"\n🏆 Best Model: {best_name} with accuracy: {best_score:.4f}")
         
-        # Save best model
+        # Save best model (temp file + rename so the serving process never reads a partial file)
+        atomic_dump(best_model, os.path.join(output_dir, 'enhanced_triage_model.pkl'))
         if best_name in ['SVM', 'Neural Network', 'Logistic Regression']:
-            joblib.dump(best_model, 'enhanced_triage_model.pkl')
-            joblib.dump(self.scaler, 'triage_scaler.pkl')
-        else:
-            joblib.dump(best_model, 'enhanced_triage_model.pkl')
+            atomic_dump(self.scaler, os.path.join(output_dir, 'triage_scaler.pkl'))
         
-        joblib.dump(self.label_encoders['urgency'], 'triage_label_encoder.pkl')
+        atomic_dump(self.label_encoders['urgency'], os.path.join(output_dir, 'triage_label_encoder.pkl'))
         
         # Save feature names
-        with open('triage_features.pkl', 'wb') as f:
-            pickle.dump(feature_columns, f)
+        atomic_dump(feature_columns, os.path.join(output_dir, 'triage_features.pkl'), use_pickle=True)
         
         print("✅ Enhanced triage model saved!")
         return best_model, best_score
     
-    def train_enhanced_noshow_model(self):
-        """Train enhanced no-show prediction model"""
+    def train_hashed_triage_model(self, save=True):
+        """Train the hashed n-gram text variant and compare it with the saved flag-only model"""
+        print("🔡 Training Hashed-Text Triage Model...")
+        
+        # Same data and split as train_enhanced_triage_model
+        df = self.generate_comprehensive_triage_data(1000)
+        feature_columns = TRIAGE_FEATURES
+        train_df, test_df = train_test_split(df, test_size=0.2, random_state=42)
+        X_test = test_df[feature_columns].to_numpy(dtype=float)
+        texts_test = test_df['symptoms_text'].tolist()
+        
+        model = HashedTriageModel().fit(train_df[feature_columns].to_numpy(dtype=float),
+                                        train_df['symptoms_text'].tolist(), train_df['urgency'])
+        
+        def timed(predict_batch, predict_one):
+            start = time.perf_counter()
+            predictions = predict_batch()
+            batch_ms = (time.perf_counter() - start) * 1000 / len(test_df)
+            start = time.perf_counter()
+            for i in range(100):
+                predict_one(i)
+            single_ms = (time.perf_counter() - start) * 1000 / 100
+            return predictions, round(batch_ms, 4), round(single_ms, 4)
+        
+        predictions, batch_ms, single_ms = timed(
+            lambda: model.predict(X_test, texts_test)[0],
+            lambda i: model.predict(X_test[i:i + 1], texts_test[i:i + 1]))
+        metrics = {
+            "hashed": {
+                "accuracy": round(accuracy_score(test_df['urgency'], predictions), 4),
+                "batch_ms_per_row": batch_ms,
+                "single_ms": single_ms,
+                "model_bytes": model.memory_bytes(),
+                "hash_features": model.n_features
+            }
+        }
+        
+        # Compare with the current flag-only model, scored the way the service scores it
+        if os.path.exists('enhanced_triage_model.pkl'):
+            current = joblib.load('enhanced_triage_model.pkl')
+            scaler = joblib.load('triage_scaler.pkl') if os.path.exists('triage_scaler.pkl') else None
+            encoder = joblib.load('triage_label_encoder.pkl')
+            transform = scaler.transform if scaler is not None else (lambda rows: rows)
+            
+            def predict_current(rows):
+                rows = transform(rows)
+                current.predict_proba(rows)
+                return encoder.inverse_transform(current.predict(rows))
+            
+            predictions, batch_ms, single_ms = timed(
+                lambda: predict_current(X_test),
+                lambda i: predict_current(X_test[i:i + 1]))
+            metrics["current"] = {
+                "model": type(current).__name__,
+                "accuracy": round(accuracy_score(test_df['urgency'], predictions), 4),
+                "batch_ms_per_row": batch_ms,
+                "single_ms": single_ms
+            }
+        
+        model.metrics = metrics
+        for name, result in metrics.items():
+            print(f"{name}: accuracy {result['accuracy']:.4f}, "
+                  f"{result['single_ms']:.3f} ms/request, {result['batch_ms_per_row']:.4f} ms/row batched")
+        
+        if save:
+            atomic_dump(model, HASHED_TRIAGE_FILE)
+            print(f"✅ Hashed triage model saved to {HASHED_TRIAGE_FILE}")
+        return model, metrics
+    
+    def train_enhanced_noshow_model(self, df=None, output_dir="."):
+        """Train enhanced no-show prediction model (df and output_dir as for triage)"""
         print("📅 Training Enhanced No-Show Model...")
         
         # Generate comprehensive data
-        df = self.generate_comprehensive_noshow_data(2000)
+        if df is None:
+            df = self.generate_comprehensive_noshow_data(2000)
         
         # Prepare features
-        feature_columns = ['age', 'distance', 'history_missed', 'weather_bad', 
-                          'day_of_week', 'time_of_day', 'reliability_score']
+        feature_columns = NOSHOW_FEATURES
         X = df[feature_columns]
         y = df['no_show']
         
@@ -284,8 +366,10 @@ class EnhancedAITrainer:
         best_name = ""
         
         # Train and evaluate models
-        for name, model in models.items():
+        for i, name in enumerate(models):
+            model = models[name]
             print(f"Training {name}...")
+            report_progress(0.5 + 0.4 * i / len(models), f"No-show: training {name}")
             
             if name in ['Logistic Regression', 'Neural Network']:
                 model.fit(X_train_scaled, y_train)
@@ -306,20 +390,27 @@ class EnhancedAITrainer:
         
         print(f"\n🏆 Best Model: {best_name} with accuracy: {best_score:.4f}")
         
-        # Save best model
+        # Save best model (temp file + rename so the serving process never reads a partial file)
+        atomic_dump(best_model, os.path.join(output_dir, 'enhanced_noshow_model.pkl'))
         if best_name in ['Logistic Regression', 'Neural Network']:
-            joblib.dump(best_model, 'enhanced_noshow_model.pkl')
-            joblib.dump(self.scaler, 'noshow_scaler.pkl')
-        else:
-            joblib.dump(best_model, 'enhanced_noshow_model.pkl')
+            atomic_dump(self.scaler, os.path.join(output_dir, 'noshow_scaler.pkl'))
         
         # Save feature names
-        with open('noshow_features.pkl', 'wb') as f:
-            pickle.dump(feature_columns, f)
+        atomic_dump(feature_columns, os.path.join(output_dir, 'noshow_features.pkl'), use_pickle=True)
         
         print("✅ Enhanced no-show model saved!")
         return best_model, best_score
 
+    def save_drift_reference(self):
+        """Save training-time feature distributions used by the /drift endpoint"""
+        print("📊 Saving drift reference...")
+        
+        triage_df = self.generate_comprehensive_triage_data(1000)
+        noshow_df = self.generate_comprehensive_noshow_data(2000)
+        save_reference(build_reference(triage_df, noshow_df), REFERENCE_FILE)
+        
+        print(f"✅ Drift reference saved to {REFERENCE_FILE}")
+
 if __name__ == "__main__":
     trainer = EnhancedAITrainer()
     
@@ -334,6 +425,15 @@ if __name__ == "__main__":
     # Train no-show model
     noshow_model, noshow_score = trainer.train_enhanced_noshow_model()
     
+    # Optional hashed-text triage variant
+    if "--hashed-triage" in sys.argv:
+        print("\n" + "=" * 50)
+        trainer.train_hashed_triage_model()
+    
+    # Save reference distributions for drift monitoring
+    report_progress(0.95, "Saving drift reference")
+    trainer.save_drift_reference()
+    
     print("\n" + "=" * 50)
     print("🎉 Training Complete!")
     print(f"Triage Model Accuracy: {triage_score:.4f}")
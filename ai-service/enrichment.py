@@ -0,0 +1,296 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+
+from clinic_time import LOCAL_UTC_OFFSET_MINUTES, parse_time
+from shadow_eval import LatencyWindow
+
+WEATHER_FILE = "weather.json"
+
+
+class FileWeatherProvider:
+    """Weather from a local JSON file: {"<region>": {"YYYY-MM-DD": true|false}}.
+
+    Stand-in for the HTTP provider in tests and offline deployments; the file is
+    re-read when its mtime changes.
+    """
+
+    name = "file"
+
+    def __init__(self, path=WEATHER_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.mtime = None
+        self.table = {}
+
+    def _current(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return {}
+        with self.lock:
+            if mtime != self.mtime:
+                with open(self.path, encoding="utf-8") as f:
+                    self.table = json.load(f)
+                self.mtime = mtime
+            return self.table
+
+    def fetch(self, keys, timeout=None):
+        """{(region, date): bad weather flag or None} for a batch of keys (timeout unused: local file)"""
+        table = self._current()
+        result = {}
+        for region, date in keys:
+            value = table.get(region, {}).get(date)
+            result[(region, date)] = bool(value) if value is not None else None
+        return result
+
+
+class HttpWeatherProvider:
+    """Batched lookups against a weather service.
+
+    POSTs {"lookups": [{"region", "date"}, ...]} and expects
+    {"results": [{"region", "date", "bad"}, ...]}; missing keys stay unknown.
+    """
+
+    name = "http"
+
+    def __init__(self, url, timeout=1.0):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def fetch(self, keys, timeout=None):
+        """Like FileWeatherProvider.fetch; timeout (seconds) can only shorten the configured one"""
+        if timeout is not None:
+            timeout = max(min(self.timeout, timeout), 0.001)
+        response = self.session.post(self.url, timeout=timeout or self.timeout, json={
+            "lookups": [{"region": region, "date": date} for region, date in keys]
+        })
+        response.raise_for_status()
+        result = {key: None for key in keys}
+        for item in response.json().get("results", []):
+            key = (item.get("region"), item.get("date"))
+            if key in result and item.get("bad") is not None:
+                result[key] = bool(item["bad"])
+        return result
+
+
+class WeatherCache:
+    """TTL cache in front of a weather provider.
+
+    Misses from one call go to the provider as a single batch, and concurrent
+    requests for a key already being fetched wait for that fetch instead of
+    issuing their own, so a day's bookings cost one lookup per region.
+    Provider failures go to logger (an AsyncRequestLogger) when one is given.
+    """
+
+    def __init__(self, provider, ttl=3600, negative_ttl=300, max_entries=10000, wait_timeout=2.0, logger=None):
+        self.provider = provider
+        self.logger = logger
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.merged = 0
+        self.skipped = 0
+        self.provider_calls = 0
+        self.provider_errors = 0
+        self.fetch_latency = LatencyWindow()
+
+    def _cached_locked(self, key, now):
+        entry = self.entries.get(key)
+        if entry is None or entry[1] <= now:
+            return False, None
+        self.entries.move_to_end(key)
+        return True, entry[0]
+
+    def lookup_many(self, keys, fetch=True, timeout=None):
+        """{key: bad weather flag or None}; with fetch=False only the cache is consulted.
+
+        timeout (seconds) caps both the provider call and the wait on another
+        request's fetch; keys still unanswered when it runs out come back None.
+        """
+        now = time.monotonic()
+        deadline = now + timeout if timeout is not None else None
+        if deadline is not None and timeout <= 0:
+            fetch = False
+        result, owned, waiting = {}, [], []
+        with self.lock:
+            for key in set(keys):
+                found, value = self._cached_locked(key, now)
+                if found:
+                    self.hits += 1
+                    result[key] = value
+                elif not fetch:
+                    self.skipped += 1
+                    result[key] = None
+                elif key in self.inflight:
+                    self.merged += 1
+                    waiting.append((key, self.inflight[key]))
+                else:
+                    self.misses += 1
+                    self.inflight[key] = threading.Event()
+                    owned.append(key)
+
+        if owned:
+            fetched = {}
+            start = time.perf_counter()
+            try:
+                fetched = self.provider.fetch(owned, timeout=timeout)
+            except Exception as e:
+                if self.logger is not None:
+                    self.logger.log("weather", "lookup_failed", level="error", keys=len(owned), error=str(e))
+                else:
+                    print(f"⚠️  Weather lookup failed for {len(owned)} keys: {e}")
+                with self.lock:
+                    self.provider_errors += 1
+            finally:
+                stored_at = time.monotonic()
+                with self.lock:
+                    self.provider_calls += 1
+                    self.fetch_latency.add((time.perf_counter() - start) * 1000)
+                    for key in owned:
+                        value = fetched.get(key)
+                        # Unknown answers (and failures) are retried sooner than known ones
+                        expiry = stored_at + (self.ttl if value is not None else self.negative_ttl)
+                        self.entries[key] = (value, expiry)
+                        self.entries.move_to_end(key)
+                        self.inflight.pop(key).set()
+                    while len(self.entries) > self.max_entries:
+                        self.entries.popitem(last=False)
+            for key in owned:
+                result[key] = fetched.get(key)
+
+        for key, event in waiting:
+            wait = self.wait_timeout
+            if deadline is not None:
+                wait = max(0.0, min(wait, deadline - time.monotonic()))
+            event.wait(wait)
+            with self.lock:
+                entry = self.entries.get(key)
+            result[key] = entry[0] if entry is not None else None
+        return result
+
+    def report(self):
+        with self.lock:
+            lookups = self.hits + self.misses + self.merged
+            return {
+                "provider": self.provider.name,
+                "entries": len(self.entries),
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "merged": self.merged,
+                "skipped_no_fetch": self.skipped,
+                "hit_rate": round((self.hits + self.merged) / lookups, 4) if lookups else None,
+                "provider_calls": self.provider_calls,
+                "provider_errors": self.provider_errors,
+                "fetch_latency": self.fetch_latency.summary()
+            }
+
+
+def appointment_local_time(value, utc_offset_minutes=None):
+    """clinic_time.parse_time, but (None, False) when the value cannot be parsed"""
+    try:
+        return parse_time(value, utc_offset_minutes)
+    except ValueError:
+        return None, False
+
+
+def time_features(moment):
+    """(day_of_week, time_of_day) as the model was trained: Monday=0; morning/afternoon/evening=0/1/2"""
+    if moment.hour < 12:
+        time_of_day = 0
+    elif moment.hour < 17:
+        time_of_day = 1
+    else:
+        time_of_day = 2
+    return moment.weekday(), time_of_day
+
+
+class NoShowEnricher:
+    """Fills no-show inputs the caller did not send: day_of_week and time_of_day from
+    appointment_time, weather_bad from the weather cache per (region, date).
+
+    Supplied values always win; rows are never modified in place.
+    """
+
+    def __init__(self, weather=None, region_for=None, utc_offset_minutes=LOCAL_UTC_OFFSET_MINUTES):
+        self.weather = weather
+        self.region_for = region_for or (lambda row: row.get("region"))
+        self.utc_offset_minutes = utc_offset_minutes
+
+    @classmethod
+    def from_env(cls, region_for=None, logger=None):
+        """Weather from AI_WEATHER_URL (HTTP), else AI_WEATHER_FILE if it exists, else disabled"""
+        url = os.getenv("AI_WEATHER_URL")
+        path = os.getenv("AI_WEATHER_FILE", WEATHER_FILE)
+        if url:
+            provider = HttpWeatherProvider(url, timeout=float(os.getenv("AI_WEATHER_TIMEOUT_SECONDS", "1.0")))
+        elif os.path.exists(path):
+            provider = FileWeatherProvider(path)
+        else:
+            provider = None
+        weather = None
+        if provider is not None:
+            weather = WeatherCache(
+                provider,
+                ttl=float(os.getenv("AI_WEATHER_TTL_SECONDS", "3600")),
+                logger=logger
+            )
+        return cls(weather=weather, region_for=region_for)
+
+    def enrich(self, rows, fetch=True, timeout=None):
+        """(enriched rows, per-row sources) with one batched weather lookup for the whole list;
+        timeout (seconds) bounds that lookup, see WeatherCache.lookup_many"""
+        enriched, sources, pending = [], [], {}
+        for i, row in enumerate(rows):
+            row = dict(row)
+            source = {}
+            moment, has_time = None, False
+            if row.get("appointment_time") is not None:
+                moment, has_time = appointment_local_time(row["appointment_time"], self.utc_offset_minutes)
+            if moment is not None:
+                day_of_week, time_of_day = time_features(moment)
+                derived = [("day_of_week", day_of_week)] + ([("time_of_day", time_of_day)] if has_time else [])
+                for name, value in derived:
+                    if row.get(name) is None:
+                        row[name] = value
+                        source[name] = "appointment_time"
+            for name in ("day_of_week", "time_of_day"):
+                source.setdefault(name, "supplied" if row.get(name) is not None else "default")
+
+            if row.get("weather_bad") is not None:
+                source["weather_bad"] = "supplied"
+            else:
+                source["weather_bad"] = "default"
+                region = self.region_for(row) if self.weather is not None and moment is not None else None
+                if region is not None:
+                    pending.setdefault((str(region), moment.date().isoformat()), []).append(i)
+            enriched.append(row)
+            sources.append(source)
+
+        if pending:
+            weather = self.weather.lookup_many(list(pending), fetch=fetch, timeout=timeout)
+            for key, indices in pending.items():
+                if weather.get(key) is None:
+                    continue
+                for i in indices:
+                    enriched[i]["weather_bad"] = int(weather[key])
+                    sources[i]["weather_bad"] = "weather"
+        return enriched, sources
+
+    def report(self):
+        return {
+            "weather": self.weather.report() if self.weather is not None else None,
+            "utc_offset_minutes": self.utc_offset_minutes
+        }
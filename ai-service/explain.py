@@ -0,0 +1,206 @@
+import weakref
+
+import numpy as np
+from scipy import sparse
+from sklearn.ensemble import ExtraTreesClassifier, GradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+
+class LinearExplainer:
+    """Coefficient x model-input value; with standardized inputs this is the
+    shift in log-odds relative to an average patient"""
+
+    method = "linear"
+    units = "log_odds"
+
+    def __init__(self, model):
+        coef = np.asarray(model.coef_, dtype=float)
+        intercept = np.asarray(model.intercept_, dtype=float)
+        if coef.shape[0] == 1:
+            # Binary models keep one logit (class 1); class 0 is its negation
+            coef = np.vstack([-coef[0], coef[0]])
+            intercept = np.array([-intercept[0], intercept[0]])
+        self.coef = coef
+        self.intercept = intercept
+
+    def explain(self, X, classes):
+        return self.intercept[classes], X * self.coef[classes]
+
+
+def _path_table(tree, scale, normalize):
+    """Per-node Saabas contributions: the change in node value along the path
+    from the root, credited to the feature split on at each step"""
+    t = tree.tree_
+    value = t.value[:, 0, :].astype(float)
+    if normalize:
+        value = value / value.sum(axis=1, keepdims=True)
+    value *= scale
+
+    parent = np.full(t.node_count, -1)
+    depth = np.zeros(t.node_count, dtype=int)
+    for children in (t.children_left, t.children_right):
+        has_child = children >= 0
+        parent[children[has_child]] = np.flatnonzero(has_child)
+    # Node ids are assigned depth-first, so a parent always precedes its children
+    for node in range(1, t.node_count):
+        depth[node] = depth[parent[node]] + 1
+
+    table = np.zeros((t.node_count, t.n_features, value.shape[1]))
+    for level in range(1, depth.max() + 1):
+        nodes = np.flatnonzero(depth == level)
+        parents = parent[nodes]
+        table[nodes] = table[parents]
+        table[nodes, t.feature[parents]] += value[nodes] - value[parents]
+    return table
+
+
+# Up to this many rows, walk the stacked trees in numpy instead of calling
+# model.apply(), whose per-call overhead dominates single-request latency
+SMALL_BATCH = 64
+
+
+class TreePathExplainer:
+    """Path decomposition for tree ensembles, precomputed per node.
+
+    Every node's accumulated contribution vector is built once at load, so
+    explaining a batch is finding each row's leaves plus one sparse product
+    summing the leaf vectors over trees.
+    """
+
+    method = "tree_path"
+
+    def __init__(self, model):
+        self.model = model
+        n_features = model.n_features_in_
+        if isinstance(model, GradientBoostingClassifier):
+            self.units = "log_odds"
+            stages, k = model.estimators_.shape
+            n_outputs = max(k, 2)
+            tables = []
+            for stage in model.estimators_:
+                for column, tree in enumerate(stage):
+                    table = _path_table(tree, model.learning_rate, normalize=False)
+                    full = np.zeros((table.shape[0], n_features, n_outputs))
+                    if k == 1:
+                        # Binary boosting models the class-1 log-odds only
+                        full[:, :, 1] = table[:, :, 0]
+                        full[:, :, 0] = -table[:, :, 0]
+                    else:
+                        full[:, :, column] = table[:, :, 0]
+                    tables.append(full)
+        else:
+            self.units = "probability"
+            trees = model.estimators_ if hasattr(model, "estimators_") else [model]
+            tables = [_path_table(tree, 1.0 / len(trees), normalize=True) for tree in trees]
+
+        self.offsets = np.cumsum([0] + [len(t) for t in tables[:-1]])
+        self.table = np.concatenate(tables)
+        self.n_outputs = self.table.shape[2]
+        self.flat_table = self.table.reshape(len(self.table), -1)
+
+        # All trees stacked into flat node arrays; leaves point to themselves
+        structures = [tree.tree_ for tree in np.ravel(getattr(model, "estimators_", [model]))]
+        self.depth = max(t.max_depth for t in structures)
+        self.feature = np.concatenate([np.maximum(t.feature, 0) for t in structures])
+        self.threshold = np.concatenate([t.threshold for t in structures])
+        self.left, self.right = (
+            np.concatenate([np.where(children >= 0, children, np.arange(t.node_count)) + offset
+                            for t, children, offset in zip(structures, side, self.offsets)])
+            for side in ([t.children_left for t in structures], [t.children_right for t in structures])
+        )
+
+        origin = np.zeros((1, n_features))
+        self.bias = self._output(origin)[0] - self._contributions(origin)[0].sum(axis=0)
+
+    def _output(self, X):
+        if isinstance(self.model, GradientBoostingClassifier):
+            raw = self.model.decision_function(X)
+            return np.column_stack([-raw, raw]) if raw.ndim == 1 else raw
+        return self.model.predict_proba(X)
+
+    def _leaves(self, X):
+        if len(X) > SMALL_BATCH:
+            return self.model.apply(X).reshape(len(X), -1).astype(np.intp) + self.offsets
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, np.newaxis]
+        node = np.repeat(self.offsets[np.newaxis], len(X), axis=0)
+        for _ in range(self.depth):
+            node = np.where(X[rows, self.feature[node]] <= self.threshold[node],
+                            self.left[node], self.right[node])
+        return node
+
+    def _contributions(self, X):
+        leaves = self._leaves(X)
+        if len(X) <= SMALL_BATCH:
+            return self.table[leaves].sum(axis=1)
+        n, trees = leaves.shape
+        indicator = sparse.csr_matrix((np.ones(leaves.size), leaves.ravel(), np.arange(0, leaves.size + 1, trees)),
+                                      shape=(n, len(self.table)))
+        return (indicator @ self.flat_table).reshape(n, -1, self.n_outputs)
+
+    def explain(self, X, classes):
+        contributions = self._contributions(X)
+        return self.bias[classes], contributions[np.arange(len(X)), :, classes]
+
+
+def build_explainer(model):
+    """Pick the cheapest exact method for the model type.
+
+    None for anything else (e.g. the RBF SVC or the MLP): model-agnostic attribution
+    would mean scoring every input row once per feature, so those models answer
+    explain=true with an unsupported placeholder instead.
+    """
+    if isinstance(model, LogisticRegression):
+        return LinearExplainer(model)
+    if isinstance(model, (RandomForestClassifier, ExtraTreesClassifier,
+                          DecisionTreeClassifier, GradientBoostingClassifier)):
+        return TreePathExplainer(model)
+    return None
+
+
+_explainers = weakref.WeakKeyDictionary()
+
+
+def explainer_for(model):
+    """Explainer for a loaded model, built on first use and dropped with the model"""
+    if model is None:
+        return None
+    try:
+        return _explainers[model]
+    except KeyError:
+        explainer = _explainers[model] = build_explainer(model)
+        return explainer
+
+
+def loaded_explainers():
+    """Explainers currently cached for live models"""
+    return [explainer for explainer in list(_explainers.values()) if explainer is not None]
+
+
+def class_indices(model, labels):
+    """Column of each predicted (encoded) label in the model's classes_"""
+    return np.searchsorted(model.classes_, np.asarray(labels))
+
+
+def unsupported_explanation(reason):
+    """Placeholder returned for explain=true when the serving model cannot be explained"""
+    return {"method": "unsupported", "reason": reason}
+
+
+def explain_rows(explainer, model_input, classes, feature_names, class_names):
+    """Per-row explanation dicts; contributions are a list ordered by absolute size"""
+    if explainer is None:
+        return [unsupported_explanation("no exact explainer for this model type")] * len(model_input)
+    bias, contributions = explainer.explain(np.asarray(model_input, dtype=float), np.asarray(classes))
+    rows = []
+    for row_bias, row, class_name in zip(bias, contributions, class_names):
+        order = np.argsort(-np.abs(row))
+        rows.append({
+            "method": explainer.method,
+            "units": explainer.units,
+            "class": str(class_name),
+            "baseline": round(float(row_bias), 4),
+            "contributions": [{"feature": feature_names[j], "value": round(float(row[j]), 4)} for j in order]
+        })
+    return rows
@@ -0,0 +1,117 @@
+import re
+from itertools import combinations
+
+# Tokens are runs of anything but whitespace, punctuation, hyphens and digits, so
+# Devanagari words keep their vowel signs and viramas (\w splits them apart) and
+# "high-fever" is two tokens
+TOKEN_CHAR = r"[^\s.,;:!?()\"/\d-]"
+TOKEN_PATTERN = re.compile(TOKEN_CHAR + "+")
+
+
+def load_word_list(path):
+    """Lower-cased words from a one-word-per-line file ('#' lines are comments)"""
+    with open(path, encoding="utf-8") as f:
+        return {line.strip().lower() for line in f if line.strip() and not line.startswith("#")}
+
+
+def _deletes(word, max_distance):
+    """All strings obtained by deleting up to max_distance characters"""
+    variants = {word}
+    for n in range(1, min(max_distance, len(word)) + 1):
+        for positions in combinations(range(len(word)), n):
+            variants.add("".join(c for i, c in enumerate(word) if i not in positions))
+    return variants
+
+
+def bounded_edit_distance(a, b, limit):
+    """Optimal string alignment distance (adjacent transpositions count as one edit),
+    or limit + 1 as soon as it is certain to exceed limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+class DeletionIndex:
+    """Symmetric-delete index over a fixed vocabulary.
+
+    Every vocabulary word is stored under each of its deletion variants (up to its
+    allowed distance). A token is looked up by its own deletion variants, so finding
+    candidates costs a few dict probes instead of a scan over the vocabulary.
+    Protected tokens (real words, e.g. a dictionary) are never corrected, and tokens
+    too long to be within distance of any vocabulary word are rejected before their
+    deletion variants (which grow with the square of the length) are generated.
+    """
+
+    def __init__(self, vocabulary, min_length=4, long_length=8, short_distance=1,
+                 long_distance=2, protected=(), cache_size=20000):
+        self.min_length = min_length
+        self.long_length = long_length
+        self.short_distance = short_distance
+        self.long_distance = long_distance
+        self.vocabulary = set(vocabulary)
+        self.protected = set(protected)
+        self.cache_size = cache_size
+        self.cache = {}
+        self.index = {}
+        self.max_word_length = 0
+        for word in self.vocabulary:
+            if len(word) < min_length:
+                continue
+            self.max_word_length = max(self.max_word_length, len(word))
+            for variant in _deletes(word, self.max_distance(word)):
+                self.index.setdefault(variant, []).append(word)
+
+    def max_distance(self, word):
+        return self.long_distance if len(word) >= self.long_length else self.short_distance
+
+    def lookup(self, token):
+        """Closest vocabulary word within the allowed distance, or None"""
+        if token in self.vocabulary or token in self.protected or len(token) < self.min_length:
+            return None
+        if len(token) > self.max_word_length + self.long_distance:
+            return None
+        cached = self.cache.get(token, False)
+        if cached is not False:
+            return cached
+
+        limit = self.max_distance(token)
+        best = None
+        best_key = None
+        seen = set()
+        for variant in _deletes(token, limit):
+            for word in self.index.get(variant, ()):
+                if word in seen:
+                    continue
+                seen.add(word)
+                word_limit = min(limit, self.max_distance(word))
+                distance = bounded_edit_distance(token, word, word_limit)
+                if distance > word_limit:
+                    continue
+                # Closest first, then the candidate sharing the first character, then alphabetical
+                key = (distance, word[0] != token[0], word)
+                if best_key is None or key < best_key:
+                    best, best_key = word, key
+
+        if len(self.cache) >= self.cache_size:
+            self.cache.clear()
+        self.cache[token] = best
+        return best
+
+    def correct(self, text):
+        """Replace misspelled tokens in (lower-cased) text with their vocabulary match"""
+        def replace(match):
+            token = match.group(0)
+            return self.lookup(token) or token
+        return TOKEN_PATTERN.sub(replace, text)
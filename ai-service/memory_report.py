@@ -0,0 +1,295 @@
+"""Memory accounting for the AI service.
+
+Deep sizes of loaded artifacts and caches, process RSS/PSS from /proc, and
+tracemalloc snapshots that can be diffed by allocation site.
+
+CLI:
+    python memory_report.py                      # deep sizes of the artifacts in this directory
+    python memory_report.py --pid 123 --pid 456  # RSS/PSS of running workers
+    python memory_report.py --url http://localhost:6000   # GET /memory (AI_ADMIN_TOKEN)
+"""
+import gc
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import types
+import uuid
+from datetime import datetime
+
+import numpy as np
+
+# Never followed while sizing: shared interpreter structures, not owned by a component
+_SKIP_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+               types.CodeType, types.FrameType, threading.Thread)
+
+
+def _sklearn_tree_bytes(obj):
+    # Cython Tree objects keep node and value arrays outside the Python heap
+    state = obj.__getstate__()
+    return sum(v.nbytes for v in state.values() if isinstance(v, np.ndarray))
+
+
+def deep_size(obj, seen=None):
+    """Bytes reachable from obj, counting each object (and numpy buffer) once.
+
+    Pass the same `seen` set across calls to size several roots without
+    double counting what they share.
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _SKIP_TYPES):
+            continue
+        seen.add(id(current))
+        if isinstance(current, np.ndarray):
+            total += sys.getsizeof(current)
+            # Views report only their header; the owner's buffer is counted once through base
+            if current.base is not None:
+                stack.append(current.base)
+            continue
+        total += sys.getsizeof(current)
+        if type(current).__name__ == "Tree" and type(current).__module__.startswith("sklearn"):
+            total += _sklearn_tree_bytes(current)
+            continue
+        stack.extend(gc.get_referents(current))
+    return total
+
+
+def process_memory(pid="self"):
+    """RSS, peak RSS and (where the kernel provides smaps_rollup) PSS/USS for one process, in bytes"""
+    result = {"pid": os.getpid() if pid == "self" else int(pid)}
+    fields = {"VmRSS": "rss_bytes", "VmHWM": "peak_rss_bytes", "RssAnon": "rss_anon_bytes",
+              "RssFile": "rss_file_bytes", "Threads": "threads"}
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in fields:
+                    parts = value.split()
+                    result[fields[key]] = int(parts[0]) * (1024 if len(parts) > 1 else 1)
+    except OSError as e:
+        result["error"] = str(e)
+        return result
+
+    rollup = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                parts = value.split()
+                if len(parts) == 2 and parts[1] == "kB":
+                    rollup[key] = int(parts[0]) * 1024
+    except OSError:
+        pass
+    if rollup:
+        result["pss_bytes"] = rollup.get("Pss")
+        result["pss_anon_bytes"] = rollup.get("Pss_Anon")
+        result["pss_file_bytes"] = rollup.get("Pss_File")
+        # Pages only this process maps; what a fork would not share
+        result["uss_bytes"] = rollup.get("Private_Clean", 0) + rollup.get("Private_Dirty", 0)
+        result["swap_bytes"] = rollup.get("Swap")
+    return result
+
+
+def component_sizes(components):
+    """Deep size of each component, plus the total with shared objects counted once.
+
+    components: {name: callable returning the object(s) to size}; callables are
+    used so the report reflects whatever is loaded at call time.
+    """
+    sizes = {}
+    counted = set()
+    total = 0
+    for name, get in components.items():
+        start = time.perf_counter()
+        try:
+            obj = get()
+        except Exception as e:
+            sizes[name] = {"error": str(e)}
+            continue
+        own = set()
+        size = deep_size(obj, own)
+        # Only what no earlier component reached adds to the total
+        total += deep_size(obj, counted)
+        sizes[name] = {
+            "bytes": size,
+            "objects": len(own),
+            "sizing_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+    return sizes, total
+
+
+class AllocationSnapshot:
+    """A tracemalloc snapshot taken at one point in time"""
+
+    def __init__(self, label, snapshot):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.taken_at = datetime.now().isoformat()
+        self.snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>")
+        ])
+        stats = self.snapshot.statistics("filename")
+        self.traced_bytes = sum(s.size for s in stats)
+        self.blocks = sum(s.count for s in stats)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "label": self.label,
+            "taken_at": self.taken_at,
+            "traced_bytes": self.traced_bytes,
+            "blocks": self.blocks
+        }
+
+
+class AllocationTracker:
+    """On-demand tracemalloc: start, take labelled snapshots, diff any two by allocation site.
+
+    Off by default; tracing slows allocation-heavy code while it runs.
+    """
+
+    def __init__(self, keep=10):
+        self.keep = keep
+        self.lock = threading.Lock()
+        self.snapshots = []
+        self.started_at = None
+
+    def start(self, frames=10):
+        """Start tracing; returns False if tracing was already on"""
+        with self.lock:
+            if tracemalloc.is_tracing():
+                return False
+            tracemalloc.start(max(1, int(frames)))
+            self.started_at = datetime.now().isoformat()
+            return True
+
+    def stop(self):
+        """Stop tracing and drop the snapshots (they pin memory of their own)"""
+        with self.lock:
+            was_tracing = tracemalloc.is_tracing()
+            tracemalloc.stop()
+            self.snapshots = []
+            self.started_at = None
+            return was_tracing
+
+    def snapshot(self, label=None):
+        """Take a snapshot; None if tracing is off"""
+        if not tracemalloc.is_tracing():
+            return None
+        taken = AllocationSnapshot(label, tracemalloc.take_snapshot())
+        with self.lock:
+            self.snapshots.append(taken)
+            del self.snapshots[:-self.keep]
+        return taken
+
+    def get(self, snapshot_id):
+        for taken in self.snapshots:
+            if taken.id == snapshot_id:
+                return taken
+        return None
+
+    def diff(self, older, newer, limit=20, group_by="lineno"):
+        """Top allocation sites by growth between two snapshots"""
+        stats = newer.snapshot.compare_to(older.snapshot, group_by)
+        return {
+            "from": older.to_dict(),
+            "to": newer.to_dict(),
+            "group_by": group_by,
+            "traced_bytes_diff": newer.traced_bytes - older.traced_bytes,
+            "top": [{
+                "site": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                "size_bytes": stat.size,
+                "size_diff_bytes": stat.size_diff,
+                "count": stat.count,
+                "count_diff": stat.count_diff
+            } for stat in stats[:limit]]
+        }
+
+    def report(self):
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "started_at": self.started_at,
+            "frames": tracemalloc.get_traceback_limit() if tracemalloc.is_tracing() else None,
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "tracemalloc_overhead_bytes": tracemalloc.get_tracemalloc_memory() if tracemalloc.is_tracing() else 0,
+            "snapshots": [s.to_dict() for s in self.snapshots]
+        }
+
+
+def _format_bytes(value):
+    if value is None:
+        return "-"
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024 or unit == "GB":
+            return f"{value:.1f} {unit}" if unit != "B" else f"{value} B"
+        value /= 1024
+
+
+def _print_process(info):
+    print(f"   pid {info['pid']}: RSS {_format_bytes(info.get('rss_bytes'))} "
+          f"(peak {_format_bytes(info.get('peak_rss_bytes'))}), PSS {_format_bytes(info.get('pss_bytes'))}, "
+          f"USS {_format_bytes(info.get('uss_bytes'))}")
+
+
+def _print_components(components, total):
+    for name, info in sorted(components.items(), key=lambda item: -item[1].get("bytes", 0)):
+        if "error" in info:
+            print(f"   {name:<28} error: {info['error']}")
+        else:
+            print(f"   {name:<28} {_format_bytes(info['bytes']):>10}")
+    print(f"   {'total (shared counted once)':<28} {_format_bytes(total):>10}")
+
+
+def _artifact_components(directory="."):
+    import joblib
+    components = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".pkl"):
+            path = os.path.join(directory, name)
+            obj = joblib.load(path)
+            components[name] = lambda obj=obj: obj
+    return components
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Memory footprint of the AI service")
+    parser.add_argument("--pid", action="append", help="report RSS/PSS of a running worker (repeatable)")
+    parser.add_argument("--url", help="fetch GET /memory from a running service")
+    parser.add_argument("--dir", default=".", help="artifact directory for the offline report")
+    args = parser.parse_args()
+
+    if args.url:
+        import requests
+        response = requests.get(args.url.rstrip("/") + "/memory",
+                                headers={"X-Admin-Token": os.getenv("AI_ADMIN_TOKEN", "")}, timeout=60)
+        if response.status_code != 200:
+            print(f"❌ {response.status_code}: {response.text}")
+            sys.exit(1)
+        report = response.json()
+        print("🧠 Service memory")
+        _print_process(report["process"])
+        _print_components(report["components"], report["components_total_bytes"])
+        print(f"   {'unattributed (interpreter, libraries, fragmentation)':<28} "
+              f"{_format_bytes(report['unattributed_bytes'])}")
+    elif args.pid:
+        print("🧠 Worker memory")
+        for pid in args.pid:
+            _print_process(process_memory(pid))
+    else:
+        print(f"🧠 Artifact deep sizes in {os.path.abspath(args.dir)}")
+        before = process_memory()
+        components, total = component_sizes(_artifact_components(args.dir))
+        _print_components(components, total)
+        after = process_memory()
+        print(f"   RSS growth from loading: {_format_bytes(after.get('rss_bytes', 0) - before.get('rss_bytes', 0))}")
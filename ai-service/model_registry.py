@@ -0,0 +1,242 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+import joblib
+
+from prediction_journal import artifact_version
+from shadow_eval import LatencyWindow
+
+CLINIC_MODEL_DIR = os.path.join("models", "clinics")
+
+# Same file names as the global no-show artifacts, one directory per clinic
+MODEL_FILE = "enhanced_noshow_model.pkl"
+SCALER_FILE = "noshow_scaler.pkl"
+
+
+class ClinicModel:
+    """A loaded clinic model; size is the uncompressed joblib size on disk"""
+
+    __slots__ = ("clinic_id", "model", "scaler", "size_bytes", "load_ms", "loaded_at", "hits", "version")
+
+    def __init__(self, clinic_id, model, scaler, size_bytes, load_ms, version=0):
+        self.clinic_id = clinic_id
+        self.model = model
+        self.scaler = scaler
+        self.size_bytes = size_bytes
+        self.load_ms = load_ms
+        self.loaded_at = datetime.now().isoformat()
+        self.hits = 0
+        self.version = version
+
+    def to_dict(self):
+        return {
+            "clinic_id": self.clinic_id,
+            "size_bytes": self.size_bytes,
+            "load_ms": round(self.load_ms, 2),
+            "loaded_at": self.loaded_at,
+            "hits": self.hits,
+            "version": f"{self.version:016x}"
+        }
+
+
+class ClinicModelRegistry:
+    """Per-clinic no-show models loaded on first use and kept in a size-bounded LRU.
+
+    Clinics without a model directory are served by the default (global) model;
+    that negative lookup is cached for missing_ttl seconds so it costs no disk access.
+    The negative cache holds at most max_missing clinic ids, oldest dropped first.
+    Load failures go to logger (an AsyncRequestLogger) when one is given.
+    """
+
+    def __init__(self, default, root=CLINIC_MODEL_DIR, max_models=16,
+                 max_bytes=256 * 1024 * 1024, missing_ttl=60.0, max_missing=10000, logger=None):
+        self.default = default
+        self.root = root
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.missing_ttl = missing_ttl
+        self.max_missing = max_missing
+        self.logger = logger
+        self.lock = threading.Lock()
+        self.models = OrderedDict()
+        self.loading = {}
+        # clinic id -> expiry, in expiry order (every entry gets the same TTL)
+        self.missing = OrderedDict()
+        self.resident_bytes = 0
+        self.hits = 0
+        self.loads = 0
+        self.default_served = 0
+        self.load_errors = 0
+        self.evictions = 0
+        self.load_latency = LatencyWindow()
+
+    @classmethod
+    def from_env(cls, default, logger=None):
+        """Build a registry from AI_CLINIC_MODEL_* settings and preload AI_PRELOAD_CLINICS"""
+        registry = cls(
+            default,
+            root=os.getenv("AI_CLINIC_MODEL_DIR", CLINIC_MODEL_DIR),
+            max_models=int(os.getenv("AI_CLINIC_MODEL_MAX", "16")),
+            max_bytes=int(float(os.getenv("AI_CLINIC_MODEL_MAX_MB", "256")) * 1024 * 1024),
+            max_missing=int(os.getenv("AI_CLINIC_MODEL_MAX_MISSING", "10000")),
+            logger=logger
+        )
+        preload = [c.strip() for c in os.getenv("AI_PRELOAD_CLINICS", "").split(",") if c.strip()]
+        if preload:
+            loaded = registry.preload(preload)
+            print(f"✅ Preloaded {loaded}/{len(preload)} clinic no-show models")
+        return registry
+
+    def _directory(self, clinic_id):
+        # Clinic ids become directory names; refuse anything that could escape the root
+        name = str(clinic_id)
+        if not name or name in (".", "..") or os.sep in name or (os.altsep and os.altsep in name):
+            return None
+        return os.path.join(self.root, name)
+
+    def get(self, clinic_id):
+        """(model, scaler, source, version) for a clinic; source is "clinic" or "default" """
+        if clinic_id is None:
+            return self._default()
+        key = str(clinic_id)
+
+        with self.lock:
+            entry = self.models.get(key)
+            if entry is not None:
+                self.models.move_to_end(key)
+                self.hits += 1
+                entry.hits += 1
+                return entry.model, entry.scaler, "clinic", entry.version
+            missing_until = self.missing.get(key)
+            if missing_until is not None:
+                if missing_until > time.monotonic():
+                    return self._default_locked()
+                del self.missing[key]
+            # One thread loads a clinic; concurrent requests for it wait on the same event
+            event = self.loading.get(key)
+            owner = event is None
+            if owner:
+                event = self.loading[key] = threading.Event()
+
+        if not owner:
+            event.wait()
+            with self.lock:
+                entry = self.models.get(key)
+                if entry is not None:
+                    self.hits += 1
+                    entry.hits += 1
+                    return entry.model, entry.scaler, "clinic", entry.version
+                return self._default_locked()
+
+        try:
+            entry = self._load(key)
+        finally:
+            with self.lock:
+                self.loading.pop(key, None)
+            event.set()
+        if entry is None:
+            return self._default()
+        return entry.model, entry.scaler, "clinic", entry.version
+
+    def _default(self):
+        with self.lock:
+            return self._default_locked()
+
+    def _default_locked(self):
+        self.default_served += 1
+        model, scaler, version = self.default()
+        return model, scaler, "default", version
+
+    def _load(self, key):
+        directory = self._directory(key)
+        model_path = os.path.join(directory, MODEL_FILE) if directory else None
+        if model_path is None or not os.path.exists(model_path):
+            with self.lock:
+                self._mark_missing_locked(key)
+            return None
+
+        start = time.perf_counter()
+        try:
+            model = joblib.load(model_path)
+            scaler_path = os.path.join(directory, SCALER_FILE)
+            scaler = joblib.load(scaler_path) if os.path.exists(scaler_path) else None
+            version = artifact_version(model_path)
+            size = os.path.getsize(model_path) + (os.path.getsize(scaler_path) if scaler is not None else 0)
+        except Exception as e:
+            if self.logger is not None:
+                self.logger.log("clinic-models", "load_failed", level="error", clinic_id=key, error=str(e))
+            else:
+                print(f"⚠️  Could not load no-show model for clinic {key}: {e}")
+            with self.lock:
+                self.load_errors += 1
+                self._mark_missing_locked(key)
+            return None
+        load_ms = (time.perf_counter() - start) * 1000
+
+        entry = ClinicModel(key, model, scaler, size, load_ms, version)
+        with self.lock:
+            self.loads += 1
+            self.load_latency.add(load_ms)
+            self.models[key] = entry
+            self.resident_bytes += size
+            self.missing.pop(key, None)
+            self._evict_locked()
+        return entry
+
+    def _mark_missing_locked(self, key):
+        now = time.monotonic()
+        self.missing[key] = now + self.missing_ttl
+        self.missing.move_to_end(key)
+        # Expired ids sit at the front; past that, drop the oldest to stay within max_missing
+        while self.missing and (len(self.missing) > self.max_missing or next(iter(self.missing.values())) <= now):
+            self.missing.popitem(last=False)
+
+    def _evict_locked(self):
+        # Keep at least the newest model even if it alone exceeds the byte budget
+        while len(self.models) > 1 and (len(self.models) > self.max_models or
+                                        self.resident_bytes > self.max_bytes):
+            _, evicted = self.models.popitem(last=False)
+            self.resident_bytes -= evicted.size_bytes
+            self.evictions += 1
+
+    def preload(self, clinic_ids):
+        """Load the given clinics now (e.g. the busiest ones); returns how many are resident"""
+        for clinic_id in clinic_ids:
+            self.get(clinic_id)
+        with self.lock:
+            return sum(1 for c in clinic_ids if str(c) in self.models)
+
+    def invalidate(self, clinic_id=None):
+        """Drop one clinic (or every clinic) so the next request reloads from disk"""
+        with self.lock:
+            keys = [str(clinic_id)] if clinic_id is not None else list(self.models)
+            for key in keys:
+                entry = self.models.pop(key, None)
+                if entry is not None:
+                    self.resident_bytes -= entry.size_bytes
+                self.missing.pop(key, None)
+            if clinic_id is None:
+                self.missing.clear()
+
+    def report(self):
+        with self.lock:
+            lookups = self.hits + self.loads
+            return {
+                "root": self.root,
+                "resident_models": len(self.models),
+                "resident_bytes": self.resident_bytes,
+                "max_models": self.max_models,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "loads": self.loads,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "default_served": self.default_served,
+                "load_errors": self.load_errors,
+                "evictions": self.evictions,
+                "missing_cached": len(self.missing),
+                "load_latency": self.load_latency.summary(),
+                "models": [entry.to_dict() for entry in reversed(self.models.values())]
+            }
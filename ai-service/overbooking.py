@@ -0,0 +1,137 @@
+import time
+
+import numpy as np
+
+# Random draws generated per block; bounds memory regardless of network size
+BLOCK_CELLS = 4_000_000
+
+# Draws are 16-bit integers compared against quantized probabilities (resolution 1/65536)
+DRAW_SCALE = 65536
+
+
+def _thresholds(probs):
+    """A patient attends when a uint16 draw is >= round(p * 65536)"""
+    return np.minimum(np.round(np.asarray(probs, dtype=np.float64) * DRAW_SCALE), DRAW_SCALE - 1).astype(np.uint16)
+
+
+def simulate_overbooking(sessions, n_scenarios=20000, max_overbook=5,
+                         max_overflow_prob=0.1, seed=None):
+    """Monte Carlo attendance for every session at once, with 0..max_overbook extra bookings.
+
+    sessions: [{"session_id", "capacity", "no_show_probs": [...], "extra_no_show_prob"?}]
+    Extra bookings default to the session's mean no-show probability.
+    """
+    if n_scenarios < 1:
+        raise ValueError("scenarios must be at least 1")
+    if max_overbook < 0:
+        raise ValueError("max_overbook must not be negative")
+    if not 0 <= max_overflow_prob <= 1:
+        raise ValueError("max_overflow_prob must be between 0 and 1")
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+
+    n_sessions = len(sessions)
+    capacity = np.array([int(s["capacity"]) for s in sessions], dtype=np.int16)
+    probs = [np.clip(np.asarray(s.get("no_show_probs", []), dtype=np.float32), 0, 1) for s in sessions]
+    sizes = np.array([len(p) for p in probs], dtype=np.int64)
+    all_probs = np.concatenate(probs) if sizes.sum() else np.zeros(0, dtype=np.float32)
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+    non_empty = sizes > 0
+
+    extra_prob = np.array([
+        s.get("extra_no_show_prob", float(p.mean()) if len(p) else 0.2)
+        for s, p in zip(sessions, probs)
+    ], dtype=np.float32)
+    booked_threshold = _thresholds(all_probs)
+    extra_threshold = _thresholds(extra_prob)
+
+    K = max_overbook
+    hist_bins = K + 2  # overflow of 0..K patients, last bin is "more than K"
+    sum_shows = np.zeros(n_sessions)
+    sum_all_shows = np.zeros((K + 1, n_sessions))
+    sum_overflow = np.zeros((K + 1, n_sessions))
+    overflow_at_least = np.zeros((hist_bins, K + 1, n_sessions))
+
+    cells_per_scenario = max(1, len(all_probs) + n_sessions * K)
+    block = max(1, min(n_scenarios, BLOCK_CELLS // cells_per_scenario))
+    done = 0
+    while done < n_scenarios:
+        b = min(block, n_scenarios - done)
+
+        # Booked patients: one Bernoulli draw per appointment, summed per session
+        base_shows = np.zeros((b, n_sessions), dtype=np.int16)
+        if len(all_probs):
+            draws = rng.integers(0, DRAW_SCALE, (b, len(all_probs)), dtype=np.uint16)
+            attended = draws >= booked_threshold
+            base_shows[:, non_empty] = np.add.reduceat(attended, offsets[non_empty], axis=1, dtype=np.int16)
+
+        # Attendance with 0..K extra (overbooked) patients, laid out as (extras, scenario, session)
+        extra_draws = rng.integers(0, DRAW_SCALE, (K, b, n_sessions), dtype=np.uint16)
+        shows = np.empty((K + 1, b, n_sessions), dtype=np.int16)
+        shows[0] = base_shows
+        np.add(base_shows, np.cumsum(extra_draws >= extra_threshold, axis=0, dtype=np.int16), out=shows[1:])
+        overflow = np.maximum(shows - capacity, 0)
+
+        sum_shows += base_shows.sum(axis=0)
+        sum_all_shows += shows.sum(axis=1)
+        sum_overflow += overflow.sum(axis=1)
+        for j in range(1, hist_bins):
+            overflow_at_least[j] += np.count_nonzero(overflow >= j, axis=1)
+
+        done += b
+
+    n = float(n_scenarios)
+    safe_capacity = np.maximum(capacity, 1)
+    utilization = ((sum_all_shows - sum_overflow) / n / safe_capacity).T
+    expected_overflow = (sum_overflow / n).T
+    overflow_at_least[0] = n
+    at_least = overflow_at_least / n
+    overflow_prob = at_least[1].T
+    # P(overflow == j) from P(overflow >= j); the last bin keeps the tail
+    overflow_dist = np.concatenate([at_least[:-1] - at_least[1:], at_least[-1:]]).transpose(2, 1, 0)
+
+    # Largest number of extras keeping P(overflow) under the limit (0 is always allowed)
+    allowed = overflow_prob <= max_overflow_prob
+    allowed[:, 0] = True
+    recommended = np.where(allowed.all(axis=1), K, np.argmin(allowed, axis=1) - 1)
+    recommended = np.maximum(recommended, 0)
+
+    def distribution(row):
+        labels = [str(i) for i in range(hist_bins - 1)] + [f">{hist_bins - 2}"]
+        return {label: round(float(v), 4) for label, v in zip(labels, row) if v > 0}
+
+    results = []
+    for i, session in enumerate(sessions):
+        k = int(recommended[i])
+        results.append({
+            "session_id": session.get("session_id", i),
+            "capacity": int(capacity[i]),
+            "booked": int(sizes[i]),
+            "expected_shows": round(float(sum_shows[i] / n), 3),
+            "expected_utilization": round(float(utilization[i, 0]), 4),
+            "expected_idle_slots": round(float(capacity[i] - utilization[i, 0] * capacity[i]), 3),
+            "overflow_probability": round(float(overflow_prob[i, 0]), 4),
+            "expected_overflow": round(float(expected_overflow[i, 0]), 4),
+            "overflow_distribution": distribution(overflow_dist[i, 0]),
+            "recommended_overbook": k,
+            "recommended": {
+                "expected_utilization": round(float(utilization[i, k]), 4),
+                "overflow_probability": round(float(overflow_prob[i, k]), 4),
+                "expected_overflow": round(float(expected_overflow[i, k]), 4),
+                "overflow_distribution": distribution(overflow_dist[i, k])
+            }
+        })
+
+    total_capacity = int(capacity.sum(dtype=np.int64))
+    return {
+        "sessions": results,
+        "network": {
+            "sessions": n_sessions,
+            "capacity": total_capacity,
+            "expected_utilization": round(float((utilization[:, 0] * capacity).sum() / max(total_capacity, 1)), 4),
+            "recommended_extra_bookings": int(recommended.sum())
+        },
+        "scenarios": n_scenarios,
+        "max_overflow_prob": max_overflow_prob,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)
+    }
@@ -0,0 +1,305 @@
+import atexit
+import glob
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+JOURNAL_DIR = "journal"
+
+URGENCY_CODES = {"urgent": 0, "moderate": 1, "routine": 2}
+PATH_CODES = {"model": 0, "keyword_fallback": 1, "heuristic_fallback": 2, "error_fallback": 3}
+
+# Fixed-width little-endian records; files are raw arrays of these, readable with np.memmap
+RECORD_DTYPES = {
+    "triage": np.dtype([
+        ("ts", "<f8"),
+        ("age", "<f4"),
+        ("fever", "u1"),
+        ("chest_pain", "u1"),
+        ("breathing_difficulty", "u1"),
+        ("severe_pain", "u1"),
+        ("bleeding", "u1"),
+        ("urgency", "u1"),
+        ("path", "u1"),
+        ("confidence", "<f4"),
+        ("model_version", "<u8"),
+        ("clinic_id", "S24")
+    ]),
+    "noshow": np.dtype([
+        ("ts", "<f8"),
+        ("age", "<f4"),
+        ("distance", "<f4"),
+        ("history_missed", "<f4"),
+        ("weather_bad", "u1"),
+        ("day_of_week", "u1"),
+        ("time_of_day", "u1"),
+        ("path", "u1"),
+        ("reliability_score", "<f4"),
+        ("no_show_risk", "<f4"),
+        ("confidence", "<f4"),
+        ("model_version", "<u8"),
+        ("clinic_id", "S24")
+    ])
+}
+
+
+def artifact_version(path):
+    """Model version: the first 8 bytes of the artifact's SHA-256, as an integer (0 if missing)"""
+    try:
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).digest()
+    except OSError:
+        return 0
+    return int.from_bytes(digest[:8], "little")
+
+
+def _clinic_bytes(clinic_id):
+    return str(clinic_id).encode("utf-8")[:24] if clinic_id is not None else b""
+
+
+def _u1(value):
+    """Value for a u1 field; out-of-range values are rejected rather than wrapped"""
+    number = int(value)
+    if not 0 <= number <= 255:
+        raise ValueError(f"{value} does not fit in a u1 field")
+    return number
+
+
+def _to_records(rows, dtype):
+    """Structured array for a batch; if any row does not convert, only that row is dropped"""
+    try:
+        return np.array(rows, dtype=dtype)
+    except (ValueError, TypeError, OverflowError):
+        kept = []
+        for row in rows:
+            try:
+                kept.append(np.array(row, dtype=dtype))
+            except (ValueError, TypeError, OverflowError):
+                pass
+        return np.array(kept, dtype=dtype)
+
+
+class JournalFile:
+    """One open segment plus its JSON meta sidecar"""
+
+    def __init__(self, directory, kind, versions):
+        self.kind = kind
+        self.opened = time.time()
+        stamp = datetime.fromtimestamp(self.opened).strftime("%Y%m%dT%H%M%S")
+        base = os.path.join(directory, kind, f"{kind}-{stamp}-{os.getpid()}-{int(self.opened * 1000) % 1000:03d}")
+        self.path = base + ".bin"
+        self.meta_path = base + ".meta.json"
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.file = open(self.path, "ab")
+        self.records = 0
+        self.bytes = 0
+        self.write_meta(versions, closed=False)
+
+    def write_meta(self, versions, closed):
+        meta = {
+            "kind": self.kind,
+            "dtype": RECORD_DTYPES[self.kind].descr,
+            "urgency_codes": URGENCY_CODES,
+            "path_codes": PATH_CODES,
+            "model_versions": {str(v): artifact for v, artifact in versions.items()},
+            "opened_at": datetime.fromtimestamp(self.opened).isoformat(),
+            "records": self.records,
+            "closed": closed
+        }
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, self.meta_path)
+
+    def append(self, records):
+        data = records.tobytes()
+        self.file.write(data)
+        self.file.flush()
+        self.records += len(records)
+        self.bytes += len(data)
+
+    def close(self, versions):
+        self.file.close()
+        self.write_meta(versions, closed=True)
+
+
+class PredictionJournal:
+    """Append-only binary journal of served features and predictions.
+
+    The request path builds one tuple and enqueues it; a background thread
+    batches records into per-kind segment files that rotate by size and age.
+    """
+
+    def __init__(self, directory=JOURNAL_DIR, max_bytes=64 * 1024 * 1024, max_seconds=3600,
+                 queue_size=10000, batch_size=512, enabled=True):
+        self.enabled = enabled
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.versions = {}
+        self.files = {}
+        self.counters = {"enqueued": 0, "written": 0, "dropped_queue_full": 0,
+                         "dropped_invalid": 0, "write_errors": 0, "rotations": 0}
+        if enabled:
+            threading.Thread(target=self._writer_loop, name="prediction-journal", daemon=True).start()
+            atexit.register(self.close)
+
+    @classmethod
+    def from_env(cls):
+        """Build a journal from AI_JOURNAL_* environment variables"""
+        return cls(
+            directory=os.getenv("AI_JOURNAL_DIR", JOURNAL_DIR),
+            max_bytes=int(float(os.getenv("AI_JOURNAL_MAX_MB", "64")) * 1024 * 1024),
+            max_seconds=float(os.getenv("AI_JOURNAL_ROTATE_SECONDS", "3600")),
+            queue_size=int(os.getenv("AI_JOURNAL_QUEUE_SIZE", "10000")),
+            enabled=os.getenv("AI_JOURNAL_ENABLED", "1") != "0"
+        )
+
+    def register_version(self, version, artifact):
+        """Remember which artifact a model_version hash came from (written to the meta sidecars)"""
+        if version:
+            with self.lock:
+                self.versions[version] = artifact
+
+    def _drop_invalid(self, count=1):
+        with self.lock:
+            self.counters["dropped_invalid"] += count
+        return False
+
+    def _enqueue(self, kind, row):
+        if not self.enabled:
+            return False
+        try:
+            self.queue.put_nowait((kind, row))
+        except queue.Full:
+            with self.lock:
+                self.counters["dropped_queue_full"] += 1
+            return False
+        with self.lock:
+            self.counters["enqueued"] += 1
+        return True
+
+    def record_triage(self, age, symptoms, urgency, confidence, path_used, model_version, clinic_id=None):
+        if not self.enabled:
+            return False
+        try:
+            row = (
+                time.time(), float(age),
+                _u1(symptoms["fever"]), _u1(symptoms["chest_pain"]), _u1(symptoms["breathing_difficulty"]),
+                _u1(symptoms["severe_pain"]), _u1(symptoms["bleeding"]),
+                URGENCY_CODES.get(str(urgency), 255), PATH_CODES.get(path_used, 255),
+                float(confidence), int(model_version), _clinic_bytes(clinic_id)
+            )
+        except (TypeError, ValueError, OverflowError):
+            return self._drop_invalid()
+        return self._enqueue("triage", row)
+
+    def record_noshow(self, features, risk, confidence, path_used, model_version, clinic_id=None):
+        """features: the served [age, distance, history_missed, weather_bad, day_of_week,
+        time_of_day, reliability_score] row"""
+        if not self.enabled:
+            return False
+        try:
+            age, distance, history_missed, weather_bad, day_of_week, time_of_day, reliability = features
+            row = (
+                time.time(), float(age), float(distance), float(history_missed),
+                _u1(weather_bad), _u1(day_of_week), _u1(time_of_day), PATH_CODES.get(path_used, 255),
+                float(reliability), float(risk), float(confidence), int(model_version), _clinic_bytes(clinic_id)
+            )
+        except (TypeError, ValueError, OverflowError):
+            return self._drop_invalid()
+        return self._enqueue("noshow", row)
+
+    def _segment(self, kind):
+        current = self.files.get(kind)
+        if current is not None and (current.bytes >= self.max_bytes or
+                                    time.time() - current.opened >= self.max_seconds):
+            current.close(self.versions)
+            self.counters["rotations"] += 1
+            current = None
+        if current is None:
+            current = self.files[kind] = JournalFile(self.directory, kind, self.versions)
+        return current
+
+    def _write(self, batch):
+        by_kind = {}
+        for kind, row in batch:
+            by_kind.setdefault(kind, []).append(row)
+        for kind, rows in by_kind.items():
+            try:
+                records = _to_records(rows, RECORD_DTYPES[kind])
+                if len(records) < len(rows):
+                    self._drop_invalid(len(rows) - len(records))
+                with self.lock:
+                    self._segment(kind).append(records)
+                    self.counters["written"] += len(rows)
+            except (OSError, ValueError, TypeError, OverflowError) as e:
+                with self.lock:
+                    self.counters["write_errors"] += 1
+                print(f"⚠️  Prediction journal write failed: {e}")
+
+    def _writer_loop(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+            for _ in batch:
+                self.queue.task_done()
+
+    def close(self):
+        """Flush queued records and close open segments (registered with atexit)"""
+        self.queue.join()
+        with self.lock:
+            for segment in self.files.values():
+                segment.close(self.versions)
+            self.files = {}
+
+    def report(self):
+        with self.lock:
+            return {
+                "enabled": self.enabled,
+                "directory": self.directory,
+                **self.counters,
+                "queue_depth": self.queue.qsize(),
+                "open_segments": {kind: {"path": f.path, "records": f.records, "bytes": f.bytes}
+                                  for kind, f in self.files.items()}
+            }
+
+
+def segment_paths(kind, directory=JOURNAL_DIR):
+    """Journal segments for a kind, oldest first"""
+    return sorted(glob.glob(os.path.join(directory, kind, f"{kind}-*.bin")), key=os.path.getmtime)
+
+
+def read_journal(kind, directory=JOURNAL_DIR, since=None):
+    """Memory-map every segment and return the records as one structured array.
+
+    A segment still being written may end in a partial record; only whole
+    records are mapped.
+    """
+    dtype = RECORD_DTYPES[kind]
+    parts = []
+    for path in segment_paths(kind, directory):
+        count = os.path.getsize(path) // dtype.itemsize
+        if count == 0:
+            continue
+        records = np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+        if since is not None:
+            records = records[records["ts"] >= since]
+        parts.append(records)
+    if not parts:
+        return np.zeros(0, dtype=dtype)
+    return np.concatenate(parts)
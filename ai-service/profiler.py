@@ -0,0 +1,197 @@
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+PROFILE_DIR = "profiles"
+
+
+class ProfileSession:
+    """Samples from one profiling run, written out as collapsed stacks when it ends"""
+
+    def __init__(self, seconds, interval_ms, slow_ms, all_threads, output_dir):
+        self.id = uuid.uuid4().hex[:12]
+        self.seconds = seconds
+        self.interval_ms = interval_ms
+        self.slow_ms = slow_ms
+        self.all_threads = all_threads
+        self.started_at = datetime.now().isoformat()
+        self.finished_at = None
+        self.status = "running"
+        self.stacks = Counter()
+        self.samples = 0
+        self.requests_seen = 0
+        self.requests_profiled = 0
+        self.collapsed_file = os.path.join(output_dir, f"profile-{self.id}.collapsed")
+
+    def top_functions(self, limit=20):
+        """Functions by self samples (leaf frame) and by inclusive samples (anywhere on the stack)"""
+        own = Counter()
+        inclusive = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+        total = sum(self.stacks.values()) or 1
+
+        def rows(counter):
+            return [{"function": name, "samples": count, "percent": round(100 * count / total, 1)}
+                    for name, count in counter.most_common(limit)]
+        return {"self": rows(own), "inclusive": rows(inclusive)}
+
+    def write(self):
+        os.makedirs(os.path.dirname(self.collapsed_file) or ".", exist_ok=True)
+        with open(self.collapsed_file, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def to_dict(self, include_summary=True):
+        result = {
+            "id": self.id,
+            "status": self.status,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "seconds": self.seconds,
+            "interval_ms": self.interval_ms,
+            "slow_ms": self.slow_ms,
+            "all_threads": self.all_threads,
+            "samples": self.samples,
+            "requests_seen": self.requests_seen,
+            "requests_profiled": self.requests_profiled,
+            "collapsed_file": self.collapsed_file if self.status == "finished" else None
+        }
+        if include_summary and self.status == "finished":
+            result["top_functions"] = self.top_functions()
+        return result
+
+
+class SamplingProfiler:
+    """Wall-clock stack sampler over sys._current_frames(), started on demand.
+
+    Off by default: the request hooks only read `active`. While running, threads
+    serving a request are sampled into a per-request buffer that is kept when the
+    request finishes (only if slower than slow_ms, when given). all_threads samples
+    every thread instead, which shows background work competing for the GIL.
+    """
+
+    def __init__(self, output_dir=PROFILE_DIR, max_seconds=120, keep=5):
+        self.output_dir = output_dir
+        self.max_seconds = max_seconds
+        self.keep = keep
+        self.lock = threading.Lock()
+        self.active = False
+        self.session = None
+        self.sessions = []
+        self.requests = {}
+        self.labels = {}
+
+    @classmethod
+    def from_env(cls):
+        """Build a profiler from AI_PROFILE_* environment variables"""
+        return cls(
+            output_dir=os.getenv("AI_PROFILE_DIR", PROFILE_DIR),
+            max_seconds=float(os.getenv("AI_PROFILE_MAX_SECONDS", "120"))
+        )
+
+    def start(self, seconds=10, interval_ms=5, slow_ms=None, all_threads=False):
+        """Begin a profiling run; returns None if one is already running"""
+        seconds = min(max(float(seconds), 0.1), self.max_seconds)
+        interval_ms = max(float(interval_ms), 1.0)
+        slow_ms = float(slow_ms) if slow_ms is not None else None
+        with self.lock:
+            if self.active:
+                return None
+            session = ProfileSession(seconds, interval_ms, slow_ms, bool(all_threads), self.output_dir)
+            self.session = session
+            self.requests = {}
+            self.active = True
+            self.sessions.append(session)
+            del self.sessions[:-self.keep]
+        threading.Thread(target=self._run, args=(session,), name="sampling-profiler", daemon=True).start()
+        return session.to_dict()
+
+    def get(self, session_id):
+        for session in self.sessions:
+            if session.id == session_id:
+                return session
+        return None
+
+    def report(self):
+        return {
+            "active": self.active,
+            "sessions": [s.to_dict(include_summary=False) for s in reversed(self.sessions)]
+        }
+
+    def begin_request(self):
+        """before_request hook body; callers check `active` first so idle cost is one attribute read"""
+        self.requests[threading.get_ident()] = (time.perf_counter(), Counter())
+
+    def end_request(self):
+        """teardown_request hook body: keep the request's stacks unless it was faster than slow_ms"""
+        entry = self.requests.pop(threading.get_ident(), None)
+        session = self.session
+        if entry is None or session is None:
+            return
+        started, stacks = entry
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self.lock:
+            session.requests_seen += 1
+            if session.slow_ms is None or elapsed_ms >= session.slow_ms:
+                session.requests_profiled += 1
+                session.stacks.update(stacks)
+                session.samples += sum(stacks.values())
+
+    def _label(self, code):
+        label = self.labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self.labels[code] = label
+        return label
+
+    def _stack(self, frame):
+        """Root-first collapsed stack for one frame chain"""
+        names = []
+        while frame is not None:
+            names.append(self._label(frame.f_code))
+            frame = frame.f_back
+        names.reverse()
+        return ";".join(names)
+
+    def _run(self, session):
+        own = threading.get_ident()
+        threads = {}
+        interval = session.interval_ms / 1000
+        deadline = time.monotonic() + session.seconds
+        try:
+            while time.monotonic() < deadline:
+                frames = sys._current_frames()
+                if session.all_threads:
+                    if len(threads) != len(frames):
+                        threads = {t.ident: t.name for t in threading.enumerate()}
+                    for ident, frame in frames.items():
+                        if ident == own:
+                            continue
+                        # Thread name as the root frame keeps workers and background threads apart
+                        session.stacks[f"{threads.get(ident, ident)};{self._stack(frame)}"] += 1
+                        session.samples += 1
+                else:
+                    for ident, (_, stacks) in list(self.requests.items()):
+                        frame = frames.get(ident)
+                        if frame is not None:
+                            stacks[self._stack(frame)] += 1
+                del frames
+                time.sleep(interval)
+        finally:
+            with self.lock:
+                self.active = False
+                self.requests = {}
+                session.finished_at = datetime.now().isoformat()
+                try:
+                    session.write()
+                    session.status = "finished"
+                except OSError as e:
+                    session.status = f"failed: {e}"
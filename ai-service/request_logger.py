@@ -0,0 +1,140 @@
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+# Request fields that carry free-text patient input
+REDACTED_FIELDS = {"symptoms", "original", "translated", "text"}
+
+
+class TokenBucket:
+    """Per-endpoint rate cap (records per second)"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def allow(self):
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class AsyncRequestLogger:
+    """Queue-based JSON logger; the request path only enqueues, a background thread writes"""
+
+    def __init__(self, path=None, sample_rate=1.0, rate_limit=50.0, queue_size=10000, redact=True):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.rate_limit = rate_limit
+        self.redact = redact
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.counters = {
+            "enqueued": 0,
+            "written": 0,
+            "sampled_out": 0,
+            "rate_limited": 0,
+            "dropped_queue_full": 0,
+            "write_errors": 0
+        }
+        self.writer = threading.Thread(target=self._writer_loop, name="request-logger", daemon=True)
+        self.writer.start()
+
+    @classmethod
+    def from_env(cls):
+        """Build a logger from AI_LOG_* environment variables"""
+        return cls(
+            path=os.getenv("AI_LOG_FILE") or None,
+            sample_rate=float(os.getenv("AI_LOG_SAMPLE_RATE", "1.0")),
+            rate_limit=float(os.getenv("AI_LOG_RATE_LIMIT", "50")),
+            queue_size=int(os.getenv("AI_LOG_QUEUE_SIZE", "10000")),
+            redact=os.getenv("AI_LOG_REDACT", "1") != "0"
+        )
+
+    def _redact(self, fields):
+        for key in REDACTED_FIELDS.intersection(fields):
+            value = fields[key]
+            fields[key] = {"redacted": True, "chars": len(value) if isinstance(value, str) else None}
+        return fields
+
+    def log(self, endpoint, event, level="info", **fields):
+        """Enqueue a structured record; errors bypass sampling but not the rate cap"""
+        if level == "info" and random.random() >= self.sample_rate:
+            with self.lock:
+                self.counters["sampled_out"] += 1
+            return False
+
+        with self.lock:
+            bucket = self.buckets.get(endpoint)
+            if bucket is None:
+                bucket = self.buckets[endpoint] = TokenBucket(self.rate_limit)
+            if not bucket.allow():
+                self.counters["rate_limited"] += 1
+                return False
+
+        if self.redact:
+            fields = self._redact(fields)
+
+        record = {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "level": level,
+            "endpoint": endpoint,
+            "event": event,
+            **fields
+        }
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self.lock:
+                self.counters["dropped_queue_full"] += 1
+            return False
+
+        with self.lock:
+            self.counters["enqueued"] += 1
+        return True
+
+    def _open_stream(self):
+        if self.path:
+            return open(self.path, "a", encoding="utf-8")
+        return sys.stdout
+
+    def _writer_loop(self):
+        stream = self._open_stream()
+        while True:
+            record = self.queue.get()
+            try:
+                stream.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                if self.queue.empty():
+                    stream.flush()
+                with self.lock:
+                    self.counters["written"] += 1
+            except Exception:
+                with self.lock:
+                    self.counters["write_errors"] += 1
+            finally:
+                self.queue.task_done()
+
+    def report(self):
+        """Logger configuration and drop counters"""
+        with self.lock:
+            return {
+                "destination": self.path or "stdout",
+                "sample_rate": self.sample_rate,
+                "rate_limit_per_endpoint": self.rate_limit,
+                "redact": self.redact,
+                "queue_depth": self.queue.qsize(),
+                "queue_capacity": self.queue.maxsize,
+                **self.counters
+            }
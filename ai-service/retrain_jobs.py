@@ -0,0 +1,257 @@
+import itertools
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from training_utils import remove_temp_files
+
+# Training entry points runnable as jobs
+JOB_SCRIPTS = {
+    "enhanced": "enhanced_train_models.py",
+    "logs": "retrain_models.py"
+}
+
+ACTIVE_STATES = ("queued", "running")
+
+
+class RetrainJob:
+    """State of one retraining run"""
+
+    def __init__(self, job_id, kind, requested_by=None):
+        self.id = job_id
+        self.kind = kind
+        self.status = "queued"
+        self.requested_by = [requested_by] if requested_by is not None else []
+        self.merged_requests = 0
+        self.progress = 0.0
+        self.message = "Waiting for worker"
+        self.exit_code = None
+        self.output = deque(maxlen=200)
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.process = None
+        self.cancel_requested = False
+
+    def to_dict(self):
+        now = time.time()
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "message": self.message,
+            "requested_by": list(self.requested_by),
+            "merged_requests": self.merged_requests,
+            "exit_code": self.exit_code,
+            "submitted_at": datetime.fromtimestamp(self.submitted_at).isoformat(),
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat() if self.started_at else None,
+            "finished_at": datetime.fromtimestamp(self.finished_at).isoformat() if self.finished_at else None,
+            "queued_seconds": round((self.started_at or now) - self.submitted_at, 3),
+            "run_seconds": round((self.finished_at or now) - self.started_at, 3) if self.started_at else None,
+            "output_tail": list(self.output)[-20:]
+        }
+
+
+class RetrainJobManager:
+    """Single-queue retraining runner with request merging and resource-capped workers.
+
+    Only the max_finished most recent finished jobs are kept for status queries.
+    """
+
+    def __init__(self, workdir=".", nice=10, cpu_seconds=3600, threads=1, on_success=None, max_finished=50):
+        self.workdir = workdir
+        self.nice = nice
+        self.cpu_seconds = cpu_seconds
+        self.threads = threads
+        self.on_success = on_success
+        self.max_finished = max_finished
+        self.lock = threading.Lock()
+        self.jobs = {}
+        # Ids put on the queue and not yet taken by the worker; never pruned
+        self.pending = set()
+        self.queue = queue.Queue()
+        self.ids = itertools.count(1)
+        self.worker = threading.Thread(target=self._worker_loop, name="retrain-worker", daemon=True)
+        self.worker.start()
+
+    @classmethod
+    def from_env(cls, workdir=".", on_success=None):
+        """Build a manager from AI_RETRAIN_* environment variables"""
+        return cls(
+            workdir=workdir,
+            nice=int(os.getenv("AI_RETRAIN_NICE", "10")),
+            cpu_seconds=int(os.getenv("AI_RETRAIN_CPU_SECONDS", "3600")),
+            threads=int(os.getenv("AI_RETRAIN_THREADS", "1")),
+            on_success=on_success,
+            max_finished=int(os.getenv("AI_RETRAIN_MAX_FINISHED_JOBS", "50"))
+        )
+
+    def submit(self, kind="enhanced", requested_by=None):
+        """Queue a job, or merge into the active job of the same kind; returns (job, merged)"""
+        if kind not in JOB_SCRIPTS:
+            raise ValueError(f"Unknown retraining job kind: {kind}")
+
+        with self.lock:
+            for job in self.jobs.values():
+                if job.kind == kind and job.status in ACTIVE_STATES and not job.cancel_requested:
+                    job.merged_requests += 1
+                    if requested_by is not None:
+                        job.requested_by.append(requested_by)
+                    return job.to_dict(), True
+
+            job = RetrainJob(f"job-{next(self.ids)}", kind, requested_by)
+            self.jobs[job.id] = job
+            self.pending.add(job.id)
+            self.queue.put(job.id)
+            self._prune_locked()
+            return job.to_dict(), False
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def list(self):
+        with self.lock:
+            return [job.to_dict() for job in sorted(self.jobs.values(), key=lambda j: j.submitted_at, reverse=True)]
+
+    def cancel(self, job_id):
+        """Cancel a queued job or terminate a running one"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status == "queued":
+                job.status = "cancelled"
+                job.message = "Cancelled before start"
+                job.finished_at = time.time()
+            elif job.status == "running":
+                job.cancel_requested = True
+                job.message = "Cancellation requested"
+                if job.process is not None:
+                    job.process.terminate()
+            return job.to_dict()
+
+    def _prune_locked(self):
+        # Jobs are inserted in submission order, so the oldest finished ones come first
+        finished = [job_id for job_id, job in self.jobs.items()
+                    if job.status not in ACTIVE_STATES and job_id not in self.pending]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job_id]
+
+    def _command(self, script):
+        """Trainer argv, wrapped in nice/prlimit when available so the limits apply from exec.
+
+        (preexec_fn is not used: running Python code between fork and exec in this
+        multithreaded server can deadlock.)
+        """
+        command = [sys.executable, script]
+        if os.name != "posix":
+            return command, False
+        nice, prlimit = shutil.which("nice"), shutil.which("prlimit")
+        if nice is None or prlimit is None:
+            return command, False
+        limit = f"--cpu={self.cpu_seconds}:{self.cpu_seconds}"
+        return [nice, "-n", str(self.nice), prlimit, limit] + command, True
+
+    def _limit_process(self, pid):
+        """Fallback without the nice/prlimit tools: apply the limits right after spawning"""
+        import resource
+        if hasattr(resource, "prlimit"):
+            resource.prlimit(pid, resource.RLIMIT_CPU, (self.cpu_seconds, self.cpu_seconds))
+        os.setpriority(os.PRIO_PROCESS, pid, os.getpriority(os.PRIO_PROCESS, 0) + self.nice)
+
+    def _child_env(self):
+        env = dict(os.environ)
+        threads = str(self.threads)
+        for name in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "LOKY_MAX_CPU_COUNT"):
+            env[name] = threads
+        env["PYTHONUNBUFFERED"] = "1"
+        return env
+
+    def _worker_loop(self):
+        while True:
+            job_id = self.queue.get()
+            with self.lock:
+                self.pending.discard(job_id)
+                job = self.jobs.get(job_id)
+                if job is None or job.status != "queued":
+                    continue
+                job.status = "running"
+                job.started_at = time.time()
+                job.message = "Starting"
+            try:
+                self._run(job)
+            except Exception as e:
+                with self.lock:
+                    job.status = "failed"
+                    job.message = f"Failed to run job: {e}"
+                    job.finished_at = time.time()
+            if job.status != "succeeded":
+                # A terminated or crashed trainer never reaches atomic_dump's cleanup
+                removed = remove_temp_files(self.workdir, since=job.started_at)
+                if removed:
+                    with self.lock:
+                        job.output.append(f"Removed {len(removed)} partial artifact files")
+            with self.lock:
+                self._prune_locked()
+
+    def _run(self, job):
+        script = os.path.join(self.workdir, JOB_SCRIPTS[job.kind])
+        command, limited = self._command(script)
+        process = subprocess.Popen(
+            command,
+            cwd=self.workdir,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            env=self._child_env()
+        )
+        if not limited and os.name == "posix":
+            try:
+                self._limit_process(process.pid)
+            except OSError as e:
+                with self.lock:
+                    job.output.append(f"Could not apply resource limits: {e}")
+        with self.lock:
+            job.process = process
+            if job.cancel_requested:
+                process.terminate()
+
+        for line in process.stdout:
+            line = line.rstrip()
+            with self.lock:
+                job.output.append(line)
+                if line.startswith("PROGRESS "):
+                    parts = line.split(" ", 2)
+                    try:
+                        job.progress = float(parts[1])
+                    except ValueError:
+                        pass
+                    job.message = parts[2] if len(parts) > 2 else job.message
+
+        exit_code = process.wait()
+        with self.lock:
+            job.exit_code = exit_code
+            job.process = None
+            job.finished_at = time.time()
+            if job.cancel_requested:
+                job.status = "cancelled"
+                job.message = "Cancelled while running"
+            elif exit_code == 0:
+                job.status = "succeeded"
+                job.progress = 1.0
+                job.message = "Completed"
+            else:
+                job.status = "failed"
+                job.message = f"Exited with code {exit_code}"
+
+        if job.status == "succeeded" and self.on_success is not None:
+            self.on_success(job.kind)
@@ -4,17 +4,25 @@ from sklearn.tree import DecisionTreeClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
-import pickle
-import pymongo
 from datetime import datetime, timedelta
 import os
+import sys
 from dotenv import load_dotenv
+from enhanced_train_models import NOSHOW_FEATURES, TRIAGE_FEATURES, EnhancedAITrainer
+from prediction_journal import JOURNAL_DIR, URGENCY_CODES, read_journal
+from shadow_eval import CANDIDATE_DIR
+from training_utils import atomic_dump, report_progress
+
+# Fewer journal rows than this and a candidate is not worth shadow-evaluating
+MIN_JOURNAL_SAMPLES = 50
 
 # Load environment variables
 load_dotenv()
 
 def connect_to_mongodb():
     """Connect to MongoDB and return the logs collection"""
+    # Only the legacy --from-mongo source needs the driver
+    import pymongo
     try:
         client = pymongo.MongoClient(os.getenv('MONGO_URL', 'mongodb://localhost:27017/healthcare'))
         db = client.healthcare
@@ -92,6 +100,57 @@ def extract_features_from_logs(logs_collection):
     print(f"📈 Extracted {len(triage_data)} triage samples and {len(noshow_data)} no-show samples")
     return triage_data, noshow_data
 
+def extract_features_from_journal(directory=JOURNAL_DIR, days=30):
+    """Training frames straight from the memory-mapped prediction journal.
+    
+    Columns are the enhanced models' full feature lists as actually served, so
+    nothing has to be simulated. The journal holds no outcomes: triage rows are
+    labelled with the served urgency and no-show rows with no_show_risk > 0.5.
+    """
+    print("📊 Reading prediction journal...")
+    since = (datetime.now() - timedelta(days=days)).timestamp()
+    
+    urgency_names = np.array(sorted(URGENCY_CODES, key=URGENCY_CODES.get))
+    triage = read_journal("triage", directory, since=since)
+    # Urgencies outside URGENCY_CODES are journaled as 255
+    triage = triage[triage['urgency'] < len(urgency_names)]
+    triage_data = pd.DataFrame({name: triage[name].astype(float) for name in TRIAGE_FEATURES})
+    triage_data['urgency'] = urgency_names[triage['urgency']]
+    
+    noshow = read_journal("noshow", directory, since=since)
+    noshow_data = pd.DataFrame({name: noshow[name].astype(float) for name in NOSHOW_FEATURES})
+    noshow_data['no_show'] = (noshow['no_show_risk'] > 0.5).astype(int)
+    
+    print(f"📈 Read {len(triage_data)} triage samples and {len(noshow_data)} no-show samples")
+    return triage_data, noshow_data
+
+def retrain_candidates(triage_data, noshow_data, output_dir=CANDIDATE_DIR):
+    """Train the enhanced models on journal frames and save them as shadow candidates.
+    
+    Uses the same model selection and artifact files as enhanced_train_models.py,
+    written to output_dir (the ShadowEvaluator candidate directory) so the live
+    models are only replaced after the candidate has been compared against them.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    trainer = EnhancedAITrainer()
+    trained = []
+    
+    for name, df, label, train in (
+        ("triage", triage_data, 'urgency', trainer.train_enhanced_triage_model),
+        ("no-show", noshow_data, 'no_show', trainer.train_enhanced_noshow_model)
+    ):
+        if len(df) < MIN_JOURNAL_SAMPLES:
+            print(f"⚠️  Only {len(df)} {name} samples in the journal, no candidate trained")
+            continue
+        if df[label].nunique() < 2:
+            print(f"⚠️  Only one {name} class in the journal, no candidate trained")
+            continue
+        train(df, output_dir=output_dir)
+        trained.append(name)
+    
+    print(f"✅ Candidates written to {output_dir}: {', '.join(trained) or 'none'}")
+    return trained
+
 def retrain_triage_model(triage_data):
     """Retrain the triage Decision Tree model"""
     if len(triage_data) < 5:
@@ -104,6 +163,9 @@ def retrain_triage_model(triage_data):
     df = pd.DataFrame(triage_data)
     X = df[['age', 'symptom_fever', 'symptom_chestpain']]
     y = df['urgent']
+    if y.nunique() < 2:
+        print("⚠️  Only one triage class in the data, keeping the original model")
+        return None
     
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
@@ -118,7 +180,7 @@ def retrain_triage_model(triage_data):
     print(f"📊 Triage model accuracy: {accuracy:.3f}")
     
     # Save model
-    pickle.dump(model, open("triage_model.pkl", "wb"))
+    atomic_dump(model, "triage_model.pkl", use_pickle=True)
     print("✅ Triage model retrained and saved")
     
     return model
@@ -135,6 +197,9 @@ def retrain_noshow_model(noshow_data):
     df = pd.DataFrame(noshow_data)
     X = df[['age', 'distance', 'history_missed', 'weather_bad']]
     y = df['no_show']
+    if y.nunique() < 2:
+        print("⚠️  Only one no-show class in the data, keeping the original model")
+        return None
     
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
@@ -149,7 +214,28 @@ def retrain_noshow_model(noshow_data):
     print(f"📊 No-show model accuracy: {accuracy:.3f}")
     
     # Save model
-    pickle.dump(model, open("noshow_model.pkl", "wb"))
+    atomic_dump(model, "noshow_model.pkl", use_pickle=True)
     print("✅ No-show model retrained and saved")
     
     return model
+
+if __name__ == "__main__":
+    if "--from-mongo" in sys.argv:
+        # Legacy source: booking logs with simulated feature values
+        report_progress(0.05, "Connecting to MongoDB")
+        logs_collection = connect_to_mongodb()
+        if logs_collection is None:
+            sys.exit(1)
+        
+        report_progress(0.2, "Extracting features from logs")
+        triage_data, noshow_data = extract_features_from_logs(logs_collection)
+        
+        report_progress(0.5, "Retraining triage model")
+        retrain_triage_model(triage_data)
+        
+        report_progress(0.8, "Retraining no-show model")
+        retrain_noshow_model(noshow_data)
+    else:
+        report_progress(0.02, "Reading prediction journal")
+        triage_data, noshow_data = extract_features_from_journal(os.getenv("AI_JOURNAL_DIR", JOURNAL_DIR))
+        retrain_candidates(triage_data, noshow_data, os.getenv("AI_SHADOW_MODEL_DIR", CANDIDATE_DIR))
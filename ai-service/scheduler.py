@@ -0,0 +1,189 @@
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+
+from clinic_time import to_epoch
+
+URGENCY_RANK = {"urgent": 0, "moderate": 1, "routine": 2}
+
+# Target waits used by the /recommend route (+2h, +24h, within a week)
+TARGET_WAIT_HOURS = {"urgent": 2, "moderate": 24, "routine": 24 * 7}
+
+ANY = "*"
+
+
+def to_iso(epoch):
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).isoformat()
+
+
+def calendar_key(clinic_id, staff_id):
+    """Index key for a clinic (and optionally staff member); ids compare as strings,
+    so a calendar loaded with clinic 7 serves requests for "7" and vice versa"""
+    return (str(clinic_id), str(staff_id) if staff_id is not None else ANY)
+
+
+class SlotList:
+    """Slots under one key in start order; next-free pointers skip taken slots"""
+
+    def __init__(self):
+        self.starts = []
+        self.ids = []
+        self.parent = [0]
+
+    def append(self, start, slot_id):
+        self.starts.append(start)
+        self.ids.append(slot_id)
+
+    def finalize(self):
+        order = sorted(range(len(self.starts)), key=self.starts.__getitem__)
+        self.starts = [self.starts[i] for i in order]
+        self.ids = [self.ids[i] for i in order]
+        # parent[i] == i means slot i may be free; index len(starts) is the end sentinel
+        self.parent = list(range(len(self.starts) + 1))
+
+    def _find(self, i):
+        parent = self.parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    def take_earliest(self, not_before, taken):
+        """Claim the earliest free slot starting at or after not_before"""
+        i = bisect_left(self.starts, not_before)
+        end = len(self.starts)
+        while True:
+            j = self._find(i)
+            if j == end:
+                return None
+            self.parent[j] = j + 1
+            slot_id = self.ids[j]
+            if not taken[slot_id]:
+                return slot_id
+            # Taken through another key (clinic/staff/network view); skip it lazily
+            i = j + 1
+
+
+class SlotAllocator:
+    """Free slots indexed per clinic, per staff member and network-wide"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.slot_start = []
+        self.slot_end = []
+        self.slot_clinic = []
+        self.slot_staff = []
+        self.taken = bytearray()
+        self.free_count = 0
+        self.lists = {}
+
+    def _append(self, key, start, slot_id):
+        slots = self.lists.get(key)
+        if slots is None:
+            slots = self.lists[key] = SlotList()
+        slots.append(start, slot_id)
+
+    def add_slots(self, clinic_id, staff_id, starts, duration_minutes):
+        """Register free slots; lists are re-sorted by load_calendar"""
+        duration = duration_minutes * 60
+        for start in starts:
+            slot_id = len(self.slot_start)
+            self.slot_start.append(start)
+            self.slot_end.append(start + duration)
+            self.slot_clinic.append(clinic_id)
+            self.slot_staff.append(staff_id)
+            self.taken.append(0)
+            self.free_count += 1
+            self._append(ANY, start, slot_id)
+            self._append(calendar_key(clinic_id, None), start, slot_id)
+            if staff_id is not None:
+                self._append(calendar_key(clinic_id, staff_id), start, slot_id)
+
+    def load_calendar(self, entries, replace=True):
+        """Build free slots from working blocks: {clinic_id, staff_id, start, end, slot_minutes, booked}"""
+        with self.lock:
+            if not isinstance(entries, list):
+                raise ValueError("entries must be a list")
+            for i, entry in enumerate(entries):
+                if not isinstance(entry, dict):
+                    raise ValueError(f"entry {i} must be an object")
+            if replace:
+                self.reset()
+            for entry in entries:
+                start = to_epoch(entry["start"])
+                end = to_epoch(entry["end"])
+                step = int(entry.get("slot_minutes", 30)) * 60
+                booked = {to_epoch(b) for b in entry.get("booked", [])}
+                starts = [t for t in range(int(start), int(end) - step + 1, step) if t not in booked]
+                self.add_slots(entry["clinic_id"], entry.get("staff_id"), starts, step // 60)
+            for slots in self.lists.values():
+                slots.finalize()
+            return self.report()
+
+    def assign_batch(self, requests, now=None):
+        """Assign the earliest feasible slot to each request, highest priority first.
+
+        A malformed request gets an error result in its position; the rest of the
+        batch is still assigned.
+        """
+        if not isinstance(requests, list):
+            raise ValueError("requests must be a list")
+        now = to_epoch(now) if now is not None else time.time()
+        prepared = []
+        results = [None] * len(requests)
+        for i, req in enumerate(requests):
+            if not isinstance(req, dict):
+                results[i] = {"request_id": i, "error": "request must be an object"}
+                continue
+            try:
+                urgency = str(req.get("urgency", "routine"))
+                risk = float(req.get("no_show_risk", 0.0))
+                not_before = to_epoch(req.get("not_before")) or now
+            except (TypeError, ValueError) as e:
+                results[i] = {"request_id": req.get("request_id", i), "error": f"Invalid request: {e}"}
+                continue
+            # Urgency first; within a tier, higher no-show risk goes earlier since
+            # longer lead times raise no-show rates
+            prepared.append((URGENCY_RANK.get(urgency, 2), -risk, not_before, i, urgency))
+        prepared.sort()
+
+        with self.lock:
+            for _, _, not_before, i, urgency in prepared:
+                req = requests[i]
+                clinic_id = req.get("clinic_id")
+                key = ANY if clinic_id is None else calendar_key(clinic_id, req.get("staff_id"))
+
+                slots = self.lists.get(key)
+                slot_id = slots.take_earliest(not_before, self.taken) if slots else None
+                result = {"request_id": req.get("request_id", i), "urgency": urgency}
+                if slot_id is None:
+                    result.update({"slot_start": None, "reason": "no_free_slot"})
+                else:
+                    self.taken[slot_id] = 1
+                    self.free_count -= 1
+                    start = self.slot_start[slot_id]
+                    wait_hours = (start - not_before) / 3600
+                    result.update({
+                        "slot_start": to_iso(start),
+                        "slot_end": to_iso(self.slot_end[slot_id]),
+                        "clinic_id": self.slot_clinic[slot_id],
+                        "staff_id": self.slot_staff[slot_id],
+                        "wait_minutes": round(wait_hours * 60, 1),
+                        "within_target": wait_hours <= TARGET_WAIT_HOURS.get(urgency, TARGET_WAIT_HOURS["routine"])
+                    })
+                results[i] = result
+        return results
+
+    def report(self):
+        return {
+            "total_slots": len(self.slot_start),
+            "free_slots": self.free_count,
+            "clinics": len({str(c) for c in self.slot_clinic}),
+            "staff_calendars": len([k for k in self.lists if k != ANY and k[1] != ANY])
+        }
@@ -0,0 +1,232 @@
+import os
+import pickle
+import queue
+import random
+import threading
+import time
+from collections import deque
+
+import joblib
+import numpy as np
+
+# Candidate artifacts use the live file names; retrain_models.py writes here by default
+CANDIDATE_DIR = "candidate"
+
+
+class LatencyWindow:
+    """Rolling window of latency observations in milliseconds"""
+
+    def __init__(self, size=1000):
+        self.values = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, latency_ms):
+        self.values.append(latency_ms)
+        self.count += 1
+        self.total += latency_ms
+
+    def summary(self):
+        if not self.values:
+            return {"count": 0, "mean_ms": None, "p50_ms": None, "p95_ms": None}
+        window = np.fromiter(self.values, dtype=float)
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3),
+            "p50_ms": round(float(np.percentile(window, 50)), 3),
+            "p95_ms": round(float(np.percentile(window, 95)), 3)
+        }
+
+
+class ShadowStats:
+    """Agreement, confidence and latency counters for one model kind"""
+
+    def __init__(self):
+        self.submitted = 0
+        self.dropped = 0
+        self.evaluated = 0
+        self.errors = 0
+        self.agreements = 0
+        self.confidence_delta_sum = 0.0
+        self.confidence_abs_delta_sum = 0.0
+        self.primary_latency = LatencyWindow()
+        self.candidate_latency = LatencyWindow()
+
+    def to_dict(self):
+        evaluated = self.evaluated
+        return {
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "evaluated": evaluated,
+            "errors": self.errors,
+            "agreement_rate": round(self.agreements / evaluated, 4) if evaluated else None,
+            "mean_confidence_delta": round(self.confidence_delta_sum / evaluated, 4) if evaluated else None,
+            "mean_abs_confidence_delta": round(self.confidence_abs_delta_sum / evaluated, 4) if evaluated else None,
+            "latency": {
+                "primary": self.primary_latency.summary(),
+                "candidate": self.candidate_latency.summary()
+            }
+        }
+
+
+class ShadowEvaluator:
+    """Scores a sample of served feature rows with candidate models off the response path"""
+
+    def __init__(self, candidate_dir=CANDIDATE_DIR, sample_rate=0.1, queue_size=1000,
+                 workers=2, fallback_label_encoder=None):
+        self.candidate_dir = candidate_dir
+        self.sample_rate = sample_rate
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.stats = {"triage": ShadowStats(), "noshow": ShadowStats()}
+        self.fallback_label_encoder = fallback_label_encoder
+        self.candidates = self._load_candidates(fallback_label_encoder)
+        self.worker_count = workers
+        self.workers = []
+        self._start_workers()
+
+    def _start_workers(self):
+        if not self.candidates or self.workers:
+            return
+        for i in range(self.worker_count):
+            worker = threading.Thread(target=self._worker_loop,
+                                      name=f"shadow-worker-{i}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    @classmethod
+    def from_env(cls, fallback_label_encoder=None):
+        """Build an evaluator from AI_SHADOW_* environment variables"""
+        return cls(
+            candidate_dir=os.getenv("AI_SHADOW_MODEL_DIR", CANDIDATE_DIR),
+            sample_rate=float(os.getenv("AI_SHADOW_SAMPLE_RATE", "0.1")),
+            queue_size=int(os.getenv("AI_SHADOW_QUEUE_SIZE", "1000")),
+            workers=int(os.getenv("AI_SHADOW_WORKERS", "2")),
+            fallback_label_encoder=fallback_label_encoder
+        )
+
+    def _load_optional(self, filename):
+        path = os.path.join(self.candidate_dir, filename)
+        if not os.path.exists(path):
+            return None
+        return joblib.load(path)
+
+    def _load_candidates(self, fallback_label_encoder):
+        """Load candidate artifacts that use the same file names as the live models"""
+        candidates = {}
+        if not os.path.isdir(self.candidate_dir):
+            return candidates
+
+        try:
+            triage_model = self._load_optional("enhanced_triage_model.pkl")
+            if triage_model is not None:
+                candidates["triage"] = {
+                    "model": triage_model,
+                    "scaler": self._load_optional("triage_scaler.pkl"),
+                    "label_encoder": self._load_optional("triage_label_encoder.pkl") or fallback_label_encoder
+                }
+                print(f"👥 Shadow triage candidate loaded from {self.candidate_dir}")
+
+            noshow_model = self._load_optional("enhanced_noshow_model.pkl")
+            if noshow_model is not None:
+                candidates["noshow"] = {
+                    "model": noshow_model,
+                    "scaler": self._load_optional("noshow_scaler.pkl")
+                }
+                print(f"👥 Shadow no-show candidate loaded from {self.candidate_dir}")
+        except (OSError, pickle.UnpicklingError) as e:
+            print(f"⚠️  Failed to load shadow candidates: {e}")
+            return {}
+
+        return candidates
+
+    def reload(self):
+        """Re-read the candidate directory after a retraining job wrote new candidates.
+
+        Statistics restart, since they described the previous candidates.
+        """
+        candidates = self._load_candidates(self.fallback_label_encoder)
+        with self.lock:
+            self.candidates = candidates
+            self.stats = {"triage": ShadowStats(), "noshow": ShadowStats()}
+        self._start_workers()
+        return sorted(candidates)
+
+    @property
+    def enabled(self):
+        return bool(self.candidates)
+
+    def submit(self, kind, features, primary_prediction, primary_confidence, primary_latency_ms):
+        """Offer a served feature row for shadow scoring; never blocks the caller"""
+        if kind not in self.candidates or random.random() >= self.sample_rate:
+            return False
+
+        try:
+            self.queue.put_nowait((kind, features, primary_prediction,
+                                   primary_confidence, primary_latency_ms))
+        except queue.Full:
+            with self.lock:
+                self.stats[kind].dropped += 1
+            return False
+
+        with self.lock:
+            self.stats[kind].submitted += 1
+        return True
+
+    def _score_candidate(self, kind, features):
+        candidate = self.candidates[kind]
+        model = candidate["model"]
+        scaler = candidate["scaler"]
+        X = scaler.transform(features) if scaler is not None else features
+
+        if kind == "triage":
+            pred_encoded = model.predict(X)[0]
+            encoder = candidate["label_encoder"]
+            label = encoder.inverse_transform([pred_encoded])[0] if encoder is not None else pred_encoded
+            confidence = max(model.predict_proba(X)[0]) if hasattr(model, "predict_proba") else 0.8
+            return label, float(confidence)
+
+        prob = float(model.predict_proba(X)[0][1])
+        return prob >= 0.5, prob
+
+    def _worker_loop(self):
+        while True:
+            kind, features, primary_prediction, primary_confidence, primary_latency_ms = self.queue.get()
+            try:
+                start = time.perf_counter()
+                candidate_prediction, candidate_confidence = self._score_candidate(kind, features)
+                candidate_latency_ms = (time.perf_counter() - start) * 1000
+
+                if kind == "noshow":
+                    primary_prediction = primary_confidence >= 0.5
+
+                delta = candidate_confidence - float(primary_confidence)
+                with self.lock:
+                    stats = self.stats[kind]
+                    stats.evaluated += 1
+                    if candidate_prediction == primary_prediction:
+                        stats.agreements += 1
+                    stats.confidence_delta_sum += delta
+                    stats.confidence_abs_delta_sum += abs(delta)
+                    stats.primary_latency.add(primary_latency_ms)
+                    stats.candidate_latency.add(candidate_latency_ms)
+            except Exception:
+                with self.lock:
+                    self.stats[kind].errors += 1
+            finally:
+                self.queue.task_done()
+
+    def report(self):
+        """Snapshot of shadow evaluation statistics"""
+        with self.lock:
+            return {
+                "enabled": self.enabled,
+                "candidate_dir": self.candidate_dir,
+                "candidates": sorted(self.candidates.keys()),
+                "sample_rate": self.sample_rate,
+                "queue_depth": self.queue.qsize(),
+                "queue_capacity": self.queue.maxsize,
+                "workers": len(self.workers),
+                "triage": self.stats["triage"].to_dict(),
+                "noshow": self.stats["noshow"].to_dict()
+            }
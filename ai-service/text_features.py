@@ -0,0 +1,46 @@
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+HASHED_TRIAGE_FILE = "triage_hashed_model.pkl"
+
+# Hashed columns; model size is fixed by this, not by how much text it has seen
+HASH_FEATURES = 2 ** 12
+
+
+class HashedTriageModel:
+    """Triage classifier over the scaled symptom flags plus hashed word n-grams of the text.
+
+    The hashing vectorizer is stateless (no vocabulary), so memory is bounded by
+    n_features regardless of the text seen in training or serving.
+    """
+
+    def __init__(self, n_features=HASH_FEATURES, ngram_range=(1, 2), C=1.0):
+        self.n_features = n_features
+        self.hasher = HashingVectorizer(n_features=n_features, ngram_range=ngram_range,
+                                        alternate_sign=False, norm="l2")
+        self.scaler = StandardScaler()
+        self.model = LogisticRegression(C=C, max_iter=1000)
+        self.metrics = {}
+
+    def matrix(self, dense, texts):
+        """CSR batch: scaled dense features followed by the hashed text columns"""
+        dense_scaled = self.scaler.transform(np.asarray(dense, dtype=float))
+        return sparse.hstack([sparse.csr_matrix(dense_scaled), self.hasher.transform(texts)], format="csr")
+
+    def fit(self, dense, texts, labels):
+        self.scaler.fit(np.asarray(dense, dtype=float))
+        self.model.fit(self.matrix(dense, texts), labels)
+        return self
+
+    def predict(self, dense, texts):
+        """Labels and confidences for a batch of rows"""
+        proba = self.model.predict_proba(self.matrix(dense, texts))
+        best = proba.argmax(axis=1)
+        return self.model.classes_[best], proba[np.arange(len(best)), best]
+
+    def memory_bytes(self):
+        return int(self.model.coef_.nbytes + self.model.intercept_.nbytes +
+                   self.scaler.mean_.nbytes + self.scaler.scale_.nbytes)
@@ -0,0 +1,45 @@
+import glob
+import os
+import pickle
+import tempfile
+
+import joblib
+
+
+def atomic_dump(obj, path, use_pickle=False, raw=False):
+    """Write an artifact to a temp file in the same directory, then rename it into place;
+    with raw=True obj is already-serialized bytes and is written as is"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if raw:
+                f.write(obj)
+            elif use_pickle:
+                pickle.dump(obj, f)
+            else:
+                joblib.dump(obj, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def remove_temp_files(directory, since=None):
+    """Delete atomic_dump temp files a killed run left behind (only those modified at or
+    after since, epoch seconds, when given); returns the paths removed"""
+    removed = []
+    for path in glob.glob(os.path.join(directory, "*.pkl.*.tmp")):
+        try:
+            if since is None or os.path.getmtime(path) >= since:
+                os.unlink(path)
+                removed.append(path)
+        except OSError:
+            pass
+    return removed
+
+
+def report_progress(fraction, message):
+    """Emit a progress marker parsed by the retraining job manager"""
+    print(f"PROGRESS {fraction:.2f} {message}", flush=True)
@@ -0,0 +1,240 @@
+import json
+import operator
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from functools import reduce
+
+import numpy as np
+
+from fuzzy_matcher import TOKEN_CHAR, DeletionIndex, load_word_list
+
+RULES_FILE = "triage_rules.json"
+
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne
+}
+
+
+def _term_pattern(terms):
+    """Whole-word alternation over literal terms, in file order"""
+    return r'\b(' + '|'.join(re.escape(term) for term in terms) + r')\b'
+
+
+def _token_pattern(term):
+    """A literal term as whole tokens (the fuzzy matcher's token rules, so Devanagari
+    vowel signs do not count as boundaries): "high" matches "high fever" and
+    "high-fever", not "thigh"."""
+    return r'(?<!' + TOKEN_CHAR + ')' + re.escape(term) + r'(?!' + TOKEN_CHAR + ')'
+
+
+# How severity modifier terms are found in the text. Rule files before version 4
+# were written for substring matching ("high" also in "thigh") and keep it.
+SEVERITY_MATCHERS = {
+    "substring": re.escape,
+    "token": _token_pattern
+}
+
+
+def _compile_condition(node, features):
+    """Condition tree to a function of a column dict.
+
+    Combinators use | and & rather than or/and so the same function works on
+    scalars (one request) and numpy arrays (a batch).
+    """
+    if "any" in node or "all" in node:
+        combine = operator.or_ if "any" in node else operator.and_
+        parts = [_compile_condition(child, features) for child in node.get("any", node.get("all"))]
+        if not parts:
+            raise ValueError("Empty any/all condition in triage rules")
+        return lambda cols: reduce(combine, (part(cols) for part in parts))
+
+    name = node["feature"]
+    if name not in features:
+        raise ValueError(f"Unknown feature in triage rules: {name}")
+    if node["op"] not in OPERATORS:
+        raise ValueError(f"Unknown operator in triage rules: {node['op']}")
+    compare = OPERATORS[node["op"]]
+    value = node["value"]
+    return lambda cols: compare(cols[name], value)
+
+
+class CompiledRules:
+    """One version of the rule file, compiled into regexes and an ordered decision list"""
+
+    def __init__(self, spec, mtime=None, extra_vocabulary=(), base_dir="."):
+        self.version = spec["version"]
+        self.mtime = mtime
+        self.loaded_at = datetime.now().isoformat()
+        self.match_patterns = {
+            level: [re.compile(_term_pattern(terms), re.IGNORECASE) for terms in groups]
+            for level, groups in spec["match_patterns"].items()
+        }
+        self.severity_terms = [
+            (term, modifier["weight"])
+            for modifier in spec["severity_modifiers"].values()
+            for term in modifier["terms"]
+        ]
+        self.severity_match = spec.get("severity_match", "substring")
+        if self.severity_match not in SEVERITY_MATCHERS:
+            raise ValueError(f"Unknown severity_match in triage rules: {self.severity_match}")
+        self.severity_patterns = [(re.compile(SEVERITY_MATCHERS[self.severity_match](term)), weight)
+                                  for term, weight in self.severity_terms]
+        self.symptom_patterns = {
+            name: re.compile(_term_pattern(terms)) for name, terms in spec["symptoms"].items()
+        }
+
+        features = {f"{level}_count" for level in self.match_patterns}
+        features |= set(self.symptom_patterns) | {"severity_score", "age", "symptom_count"}
+        self.rule_names = []
+        self.conditions = []
+        self.labels = []
+        for rule in spec["rules"]:
+            self.rule_names.append(rule.get("name", rule["urgency"]))
+            self.conditions.append(_compile_condition(rule["when"], features))
+            self.labels.append(rule["urgency"])
+        self.default = spec["default"]
+
+        # Misspelling-tolerant lookup over the symptom and urgency words (and translations).
+        # Real English words are never rewritten ("stick" is not "sick"), and words that
+        # are only severity modifiers are never correction targets ("hight" is not "high").
+        fuzzy = spec.get("fuzzy", {})
+        self.fuzzy = None
+        self.dictionary_size = 0
+        if fuzzy.get("enabled"):
+            terms = [term for groups in spec["match_patterns"].values() for group in groups for term in group]
+            terms += [term for terms_ in spec["symptoms"].values() for term in terms_]
+            terms += list(extra_vocabulary)
+            targets = {word for term in terms for word in term.lower().split()}
+            modifiers = {word for term, _ in self.severity_terms for word in term.lower().split()}
+            protected = set(fuzzy.get("protected", ())) | (modifiers - targets)
+            if fuzzy.get("dictionary"):
+                dictionary = load_word_list(os.path.join(base_dir, fuzzy["dictionary"]))
+                self.dictionary_size = len(dictionary)
+                protected |= dictionary
+            self.fuzzy = DeletionIndex(
+                targets,
+                min_length=fuzzy.get("min_length", 4),
+                long_length=fuzzy.get("long_length", 8),
+                short_distance=fuzzy.get("short_distance", 1),
+                long_distance=fuzzy.get("long_distance", 2),
+                protected=protected
+            )
+
+    def correct(self, text):
+        """Lower-cased text with misspelled vocabulary words replaced"""
+        text_lower = text.lower()
+        return self.fuzzy.correct(text_lower) if self.fuzzy is not None else text_lower
+
+    def extract(self, text):
+        """Symptom flags and match counts for one text"""
+        text_lower = self.correct(text)
+        analysis = {
+            f"{level}_count": sum(len(pattern.findall(text_lower)) for pattern in patterns)
+            for level, patterns in self.match_patterns.items()
+        }
+        analysis["severity_score"] = sum(weight for pattern, weight in self.severity_patterns
+                                         if pattern.search(text_lower))
+        symptoms = {
+            name: 1 if pattern.search(text_lower) else 0
+            for name, pattern in self.symptom_patterns.items()
+        }
+        return symptoms, analysis
+
+    def decide(self, symptoms, analysis, age=30):
+        """Urgency from extracted features; values may be scalars or equal-length arrays"""
+        cols = {**analysis, **symptoms, "age": age, "symptom_count": sum(symptoms.values())}
+        if not any(isinstance(value, np.ndarray) for value in cols.values()):
+            for condition, label in zip(self.conditions, self.labels):
+                if condition(cols):
+                    return label
+            return self.default
+
+        size = max(len(value) for value in cols.values() if isinstance(value, np.ndarray))
+        choices = [np.broadcast_to(condition(cols), size) for condition in self.conditions]
+        return np.select(choices, self.labels, default=self.default)
+
+    def decide_batch(self, extracted, ages):
+        """Urgency for a list of (symptoms, analysis) pairs in one vectorized pass"""
+        if not extracted:
+            return np.array([], dtype=object)
+        symptoms = {name: np.array([s[name] for s, _ in extracted]) for name in extracted[0][0]}
+        analysis = {name: np.array([a[name] for _, a in extracted]) for name in extracted[0][1]}
+        return self.decide(symptoms, analysis, np.asarray(ages, dtype=float))
+
+
+def load_rules(path=RULES_FILE, extra_vocabulary=()):
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+    return CompiledRules(spec, mtime=os.path.getmtime(path), extra_vocabulary=extra_vocabulary,
+                         base_dir=os.path.dirname(os.path.abspath(path)))
+
+
+class TriageRules:
+    """Current compiled rules, reloaded when the rule file changes on disk"""
+
+    def __init__(self, path=RULES_FILE, check_interval=5.0, extra_vocabulary=()):
+        self.path = path
+        self.check_interval = check_interval
+        self.extra_vocabulary = tuple(extra_vocabulary)
+        self.lock = threading.Lock()
+        self.compiled = load_rules(path, self.extra_vocabulary)
+        self.seen_mtime = self.compiled.mtime
+        self.last_check = time.monotonic()
+        self.last_error = None
+
+    @classmethod
+    def from_env(cls, extra_vocabulary=()):
+        """Build from AI_TRIAGE_RULES_* environment variables"""
+        return cls(
+            path=os.getenv("AI_TRIAGE_RULES_FILE", RULES_FILE),
+            check_interval=float(os.getenv("AI_TRIAGE_RULES_CHECK_SECONDS", "5")),
+            extra_vocabulary=extra_vocabulary
+        )
+
+    def current(self):
+        """Compiled rules, checking the file's mtime at most once per check_interval"""
+        now = time.monotonic()
+        if now - self.last_check >= self.check_interval:
+            self.last_check = now
+            try:
+                mtime = os.path.getmtime(self.path)
+                if mtime != self.seen_mtime:
+                    self.seen_mtime = mtime
+                    self.reload()
+                    print(f"✅ Reloaded triage rules version {self.compiled.version}")
+            except (OSError, ValueError, KeyError) as e:
+                # Keep serving the last good rules; a broken edit must not take triage down
+                self.last_error = str(e)
+                print(f"⚠️  Could not reload triage rules: {e}")
+        return self.compiled
+
+    def reload(self):
+        """Compile the rule file and swap it in; raises if the file is invalid"""
+        with self.lock:
+            compiled = load_rules(self.path, self.extra_vocabulary)
+            self.compiled = compiled
+            self.seen_mtime = compiled.mtime
+            self.last_error = None
+        return compiled
+
+    def report(self):
+        compiled = self.compiled
+        return {
+            "path": self.path,
+            "version": compiled.version,
+            "loaded_at": compiled.loaded_at,
+            "rules": list(zip(compiled.rule_names, compiled.labels)),
+            "default": compiled.default,
+            "severity_match": compiled.severity_match,
+            "fuzzy_vocabulary": len(compiled.fuzzy.vocabulary) if compiled.fuzzy is not None else 0,
+            "fuzzy_dictionary": compiled.dictionary_size,
+            "last_error": self.last_error
+        }
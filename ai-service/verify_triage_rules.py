@@ -0,0 +1,89 @@
+import json
+import sys
+
+from triage_rules import RULES_FILE, load_rules
+
+GOLDEN_FILE = "triage_golden.json"
+
+
+def verify(rules_path=RULES_FILE, golden_path=GOLDEN_FILE):
+    """Check a rule file against the golden corpus, one request at a time and as a batch"""
+    rules = load_rules(rules_path)
+    with open(golden_path, encoding="utf-8") as f:
+        golden = json.load(f)
+
+    ages = golden["ages"]
+    mismatches = []
+    extracted = []
+    for case in golden["cases"]:
+        symptoms, analysis = rules.extract(case["text"])
+        extracted.append((symptoms, analysis))
+        if symptoms != case["symptoms"] or analysis != case["analysis"]:
+            mismatches.append((case["text"], "extraction", case["analysis"], analysis))
+        for age in ages:
+            urgency = rules.decide(symptoms, analysis, age)
+            if urgency != case["urgency"][str(age)]:
+                mismatches.append((case["text"], f"age {age}", case["urgency"][str(age)], urgency))
+
+    for age in ages:
+        batch = rules.decide_batch(extracted, [age] * len(extracted))
+        expected = [case["urgency"][str(age)] for case in golden["cases"]]
+        wrong = sum(1 for got, want in zip(batch, expected) if got != want)
+        if wrong:
+            mismatches.append(("<batch>", f"age {age}", 0, wrong))
+
+    print(f"🔎 Triage rules version {rules.version}: {len(golden['cases'])} texts x {len(ages)} ages")
+    for text, where, expected, got in mismatches[:20]:
+        print(f"❌ {where}: {text!r} expected {expected}, got {got}")
+    if mismatches:
+        print(f"❌ {len(mismatches)} mismatches against {golden_path}")
+        return False
+    print("✅ Compiled rules match the golden corpus")
+    return True
+
+
+def build_golden(rules, texts, ages):
+    """Golden corpus entries for texts under compiled rules"""
+    cases = []
+    for text in texts:
+        symptoms, analysis = rules.extract(text)
+        urgency = {str(age): rules.decide(symptoms, analysis, age) for age in ages}
+        cases.append({"text": text, "symptoms": symptoms, "analysis": analysis, "urgency": urgency})
+    return {"ages": list(ages), "cases": cases}
+
+
+def golden_diff(old, new):
+    """(text, age, old urgency, new urgency) for every case whose decision changed"""
+    before = {case["text"]: case["urgency"] for case in old["cases"]}
+    changes = []
+    for case in new["cases"]:
+        previous = before.get(case["text"])
+        for age in new["ages"]:
+            was = previous.get(str(age)) if previous is not None else None
+            if was != case["urgency"][str(age)]:
+                changes.append((case["text"], age, was, case["urgency"][str(age)]))
+    return changes
+
+
+def regenerate(rules_path=RULES_FILE, golden_path=GOLDEN_FILE):
+    """Rewrite the golden corpus for a new rules version, printing every decision that
+    changes so the diff can be reviewed with the rules change"""
+    rules = load_rules(rules_path)
+    with open(golden_path, encoding="utf-8") as f:
+        old = json.load(f)
+    new = build_golden(rules, [case["text"] for case in old["cases"]], old["ages"])
+    changes = golden_diff(old, new)
+    for text, age, was, now in changes:
+        print(f"🔁 age {age}: {text!r} {was} -> {now}")
+    print(f"🔎 Triage rules version {rules.version}: {len(changes)} decisions changed "
+          f"across {len({text for text, _, _, _ in changes})} texts")
+    with open(golden_path, "w", encoding="utf-8") as f:
+        json.dump(new, f, ensure_ascii=False, separators=(",", ":"))
+
+
+if __name__ == "__main__":
+    # Usage: python verify_triage_rules.py [--regenerate] [rules.json] [golden.json]
+    if sys.argv[1:2] == ["--regenerate"]:
+        regenerate(*sys.argv[2:4])
+        sys.exit(0)
+    sys.exit(0 if verify(*sys.argv[1:3]) else 1)
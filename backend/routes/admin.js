@@ -3,6 +3,7 @@ const bcrypt = require("bcrypt");
 const pool = require("../db/postgres");
 const authMiddleware = require("../middleware/auth");
 const roleMiddleware = require("../middleware/role");
+const { syncClinicsInBackground } = require("../utils/aiClinics");
 
 const router = express.Router();
 
@@ -46,15 +47,17 @@ router.get("/clinics", authMiddleware, roleMiddleware(["admin"]), async (req, re
  */
 router.post("/clinics", authMiddleware, roleMiddleware(["admin"]), async (req, res) => {
   try {
-    const { name, address, phone, email, capacity, services } = req.body;
+    const { name, address, phone, email, capacity, services, latitude, longitude } = req.body;
     
     const result = await pool.query(
-      `INSERT INTO clinics (name, address, phone, email, capacity, services)
-       VALUES ($1, $2, $3, $4, $5, $6)
+      `INSERT INTO clinics (name, address, phone, email, capacity, services, latitude, longitude)
+       VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
        RETURNING *`,
-      [name, address, phone, email, capacity, services]
+      [name, address, phone, email, capacity, services, latitude, longitude]
     );
     
+    syncClinicsInBackground(result.rows);
+    
     res.status(201).json({
       success: true,
       message: "Clinic created successfully",
@@ -76,14 +79,15 @@ router.post("/clinics", authMiddleware, roleMiddleware(["admin"]), async (req, r
 router.put("/clinics/:id", authMiddleware, roleMiddleware(["admin"]), async (req, res) => {
   try {
     const { id } = req.params;
-    const { name, address, phone, email, capacity, services } = req.body;
+    const { name, address, phone, email, capacity, services, latitude, longitude } = req.body;
     
     const result = await pool.query(
       `UPDATE clinics 
-       SET name = $1, address = $2, phone = $3, email = $4, capacity = $5, services = $6
-       WHERE clinic_id = $7
+       SET name = $1, address = $2, phone = $3, email = $4, capacity = $5, services = $6,
+           latitude = $7, longitude = $8
+       WHERE clinic_id = $9
        RETURNING *`,
-      [name, address, phone, email, capacity, services, id]
+      [name, address, phone, email, capacity, services, latitude, longitude, id]
     );
     
     if (result.rows.length === 0) {
@@ -93,6 +97,8 @@ router.put("/clinics/:id", authMiddleware, roleMiddleware(["admin"]), async (req
       });
     }
     
+    syncClinicsInBackground(result.rows);
+    
     res.json({
       success: true,
       message: "Clinic updated successfully",
@@ -145,6 +151,9 @@ router.delete("/clinics/:id", authMiddleware, roleMiddleware(["admin"]), async (
       });
     }
     
+    // Deletions need a full replace; upserts cannot remove a clinic from the index
+    syncClinicsInBackground();
+    
     res.json({
       success: true,
       message: "Clinic deleted successfully"
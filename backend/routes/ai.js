@@ -1,15 +1,25 @@
 const express = require("express");
-const { spawn } = require("child_process");
-const path = require("path");
+const axios = require("axios");
 const authMiddleware = require("../middleware/auth");
 const roleMiddleware = require("../middleware/role");
 const Log = require("../models/Log");
+const { syncAllClinics } = require("../utils/aiClinics");
 
 const router = express.Router();
 
+// Retraining runs in the AI service job queue; the backend only submits and polls
+const AI_SERVICE_URL = "http://localhost:6000";
+const aiAdminHeaders = process.env.AI_ADMIN_TOKEN ? { "X-Admin-Token": process.env.AI_ADMIN_TOKEN } : {};
+const TERMINAL_JOB_STATES = ["succeeded", "failed", "cancelled"];
+// Job ids whose completion was already logged; oldest ids are forgotten past the cap
+// (the AI service keeps only its most recent finished jobs anyway)
+const loggedJobCompletions = new Set();
+const MAX_LOGGED_JOB_COMPLETIONS = 500;
+
 /**
  * POST /api/ai/retrain
- * Admin endpoint to trigger model retraining
+ * Admin endpoint to queue model retraining
+ * Duplicate requests are merged into the active job; returns immediately
  * Requires admin role
  */
 router.post(
@@ -20,7 +30,13 @@ router.post(
     try {
       const userId = req.user.id;
       
-      console.log("🔄 Admin triggered model retraining...");
+      console.log("🔄 Admin requested model retraining...");
+      
+      const aiRes = await axios.post(`${AI_SERVICE_URL}/retrain/jobs`, {
+        kind: req.body?.kind || "enhanced",
+        requested_by: userId
+      }, { headers: aiAdminHeaders });
+      const { job, merged } = aiRes.data;
       
       // Log the retraining request
       await Log.create({
@@ -29,101 +45,104 @@ router.post(
         details: {
           requested_by: userId,
           timestamp: new Date().toISOString(),
-          status: "initiated"
+          status: job.status,
+          job_id: job.id,
+          merged: merged
         }
       });
       
-      // Path to the retraining script
-      const scriptPath = path.join(__dirname, "../../ai-service/retrain_models.py");
-      
-      // Spawn the Python retraining process
-      const pythonProcess = spawn("python", [scriptPath], {
-        cwd: path.join(__dirname, "../../ai-service"),
-        stdio: ["pipe", "pipe", "pipe"]
+      res.status(202).json({
+        success: true,
+        message: merged ? "Merged into the retraining job already in progress" : "Retraining job queued",
+        job: job,
+        merged: merged,
+        timestamp: new Date().toISOString()
       });
-      
-      let output = "";
-      let errorOutput = "";
-      
-      // Capture stdout
-      pythonProcess.stdout.on("data", (data) => {
-        output += data.toString();
-        console.log(`Retraining output: ${data}`);
+    } catch (err) {
+      console.error("Error in retrain endpoint:", err.message);
+      res.status(err.response?.status || 500).json({
+        success: false,
+        message: "Failed to queue retraining job",
+        error: err.response?.data?.error || err.message,
+        timestamp: new Date().toISOString()
       });
-      
-      // Capture stderr
-      pythonProcess.stderr.on("data", (data) => {
-        errorOutput += data.toString();
-        console.error(`Retraining error: ${data}`);
+    }
+  }
+);
+
+/**
+ * GET /api/ai/retrain/:jobId
+ * Retraining job status, progress and timing
+ * Requires admin role
+ */
+router.get(
+  "/retrain/:jobId",
+  authMiddleware,
+  roleMiddleware(["admin"]),
+  async (req, res) => {
+    try {
+      const aiRes = await axios.get(`${AI_SERVICE_URL}/retrain/jobs/${encodeURIComponent(req.params.jobId)}`, {
+        headers: aiAdminHeaders
       });
+      const { job } = aiRes.data;
       
-      // Handle process completion
-      pythonProcess.on("close", async (code) => {
-        const success = code === 0;
-        
-        // Log the retraining result
-        await Log.create({
-          action: "AI_RETRAIN_COMPLETED",
-          userId: userId,
-          details: {
-            requested_by: userId,
-            timestamp: new Date().toISOString(),
-            status: success ? "success" : "failed",
-            exit_code: code,
-            output: output,
-            error: errorOutput
-          }
-        });
-        
-        if (success) {
-          console.log("✅ Model retraining completed successfully");
-          res.json({
-            success: true,
-            message: "Models retrained successfully",
-            output: output,
-            timestamp: new Date().toISOString()
-          });
-        } else {
-          console.error("❌ Model retraining failed");
-          res.status(500).json({
-            success: false,
-            message: "Model retraining failed",
-            error: errorOutput,
-            output: output,
-            timestamp: new Date().toISOString()
-          });
+      // Record the outcome once, the first time a poll sees the job finished
+      if (TERMINAL_JOB_STATES.includes(job.status) && !loggedJobCompletions.has(job.id)) {
+        loggedJobCompletions.add(job.id);
+        if (loggedJobCompletions.size > MAX_LOGGED_JOB_COMPLETIONS) {
+          loggedJobCompletions.delete(loggedJobCompletions.values().next().value);
         }
-      });
-      
-      // Handle process errors
-      pythonProcess.on("error", async (error) => {
-        console.error("❌ Failed to start retraining process:", error);
-        
         await Log.create({
-          action: "AI_RETRAIN_ERROR",
-          userId: userId,
+          action: job.status === "failed" ? "AI_RETRAIN_ERROR" : "AI_RETRAIN_COMPLETED",
+          userId: req.user.id,
           details: {
-            requested_by: userId,
+            requested_by: job.requested_by,
             timestamp: new Date().toISOString(),
-            status: "error",
-            error: error.message
+            status: job.status,
+            job_id: job.id,
+            exit_code: job.exit_code,
+            run_seconds: job.run_seconds,
+            output: job.output_tail.join("\n")
           }
         });
-        
-        res.status(500).json({
-          success: false,
-          message: "Failed to start retraining process",
-          error: error.message,
-          timestamp: new Date().toISOString()
-        });
-      });
+      }
       
+      res.json({ success: true, job: job, timestamp: new Date().toISOString() });
     } catch (err) {
-      console.error("Error in retrain endpoint:", err.message);
-      res.status(500).json({
+      console.error("Error getting retrain job status:", err.message);
+      res.status(err.response?.status || 500).json({
         success: false,
-        message: "Internal server error during retraining",
-        error: err.message,
+        message: "Failed to get retraining job status",
+        error: err.response?.data?.error || err.message,
+        timestamp: new Date().toISOString()
+      });
+    }
+  }
+);
+
+/**
+ * POST /api/ai/retrain/:jobId/cancel
+ * Cancel a queued or running retraining job
+ * Requires admin role
+ */
+router.post(
+  "/retrain/:jobId/cancel",
+  authMiddleware,
+  roleMiddleware(["admin"]),
+  async (req, res) => {
+    try {
+      const aiRes = await axios.post(
+        `${AI_SERVICE_URL}/retrain/jobs/${encodeURIComponent(req.params.jobId)}/cancel`,
+        {},
+        { headers: aiAdminHeaders }
+      );
+      res.json({ success: true, job: aiRes.data.job, timestamp: new Date().toISOString() });
+    } catch (err) {
+      console.error("Error cancelling retrain job:", err.message);
+      res.status(err.response?.status || 500).json({
+        success: false,
+        message: "Failed to cancel retraining job",
+        error: err.response?.data?.error || err.message,
         timestamp: new Date().toISOString()
       });
     }
@@ -184,4 +203,33 @@ router.get(
   }
 );
 
+/**
+ * POST /api/ai/clinics/sync
+ * Push all clinic coordinates to the AI service index (replacing it)
+ * Requires admin role
+ */
+router.post(
+  "/clinics/sync",
+  authMiddleware,
+  roleMiddleware(["admin"]),
+  async (req, res) => {
+    try {
+      const index = await syncAllClinics();
+      res.json({
+        success: true,
+        index: index,
+        timestamp: new Date().toISOString()
+      });
+    } catch (err) {
+      console.error("Error syncing clinics to AI service:", err.message);
+      res.status(err.response?.status || 500).json({
+        success: false,
+        message: "Failed to sync clinics",
+        error: err.response?.data?.error || err.message,
+        timestamp: new Date().toISOString()
+      });
+    }
+  }
+);
+
 module.exports = router;
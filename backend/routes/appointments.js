@@ -4,13 +4,19 @@ const authMiddleware = require("../middleware/auth"); // estructured import
 const roleMiddleware = require("../middleware/role");     // role-based access
 const Log = require("../models/Log");
 const axios = require("axios");
+const { patientLocation } = require("../utils/aiClinics");
 
 const router = express.Router();
 
+// Latency budget sent to the AI service; it falls back to keyword/heuristic scoring
+// (or sheds the request) when the model path cannot answer in time
+const AI_DEADLINE_MS = 800;
+const AI_TIMEOUT_MS = 1000;
+
 // Test endpoint for AI integration (no auth required)
 router.post("/test-ai", async (req, res) => {
   try {
-    const { symptoms, patient_id, date } = req.body;
+    const { symptoms, patient_id, clinic_id, date } = req.body;
     
     let urgency = 'routine';
     let noShowRisk = 0.5;
@@ -31,9 +37,10 @@ router.post("/test-ai", async (req, res) => {
       // --- Call ML-based no-show predictor ---
       const noshowRes = await axios.post("http://localhost:6000/noshow-ml", {
         age: 65, // Default age - can be enhanced to get from patient profile
-        distance: 10, // Default distance in km - can be enhanced with real location data
         history_missed: 0, // Default - can be enhanced to get from patient history
-        weather_bad: 0 // Default - can be enhanced with real weather API
+        appointment_time: date, // Day/time and weather are derived by the AI service
+        clinic_id, // Distance is computed by the AI service from patient and clinic coordinates
+        ...(await patientLocation(patient_id))
       });
       noShowRisk = noshowRes.data.no_show_risk;
       console.log("ML No-show response:", noshowRes.data);
@@ -87,8 +94,9 @@ router.post(
         // --- Call NLP-based triage service (supports multilingual symptoms) ---
         const triageRes = await axios.post("http://localhost:6000/nlp-triage", {
           age: 65, // Default age - can be enhanced to get from patient profile
-          symptoms: symptoms || ""
-        });
+          symptoms: symptoms || "",
+          deadline_ms: AI_DEADLINE_MS
+        }, { timeout: AI_TIMEOUT_MS });
         urgency = triageRes.data.urgency;
         console.log("NLP Triage response:", triageRes.data);
       } catch (aiError) {
@@ -99,8 +107,9 @@ router.post(
           const fallbackRes = await axios.post("http://localhost:6000/ml-triage", {
             age: 65,
             fever: (symptoms || "").toLowerCase().includes("fever"),
-            chestpain: (symptoms || "").toLowerCase().includes("chest pain")
-          });
+            chestpain: (symptoms || "").toLowerCase().includes("chest pain"),
+            deadline_ms: AI_DEADLINE_MS
+          }, { timeout: AI_TIMEOUT_MS });
           urgency = fallbackRes.data.urgency;
           console.log("Fallback ML Triage response:", fallbackRes.data);
         } catch (fallbackError) {
@@ -112,10 +121,12 @@ router.post(
         // --- Call ML-based no-show predictor ---
         const noshowRes = await axios.post("http://localhost:6000/noshow-ml", {
           age: 65, // Default age - can be enhanced to get from patient profile
-          distance: 10, // Default distance in km - can be enhanced with real location data
           history_missed: 0, // Default - can be enhanced to get from patient history
-          weather_bad: 0 // Default - can be enhanced with real weather API
-        });
+          appointment_time: date, // Day/time and weather are derived by the AI service
+          clinic_id, // Distance is computed by the AI service from patient and clinic coordinates
+          ...(await patientLocation(patient_id)),
+          deadline_ms: AI_DEADLINE_MS
+        }, { timeout: AI_TIMEOUT_MS });
         noShowRisk = noshowRes.data.no_show_risk;
         console.log("ML No-show response:", noshowRes.data);
       } catch (aiError) {
@@ -15,7 +15,7 @@ router.get("/test", (req, res) => {
  */
 router.post("/patient", authMiddleware, async (req, res) => {
   try {
-    const { date_of_birth, gender, address, blood_group, allergies, chronic_conditions, emergency_contact } = req.body;
+    const { date_of_birth, gender, address, blood_group, allergies, chronic_conditions, emergency_contact, latitude, longitude } = req.body;
     const userId = req.user.id;
 
     console.log("Creating patient profile for user:", userId);
@@ -34,10 +34,10 @@ router.post("/patient", authMiddleware, async (req, res) => {
     // Insert into patients table
     const result = await pool.query(
       `INSERT INTO patients 
-       (patient_id, date_of_birth, gender, address, blood_group, allergies, chronic_conditions, emergency_contact) 
-       VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+       (patient_id, date_of_birth, gender, address, blood_group, allergies, chronic_conditions, emergency_contact, latitude, longitude) 
+       VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
        RETURNING *`,
-      [userId, date_of_birth, gender, address, blood_group, allergies, chronic_conditions, emergency_contact]
+      [userId, date_of_birth, gender, address, blood_group, allergies, chronic_conditions, emergency_contact, latitude, longitude]
     );
 
     console.log("Patient profile created successfully:", result.rows[0]);
@@ -250,7 +250,7 @@ router.put("/patient", authMiddleware, async (req, res) => {
     console.log("Request body:", req.body);
     console.log("User ID:", req.user?.id);
 
-    const { date_of_birth, gender, address, blood_group, allergies, chronic_conditions, emergency_contact } = req.body;
+    const { date_of_birth, gender, address, blood_group, allergies, chronic_conditions, emergency_contact, latitude, longitude } = req.body;
     const userId = req.user.id;
 
     console.log("Updating patient profile for user:", userId);
@@ -267,10 +267,10 @@ router.put("/patient", authMiddleware, async (req, res) => {
       // Create new profile if it doesn't exist
       const result = await pool.query(
         `INSERT INTO patients 
-         (patient_id, date_of_birth, gender, address, blood_group, allergies, chronic_conditions, emergency_contact) 
-         VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+         (patient_id, date_of_birth, gender, address, blood_group, allergies, chronic_conditions, emergency_contact, latitude, longitude) 
+         VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
          RETURNING *`,
-        [userId, date_of_birth, gender, address, blood_group, allergies, chronic_conditions, emergency_contact]
+        [userId, date_of_birth, gender, address, blood_group, allergies, chronic_conditions, emergency_contact, latitude, longitude]
       );
 
       console.log("Patient profile created successfully:", result.rows[0]);
@@ -284,10 +284,11 @@ router.put("/patient", authMiddleware, async (req, res) => {
     // Update existing profile
     const result = await pool.query(
       `UPDATE patients 
-       SET date_of_birth = $1, gender = $2, address = $3, blood_group = $4, allergies = $5, chronic_conditions = $6, emergency_contact = $7
-       WHERE patient_id = $8
+       SET date_of_birth = $1, gender = $2, address = $3, blood_group = $4, allergies = $5, chronic_conditions = $6, emergency_contact = $7,
+           latitude = $8, longitude = $9
+       WHERE patient_id = $10
        RETURNING *`,
-      [date_of_birth, gender, address, blood_group, allergies, chronic_conditions, emergency_contact, userId]
+      [date_of_birth, gender, address, blood_group, allergies, chronic_conditions, emergency_contact, latitude, longitude, userId]
     );
 
     if (result.rows.length === 0) {
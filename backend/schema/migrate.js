@@ -26,6 +26,9 @@ async function runMigration() {
     // Execute schema
     await pool.query(schema);
     
+    // Idempotent column additions (also applied by the server to existing databases)
+    await pool.query(fs.readFileSync(path.join(__dirname, 'upgrade.sql'), 'utf8'));
+    
     console.log('✅ Database migration completed successfully!');
     console.log('📊 Tables created:');
     console.log('   - users');
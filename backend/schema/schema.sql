@@ -29,7 +29,9 @@ CREATE TABLE patients (
   blood_group VARCHAR(5),
   allergies TEXT,
   chronic_conditions TEXT,
-  emergency_contact VARCHAR(50)
+  emergency_contact VARCHAR(50),
+  latitude NUMERIC(9,6), -- home location, for no-show distance features
+  longitude NUMERIC(9,6)
 );
 
 -- ======================
@@ -40,7 +42,9 @@ CREATE TABLE clinics (
   name VARCHAR(100) NOT NULL,
   location TEXT NOT NULL,
   contact_number VARCHAR(20),
-  capacity INT
+  capacity INT,
+  latitude NUMERIC(9,6), -- synced to the AI service for patient-to-clinic distance
+  longitude NUMERIC(9,6)
 );
 
 -- ======================
@@ -99,8 +103,8 @@ CREATE INDEX idx_appointments_urgency ON appointments(urgency);
 -- ======================
 
 -- Insert sample clinic
-INSERT INTO clinics (name, location, contact_number, capacity) VALUES 
-('Rural Health Center', 'Pokhara, Nepal', '+977-61-123456', 50);
+INSERT INTO clinics (name, location, contact_number, capacity, latitude, longitude) VALUES 
+('Rural Health Center', 'Pokhara, Nepal', '+977-61-123456', 50, 28.209600, 83.985600);
 
 -- Insert sample admin user
 INSERT INTO users (name, email, password, role, phone, preferred_language) VALUES 
@@ -0,0 +1,11 @@
+-- ======================
+-- IN-PLACE UPGRADES
+-- Idempotent changes for databases created from an older schema.sql.
+-- Applied by migrate.js after schema.sql and by the server on startup.
+-- ======================
+
+-- Coordinates for no-show distance features (clinics are synced to the AI service)
+ALTER TABLE patients ADD COLUMN IF NOT EXISTS latitude NUMERIC(9,6);
+ALTER TABLE patients ADD COLUMN IF NOT EXISTS longitude NUMERIC(9,6);
+ALTER TABLE clinics ADD COLUMN IF NOT EXISTS latitude NUMERIC(9,6);
+ALTER TABLE clinics ADD COLUMN IF NOT EXISTS longitude NUMERIC(9,6);
@@ -1,9 +1,12 @@
 const express = require("express");
 const cors = require("cors");
+const fs = require("fs");
+const path = require("path");
 require("dotenv").config();
 
 const pool = require("./db/postgres");
 const connectMongo = require("./db/mongo");
+const { syncClinicsInBackground } = require("./utils/aiClinics");
 
 // Routes
 const authRoutes = require("./routes/auth");
@@ -30,6 +33,12 @@ async function initializeDatabase() {
     console.log("Postgres connected at:", connectionTest.rows[0].now);
     
     console.log("Database connection established successfully!");
+    
+    // Bring databases created from an older schema.sql up to date (idempotent)
+    await pool.query(fs.readFileSync(path.join(__dirname, "schema", "upgrade.sql"), "utf8"));
+    
+    // The AI service keeps clinic coordinates in memory; seed it from the clinics table
+    syncClinicsInBackground();
   } catch (err) {
     console.error("Database connection error:", err);
     process.exit(1);
@@ -0,0 +1,98 @@
+/**
+ * ======================
+ * AI SERVICE LOCATION DATA
+ * Keeps the AI service clinic index in sync with the clinics table and
+ * looks up patient coordinates for distance-aware no-show scoring
+ * ======================
+ */
+
+const axios = require("axios");
+const pool = require("../db/postgres");
+
+const AI_SERVICE_URL = "http://localhost:6000";
+const aiAdminHeaders = process.env.AI_ADMIN_TOKEN ? { "X-Admin-Token": process.env.AI_ADMIN_TOKEN } : {};
+
+/**
+ * Clinic row to the AI service format; null when it has no coordinates
+ * @param {object} row - clinics table row
+ * @returns {object|null}
+ */
+const toAiClinic = (row) => {
+  if (row.latitude == null || row.longitude == null) {
+    return null;
+  }
+  return {
+    clinic_id: row.clinic_id,
+    name: row.name,
+    latitude: Number(row.latitude),
+    longitude: Number(row.longitude)
+  };
+};
+
+/**
+ * Upsert clinics into the AI service index (replace drops clinics not listed)
+ * @param {object[]} rows - clinics table rows
+ * @param {boolean} replace - replace the whole index instead of upserting
+ */
+const syncClinics = async (rows, replace = false) => {
+  const clinics = rows.map(toAiClinic).filter(Boolean);
+  if (!clinics.length && !replace) {
+    return null;
+  }
+  const aiRes = await axios.post(`${AI_SERVICE_URL}/clinics`, { clinics, replace }, {
+    headers: aiAdminHeaders,
+    timeout: 5000
+  });
+  return aiRes.data;
+};
+
+/**
+ * Push every clinic with coordinates to the AI service, replacing its index
+ */
+const syncAllClinics = async () => {
+  const result = await pool.query("SELECT clinic_id, name, latitude, longitude FROM clinics");
+  return syncClinics(result.rows, true);
+};
+
+/**
+ * Same as syncClinics/syncAllClinics, but never throws: failures are logged and
+ * retried by the next sync (clinic changes must not fail because the AI service is down)
+ */
+const syncClinicsInBackground = (rows = null) => {
+  const sync = rows ? syncClinics(rows) : syncAllClinics();
+  sync
+    .then((report) => report && console.log(`Clinic index synced to AI service (${report.clinics} clinics)`))
+    .catch((err) => console.warn("Clinic sync to AI service failed:", err.message));
+};
+
+/**
+ * Patient coordinates as AI service request fields ({} when unknown)
+ * @param {number} patientId - patients.patient_id
+ * @returns {object}
+ */
+const patientLocation = async (patientId) => {
+  if (!patientId) {
+    return {};
+  }
+  try {
+    const result = await pool.query(
+      "SELECT latitude, longitude FROM patients WHERE patient_id = $1",
+      [patientId]
+    );
+    const row = result.rows[0];
+    if (!row || row.latitude == null || row.longitude == null) {
+      return {};
+    }
+    return { patient_latitude: Number(row.latitude), patient_longitude: Number(row.longitude) };
+  } catch (err) {
+    console.warn("Patient location lookup failed:", err.message);
+    return {};
+  }
+};
+
+module.exports = {
+  syncClinics,
+  syncAllClinics,
+  syncClinicsInBackground,
+  patientLocation
+};
@@ -27,6 +27,18 @@ export default function AIRetrain() {
     );
   }
 
+  const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+  // Map a retraining job from the AI service onto the results panel
+  const toResults = (job) => ({
+    success: job.status === 'succeeded',
+    timestamp: job.finished_at || job.started_at || job.submitted_at,
+    message: `${job.status} (${Math.round(job.progress * 100)}%) - ${job.message}` +
+      (job.run_seconds != null ? ` - ${job.run_seconds}s` : ''),
+    output: job.output_tail.join('\n'),
+    error: job.status === 'failed' ? job.message : null
+  });
+
   const handleRetrain = async () => {
     setRetraining(true);
     setStatus('');
@@ -39,12 +51,22 @@ export default function AIRetrain() {
       
       console.log('Retrain response:', response.data);
       
-      setRetrainResults(response.data);
+      // The job runs in the background; poll until it finishes
+      let job = response.data.job;
+      setStatus(response.data.message);
+      while (job.status === 'queued' || job.status === 'running') {
+        setRetrainResults(toResults(job));
+        await sleep(2000);
+        const statusResponse = await API.get(`/ai/retrain/${job.id}`);
+        job = statusResponse.data.job;
+      }
+      
+      setRetrainResults(toResults(job));
       
-      if (response.data.success) {
+      if (job.status === 'succeeded') {
         setStatus('Model retraining completed successfully!');
       } else {
-        setStatus('Model retraining failed. Check the details below.');
+        setStatus(`Model retraining ${job.status}. Check the details below.`);
       }
     } catch (error) {
       console.error('Error during retraining:', error);